@@ -1,9 +1,12 @@
 # Module pour l'agent d'apprentissage par renforcement
 import numpy as np
 import random
-import pickle
 import os
 from tqdm import tqdm  # Pour afficher une barre de progression (pip install tqdm si nécessaire)
+from table_q import TableQ, cle_canonique, cles_canoniques_lot, colonnes_jouables_lot, importer_pickle
+from modele_fige import figer, fichier_fige
+from memoire_experience import (MemoireExperience, transitions_partie, retours_lambda,
+                                CAPACITE_MEMOIRE, TAILLE_ECHANTILLON, LAMBDA_TRACES)
 
 # Module pour les couleurs dans le terminal
 class Couleur:
@@ -15,94 +18,287 @@ class Couleur:
     BLANC = '\033[97m'
 
 class QLearningAgent:
-    def __init__(self, alpha=0.1, gamma=0.9, epsilon=0.1):
+    def __init__(self, alpha=0.1, gamma=0.9, epsilon=0.1, symetrie=True, etats_max=None):
         """
         Initialise l'agent d'apprentissage par renforcement
         
         alpha: taux d'apprentissage (à quel point les nouvelles infos remplacent les anciennes)
         gamma: facteur de réduction (importance des récompenses futures)
         epsilon: probabilité d'explorer plutôt que d'exploiter
+        symetrie: si True, une position et son miroir gauche-droite partagent leurs valeurs Q
+        etats_max: nombre maximum d'états gardés en mémoire (None = sans limite) ; au-delà,
+        la table oublie les états les moins utiles pour faire de la place
         """
-        self.q_table = {}  # Stocke les valeurs Q pour chaque paire (état, action)
+        self.symetrie = symetrie
+        self.etats_max = etats_max
+        # Stocke les valeurs Q de chaque état (clé entière -> 7 valeurs)
+        self.q_table = TableQ(symetrique=symetrie, etats_max=etats_max)
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
+        # Livre d'ouvertures consulté avant la table Q pour jouer (jamais pendant l'entraînement)
+        self.livre = None
     
     def get_state_key(self, grille):
-        """Convertit la grille en une chaîne de caractères unique (clé)"""
-        # On utilise une représentation sous forme de tuple de tuples pour la grille
-        return tuple(tuple(ligne) for ligne in grille.grille)
+        """Convertit la grille en un entier unique de 64 bits (clé)"""
+        return grille.cle()
+    
+    def cle_table(self, state, action):
+        """Clé et action telles que stockées dans la table (miroir replié si la symétrie est active)"""
+        if self.symetrie:
+            cle, miroir = cle_canonique(state)
+            if miroir:
+                return cle, 8 - action
+            return cle, action
+        return state, action
     
     def get_q_value(self, state, action):
         """Récupère la valeur Q pour un état et une action"""
-        # Si on n'a jamais vu cet état ou cette action, on retourne 0
-        if state not in self.q_table:
-            self.q_table[state] = {}
-        if action not in self.q_table[state]:
-            self.q_table[state][action] = 0.0
-        return self.q_table[state][action]
+        # Si on n'a jamais vu cet état ou cette action, on retourne 0 (sans l'ajouter à la table)
+        return self.q_table.valeur(*self.cle_table(state, action))
     
     def update_q_value(self, state, action, reward, next_state, next_actions):
         """Met à jour la valeur Q pour un état et une action"""
-        # Vérifie si l'état existe dans le dictionnaire, sinon l'initialise
-        if state not in self.q_table:
-            self.q_table[state] = {}
-        
-        # Vérifie si l'action existe pour cet état, sinon l'initialise
-        if action not in self.q_table[state]:
-            self.q_table[state][action] = 0.0
-            
         # Formule du Q-learning : Q(s,a) = Q(s,a) + alpha * [r + gamma * max(Q(s',a')) - Q(s,a)]
         max_next_q = max([self.get_q_value(next_state, a) for a in next_actions]) if next_actions else 0
-        self.q_table[state][action] += self.alpha * (reward + self.gamma * max_next_q - self.q_table[state][action])
+        cle, action = self.cle_table(state, action)
+        q = self.q_table.valeur(cle, action)
+        self.q_table.fixer(cle, action, q + self.alpha * (reward + self.gamma * max_next_q - q))
     
     def choose_action(self, grille, actions_valides):
         """
         Choisit une action selon la stratégie epsilon-greedy:
         - Avec probabilité epsilon: exploration (action aléatoire)
         - Avec probabilité 1-epsilon: exploitation (meilleure action connue)
+
+        Les actions qui perdent tout de suite (coup gagnant ou blocage oublié,
+        case gagnante offerte à l'adversaire) sont écartées avant de choisir.
         """
-        state = self.get_state_key(grille)
-        
+        utiles = grille.coups_non_perdants(grille.joueur_au_trait())
+        actions_valides = [a for a in actions_valides if a - 1 in utiles] or actions_valides
+
         # Exploration: choisir une action aléatoire
         if random.random() < self.epsilon:
             return random.choice(actions_valides) if actions_valides else None
         
         # Exploitation: choisir la meilleure action connue
         else:
-            # Si on n'a jamais vu cet état, on initialise ses valeurs Q
-            if state not in self.q_table:
-                self.q_table[state] = {}
-            
-            # Si certaines actions n'ont pas de valeur Q, on les initialise
-            for action in actions_valides:
-                if action not in self.q_table[state]:
-                    self.q_table[state][action] = 0.0
+            if not actions_valides:
+                return None
+            if self.livre is not None:
+                coup_livre = self.livre.consulter(grille)
+                if coup_livre is not None and coup_livre[0] in actions_valides:
+                    return coup_livre[0]
+            cle, miroir = self.get_state_key(grille), False
+            if self.symetrie:
+                cle, miroir = cle_canonique(cle)
+            # Si on n'a jamais vu cet état, toutes ses valeurs Q valent 0
+            valeurs = self.q_table.valeurs(cle)
+            if valeurs is None:
+                return actions_valides[0]
             
-            # Trouve l'action avec la plus grande valeur Q
-            if actions_valides:
-                return max(actions_valides, key=lambda a: self.q_table[state].get(a, 0.0))
-            return None
-    
-    def save_model(self, filename='q_learning_model.pkl'):
-        """Sauvegarde le modèle dans un fichier"""
-        with open(filename, 'wb') as f:
-            pickle.dump(self.q_table, f)
-        print(f"Modèle sauvegardé dans {filename}")
-    
-    def load_model(self, filename='q_learning_model.pkl'):
-        """Charge le modèle depuis un fichier"""
-        if os.path.exists(filename):
-            with open(filename, 'rb') as f:
-                self.q_table = pickle.load(f)
-            print(f"Modèle chargé depuis {filename}")
-            return True
-        return False
-
-
-def entrainer_agent(episodes=10000, save_interval=1000):
-    """Entraîne l'agent en le faisant jouer contre lui-même"""
-    agent = QLearningAgent()
+            # Trouve l'action avec la plus grande valeur Q (colonnes inversées pour un miroir)
+            valeurs = valeurs.tolist()
+            if miroir:
+                valeurs.reverse()
+            return max(actions_valides, key=lambda a: valeurs[a - 1])
+    
+    def cles_table_lot(self, states, actions):
+        """Version vectorisée de cle_table (tableaux de clés uint64 et d'actions de 1 à 7)"""
+        states = np.asarray(states, dtype=np.uint64)
+        actions = np.asarray(actions, dtype=np.int64)
+        if self.symetrie:
+            cles, miroirs = cles_canoniques_lot(states)
+            return cles, np.where(miroirs, 8 - actions, actions)
+        return states, actions
+    
+    def _valeurs_colonnes_lot(self, states):
+        """Valeurs Q des 7 colonnes de chaque état (0 si inconnu), colonnes inversées pour un miroir"""
+        cles, miroirs = np.asarray(states, dtype=np.uint64), np.zeros(len(states), dtype=bool)
+        if self.symetrie:
+            cles, miroirs = cles_canoniques_lot(cles)
+        valeurs = self.q_table.valeurs_lot(cles)
+        valeurs[miroirs] = valeurs[miroirs, ::-1]
+        return valeurs
+
+    def valeurs_max_lot(self, states):
+        """Meilleure valeur Q de chaque état (clés uint64) parmi ses colonnes jouables"""
+        valeurs = self._valeurs_colonnes_lot(states)
+        return np.where(colonnes_jouables_lot(states), valeurs, -np.inf).max(axis=1)
+
+    def apprendre_lot(self, states, actions, rewards, next_states, termines):
+        """
+        Q-learning sur un lot de transitions (celles de MemoireExperience) :
+        Q(s, a) vers r + gamma * max Q(s'), s' étant la prochaine position où le
+        même joueur doit jouer, ou vers r seul si la partie s'est arrêtée avant
+        """
+        cibles = np.asarray(rewards, dtype=np.float64).copy()
+        suite = ~np.asarray(termines)
+        cibles[suite] += self.gamma * self.valeurs_max_lot(np.asarray(next_states)[suite])
+        self.mettre_a_jour_lot(states, actions, cibles)
+
+    def choisir_actions_lot(self, states, masques, generateur):
+        """
+        Stratégie epsilon-greedy pour un lot d'états (clés uint64)
+
+        masques: tableau (N, 7) de booléens, True pour les colonnes jouables (celles de
+        EnvironnementLot.masques_non_perdants pour écarter les coups perdants comme choose_action)
+        generateur: générateur NumPy (np.random.default_rng) utilisé pour l'exploration
+        Retourne N actions de 1 à 7 : les mêmes que choose_action quand il exploite.
+        """
+        valeurs = self._valeurs_colonnes_lot(states)
+        # argmax garde la première colonne jouable parmi les meilleures, comme choose_action
+        actions = np.argmax(np.where(masques, valeurs, -np.inf), axis=1)
+        explorer = generateur.random(len(valeurs)) < self.epsilon
+        if explorer.any():
+            hasard = np.where(masques[explorer], generateur.random((explorer.sum(), 7)), -1.0)
+            actions[explorer] = np.argmax(hasard, axis=1)
+        return actions + 1
+    
+    def mettre_a_jour_lot(self, states, actions, rewards):
+        """
+        update_q_value vers un état terminal pour un lot de coups, dans l'ordre du lot
+        (rewards est la cible de chaque coup : sa récompense, ou un retour déjà calculé)
+
+        Quand une même (clé, action) revient plusieurs fois, ses mises à jour successives
+        Q = Q + alpha * (r - Q) sont combinées en une seule :
+        Q = (1 - alpha)^k * Q + somme des alpha * (1 - alpha)^(mises à jour suivantes) * r
+        """
+        cles, actions = self.cles_table_lot(states, actions)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        indices = self.q_table.inserer_lot(cles)  # Peut agrandir la table
+        cases = indices * 7 + (actions - 1)
+        ordre = np.argsort(cases, kind='stable')
+        cases = cases[ordre]
+        debuts = np.flatnonzero(np.r_[True, cases[1:] != cases[:-1]])
+        tailles = np.diff(np.r_[debuts, len(cases)])
+        # Nombre de mises à jour qui suivent chaque coup dans son groupe
+        suivantes = np.repeat(debuts + tailles, tailles) - 1 - np.arange(len(cases))
+        apports = np.add.reduceat(self.alpha * (1 - self.alpha) ** suivantes * rewards[ordre], debuts)
+        lignes, colonnes = cases[debuts] // 7, cases[debuts] % 7
+        q = self.q_table.q[lignes, colonnes].astype(np.float64)
+        self.q_table.q[lignes, colonnes] = (1 - self.alpha) ** tailles * q + apports
+    
+    def save_model(self, filename='q_learning_model.bin'):
+        """Sauvegarde le modèle dans un fichier (seuls les états modifiés sont réécrits)"""
+        self.q_table.sauvegarder(filename)
+        details = f"{len(self.q_table)} états, {self.q_table.octets_par_etat():.0f} octets/état"
+        if self.q_table.etats_max is not None:
+            details += (f", {self.q_table.oublis} états oubliés, "
+                        f"{self.q_table.taux_succes():.0%} des lectures dans la table")
+        print(f"Modèle sauvegardé dans {filename} ({details})")
+    
+    def exporter_modele_fige(self, filename=None):
+        """Écrit le modèle figé (lecture seule) qui sert pour jouer, à côté du modèle"""
+        filename = filename or fichier_fige()
+        modele = figer(self.q_table, filename)
+        print(f"Modèle figé exporté dans {filename} ({len(modele)} états, {os.path.getsize(filename)} octets)")
+
+    def load_model(self, filename='q_learning_model.bin'):
+        """Charge le modèle depuis un fichier (un ancien modèle .pkl du même nom est importé une fois)"""
+        if not os.path.exists(filename):
+            ancien = os.path.splitext(filename)[0] + '.pkl'
+            if not os.path.exists(ancien):
+                return False
+            importer_pickle(ancien, filename, self.symetrie)
+            print(f"Ancien modèle {ancien} importé dans {filename}")
+        q_table = TableQ.ouvrir(filename)
+        if self.symetrie and not q_table.symetrique:
+            q_table = q_table.replier()
+        if self.etats_max is not None:
+            q_table = q_table.borner(self.etats_max)
+        # Un modèle appris avec la symétrie s'utilise forcément avec
+        self.symetrie = q_table.symetrique
+        self.q_table = q_table
+        print(f"Modèle chargé depuis {filename}")
+        return True
+
+
+def jouer_partie_entrainement(agent, grille):
+    """
+    Fait jouer une partie complète à l'agent contre lui-même (le joueur 1 commence)
+
+    Retourne (historique, gagnant) : historique contient les (état, action, joueur)
+    de chaque coup, gagnant vaut 1 ou 2, ou 0 pour un match nul.
+    """
+    joueur = 1  # Joueur 1 commence
+    historique = []
+    
+    # Joue jusqu'à la fin de la partie
+    while True:
+        # Obtient les actions valides
+        actions_valides = [col+1 for col in grille.coups_valides()]
+        if not actions_valides:  # Match nul
+            return historique, 0
+        
+        # État actuel
+        etat_actuel = agent.get_state_key(grille)
+        
+        # Choisit une action
+        action = agent.choose_action(grille, actions_valides)
+        
+        # Joue l'action
+        grille.ajouter_piece(action, joueur)
+        
+        # Enregistre l'action
+        historique.append((etat_actuel, action, joueur))
+        
+        # Vérifie si le joueur a gagné
+        if grille.est_gagnant(joueur):
+            return historique, joueur
+        
+        # Change de joueur
+        joueur = 3 - joueur
+
+def recompenses_partie(historique, gagnant):
+    """Donne la récompense finale de chaque coup de la partie, du dernier au premier : (état, action, r)"""
+    for etat, action, joueur_action in reversed(historique):
+        # Les coups du gagnant reçoivent une récompense positive, ceux du perdant
+        # une récompense négative (quel que soit le joueur qui a gagné)
+        yield etat, action, (0 if gagnant == 0 else (1 if joueur_action == gagnant else -1))
+
+def compter_resultat(resultats, gagnant):
+    """Ajoute le résultat d'une partie aux statistiques d'entraînement"""
+    if gagnant == 1:
+        resultats["victoires_joueur1"] += 1
+    elif gagnant == 2:
+        resultats["victoires_joueur2"] += 1
+    else:
+        resultats["matchs_nuls"] += 1
+
+def afficher_resultats(resultats):
+    print(f"Victoires joueur 1: {resultats['victoires_joueur1']}")
+    print(f"Victoires joueur 2: {resultats['victoires_joueur2']}")
+    print(f"Matchs nuls: {resultats['matchs_nuls']}")
+
+def apprendre_partie(agent, memoire, historique, gagnant, lambda_traces=LAMBDA_TRACES,
+                     taille_echantillon=TAILLE_ECHANTILLON):
+    """
+    Apprend d'une partie finie (résultat de jouer_partie_entrainement) : ses coups vont
+    dans la mémoire d'expérience, puis taille_echantillon coups tirés de la mémoire sont
+    appris en une seule mise à jour. Avec lambda_traces (entre 0 et 1), les coups de la
+    partie sont d'abord appris tout de suite vers leurs retours TD(lambda).
+    """
+    etats = np.fromiter((etat for etat, _, _ in historique), dtype=np.uint64, count=len(historique))
+    actions = np.fromiter((action for _, action, _ in historique), dtype=np.int8, count=len(historique))
+    transitions = transitions_partie(etats, actions, gagnant)
+    if lambda_traces is not None:
+        agent.mettre_a_jour_lot(etats, actions, retours_lambda(agent, *transitions[2:], lambda_traces))
+    memoire.ajouter(*transitions)
+    agent.apprendre_lot(*memoire.echantillonner(taille_echantillon))
+
+def entrainer_agent(episodes=10000, save_interval=1000, etats_max=None, lambda_traces=LAMBDA_TRACES,
+                    capacite_memoire=CAPACITE_MEMOIRE, taille_echantillon=TAILLE_ECHANTILLON):
+    """
+    Entraîne l'agent en le faisant jouer contre lui-même
+
+    Chaque partie est apprise par apprendre_partie : mémoire d'expérience (Q-learning
+    avec la prochaine position du même joueur) et retours TD(lambda) de la partie.
+    etats_max: si donné, la table Q ne dépasse jamais ce nombre d'états (mémoire fixe)
+    lambda_traces: entre 0 et 1 (None : seulement la mémoire, plus lent à apprendre)
+    """
+    agent = QLearningAgent(etats_max=etats_max)
+    memoire = MemoireExperience(capacite_memoire)
     
     # Essaie de charger un modèle existant
     agent.load_model()
@@ -116,74 +312,25 @@ def entrainer_agent(episodes=10000, save_interval=1000):
     from main import Grille  
     
     for episode in tqdm(range(episodes)):
-        # Réinitialise le jeu
-        grille = Grille()
-        joueur = 1  # Joueur 1 commence
-        game_over = False
+        # Joue une partie sur une grille neuve
+        historique, gagnant = jouer_partie_entrainement(agent, Grille())
+        compter_resultat(resultats, gagnant)
         
-        # Historique des actions pour mettre à jour les valeurs Q à la fin
-        historique = []
-        
-        # Joue jusqu'à la fin de la partie
-        while not game_over:
-            # Obtient les actions valides
-            actions_valides = [col+1 for col in grille.coups_valides()]
-            if not actions_valides:  # Match nul
-                game_over = True
-                reward = 0
-                resultats["matchs_nuls"] += 1
-                break
-            
-            # État actuel
-            etat_actuel = agent.get_state_key(grille)
-            
-            # Choisit une action
-            action = agent.choose_action(grille, actions_valides)
-            
-            # Joue l'action
-            grille.ajouter_piece(action, joueur)
-            
-            # Enregistre l'action
-            historique.append((etat_actuel, action, joueur))
-            
-            # Vérifie si le joueur a gagné
-            if grille.est_gagnant(joueur):
-                game_over = True
-                reward = 1 if joueur == 1 else -1
-                if joueur == 1:
-                    resultats["victoires_joueur1"] += 1
-                else:
-                    resultats["victoires_joueur2"] += 1
-            
-            # Change de joueur
-            joueur = 3 - joueur
-        
-        # Met à jour les valeurs Q pour toutes les actions de la partie
-        if game_over:
-            # Récompense finale
-            for etat, action, joueur_action in reversed(historique):
-                # L'agent qui a joué le dernier coup gagnant reçoit une récompense positive
-                # L'autre agent reçoit une récompense négative
-                r = reward if joueur_action == (3 - joueur) else -reward
-                
-                # Le prochain état est terminal, donc pas d'actions futures
-                agent.update_q_value(etat, action, r, None, [])
+        # Range les coups de la partie dans la mémoire, puis apprend sur un échantillon
+        apprendre_partie(agent, memoire, historique, gagnant, lambda_traces, taille_echantillon)
         
         # Sauvegarde périodiquement le modèle
         if (episode + 1) % save_interval == 0:
             agent.save_model()
             print(f"\nAprès {episode + 1} parties:")
-            print(f"Victoires joueur 1: {resultats['victoires_joueur1']}")
-            print(f"Victoires joueur 2: {resultats['victoires_joueur2']}")
-            print(f"Matchs nuls: {resultats['matchs_nuls']}")
+            afficher_resultats(resultats)
     
     # Sauvegarde finale
     agent.save_model()
+    agent.exporter_modele_fige()
     
     print("\nEntraînement terminé!")
-    print(f"Victoires joueur 1: {resultats['victoires_joueur1']}")
-    print(f"Victoires joueur 2: {resultats['victoires_joueur2']}")
-    print(f"Matchs nuls: {resultats['matchs_nuls']}")
+    afficher_resultats(resultats)
     
     return agent
 
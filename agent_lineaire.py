@@ -0,0 +1,226 @@
+# Module pour l'agent à approximation linéaire : valeurs Q calculées à partir des fenêtres de 4 cases
+import argparse
+import os
+import random
+import struct
+
+import numpy as np
+
+from main import HAUTEUR, LARGEUR, HAUTEUR_BITS, BAS, MASQUES_COLONNES, COLONNE_CENTRALE, FENETRES
+from agent import afficher_resultats
+from environnement_lot import jouer_parties_lot
+
+FICHIER_LINEAIRE = 'agent_lineaire.bin'
+
+# Pour chaque fenêtre, 7 caractéristiques (0 ou 1) : de 1 à 4 pièces du joueur qui vient de
+# jouer sans pièce adverse, ou de 1 à 3 pièces adverses sans pièce du joueur (une fenêtre
+# vide ou partagée ne compte pas). S'y ajoutent les pièces de chaque joueur dans la colonne
+# centrale (divisées par la hauteur) et une constante.
+CATEGORIES = 7
+NB_CARACTERISTIQUES = len(FENETRES) * CATEGORIES + 3
+
+# Fichier : en-tête (magique, version, nombre de poids) puis les poids en float32
+MAGIQUE = b'P4LINEAI'
+VERSION = 1
+EN_TETE = struct.Struct('<8sII')
+
+_FENETRES = np.array(FENETRES, dtype=np.intp)
+_BITS = np.arange(LARGEUR * HAUTEUR_BITS, dtype=np.uint64)
+_MASQUES_COLONNES = np.array(MASQUES_COLONNES, dtype=np.uint64)
+_PREMIERE_CARACTERISTIQUE = np.arange(len(FENETRES)) * CATEGORIES
+# Une correction par lot vaut PAS_LOT corrections d'un seul coup (moyennées sur le lot)
+PAS_LOT = 8
+
+
+def bitboards_depuis_cles(cles):
+    """
+    Retrouve (pièces du joueur au trait, cases occupées, nombre de pièces) à partir de
+    clés de Grille.cle() (tableau uint64) : dans chaque colonne, le bit le plus haut de la
+    clé marque la hauteur et les bits en dessous sont les pièces du joueur 1.
+    """
+    cles = np.asarray(cles, dtype=np.uint64)
+    joueur1 = np.zeros_like(cles)
+    masque = np.zeros_like(cles)
+    nb_pieces = np.zeros(len(cles), dtype=np.int64)
+    for colonne in range(LARGEUR):
+        decalage = np.uint64(colonne * HAUTEUR_BITS)
+        bloc = (cles >> decalage) & np.uint64(0x7F)
+        hauteur = np.log2(bloc).astype(np.int64)  # Exact : bloc vaut au plus 127
+        haut = np.left_shift(np.uint64(1), hauteur.astype(np.uint64))
+        joueur1 |= (bloc - haut) << decalage
+        masque |= (haut - np.uint64(1)) << decalage
+        nb_pieces += hauteur
+    pieces = np.where(nb_pieces % 2 == 0, joueur1, joueur1 ^ masque)
+    return pieces, masque, nb_pieces
+
+
+def caracteristiques_lot(joueur, adversaire):
+    """
+    Caractéristiques de N positions (tableau (N, NB_CARACTERISTIQUES) float32)
+
+    joueur: pièces du joueur qui vient de jouer, adversaire: celles de l'autre (uint64).
+    Elles ne dépendent pas de la couleur : le même poids sert aux deux joueurs.
+    """
+    bits_joueur = ((joueur[:, None] >> _BITS) & np.uint64(1)).astype(np.int8)
+    bits_adversaire = ((adversaire[:, None] >> _BITS) & np.uint64(1)).astype(np.int8)
+    nb_joueur = bits_joueur[:, _FENETRES].sum(axis=2)  # (N, 69)
+    nb_adversaire = bits_adversaire[:, _FENETRES].sum(axis=2)
+    categories = np.where(nb_adversaire == 0, nb_joueur - 1, np.where(nb_joueur == 0, nb_adversaire + 3, -1))
+    lignes, fenetres = np.nonzero(categories >= 0)
+    x = np.zeros((len(joueur), NB_CARACTERISTIQUES), dtype=np.float32)
+    x[lignes, _PREMIERE_CARACTERISTIQUE[fenetres] + categories[lignes, fenetres]] = 1.0
+    centre = HAUTEUR_BITS * COLONNE_CENTRALE
+    x[:, -3] = bits_joueur[:, centre:centre + HAUTEUR].sum(axis=1) / HAUTEUR
+    x[:, -2] = bits_adversaire[:, centre:centre + HAUTEUR].sum(axis=1) / HAUTEUR
+    x[:, -1] = 1.0
+    return x
+
+
+def apres_coups(pieces, masque, actions):
+    """
+    Positions après les coups : pieces et masque (N,) pour le joueur au trait,
+    actions (N, k) de 1 à 7 (jouables). Retourne (joueur, adversaire) de forme (N * k,).
+    """
+    coups = ((masque + np.uint64(BAS))[:, None]) & _MASQUES_COLONNES[np.asarray(actions) - 1]
+    joueur = (pieces[:, None] | coups).ravel()
+    adversaire = np.repeat(pieces ^ masque, coups.shape[1])
+    return joueur, adversaire
+
+
+class AgentLineaire:
+    def __init__(self, alpha=0.1, gamma=0.9, epsilon=0.1):
+        """
+        Agent d'apprentissage par renforcement à approximation linéaire (même interface
+        que QLearningAgent) : Q(s, a) = poids . caractéristiques(position après le coup a)
+
+        alpha: taux d'apprentissage (part de l'erreur corrigée à chaque mise à jour)
+        gamma: facteur de réduction (importance des récompenses futures)
+        epsilon: probabilité d'explorer plutôt que d'exploiter
+
+        La mémoire ne dépend pas du nombre de positions vues : seuls les
+        NB_CARACTERISTIQUES poids sont appris, et une position jamais vue est quand
+        même évaluée à partir de ses fenêtres.
+        """
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.poids = np.zeros(NB_CARACTERISTIQUES, dtype=np.float32)
+        # Livre d'ouvertures consulté avant les poids pour jouer (jamais pendant l'entraînement)
+        self.livre = None
+
+    def get_state_key(self, grille):
+        """Convertit la grille en un entier unique de 64 bits (clé)"""
+        return grille.cle()
+
+    def _caracteristiques(self, state, actions):
+        """Caractéristiques des positions après chaque action (de 1 à 7) depuis la clé state"""
+        pieces, masque, _ = bitboards_depuis_cles([state])
+        return caracteristiques_lot(*apres_coups(pieces, masque, [actions]))
+
+    def get_q_value(self, state, action):
+        """Valeur Q d'une action pour le joueur au trait dans state"""
+        return float(self._caracteristiques(state, [action])[0] @ self.poids)
+
+    def update_q_value(self, state, action, reward, next_state, next_actions):
+        """
+        Corrige les poids vers r + gamma * (valeur de next_state) ; next_state est au tour
+        de l'adversaire, sa meilleure valeur Q compte donc contre le joueur qui a joué
+        """
+        cible = reward
+        if next_state is not None and next_actions:
+            cible -= self.gamma * float(np.max(self._caracteristiques(next_state, next_actions) @ self.poids))
+        x = self._caracteristiques(state, [action])[0]
+        # Pas normalisé (NLMS) : la valeur Q du coup se rapproche de alpha de la cible
+        self.poids += self.alpha * (cible - x @ self.poids) / (x @ x) * x
+
+    def choose_action(self, grille, actions_valides):
+        """
+        Choisit une action selon la stratégie epsilon-greedy (comme QLearningAgent) ;
+        les valeurs Q de toutes les actions valides viennent d'un seul produit matriciel
+        """
+        utiles = grille.coups_non_perdants(grille.joueur_au_trait())
+        actions_valides = [a for a in actions_valides if a - 1 in utiles] or actions_valides
+        if not actions_valides:
+            return None
+        if random.random() < self.epsilon:
+            return random.choice(actions_valides)
+        if self.livre is not None:
+            coup_livre = self.livre.consulter(grille)
+            if coup_livre is not None and coup_livre[0] in actions_valides:
+                return coup_livre[0]
+        pieces = grille.bitboards[grille.joueur_au_trait()]
+        masque = grille.bitboards[1] | grille.bitboards[2]
+        x = caracteristiques_lot(*apres_coups(np.array([pieces], dtype=np.uint64),
+                                              np.array([masque], dtype=np.uint64), [actions_valides]))
+        return actions_valides[int(np.argmax(x @ self.poids))]
+
+    def choisir_actions_lot(self, states, masques, generateur):
+        """
+        Stratégie epsilon-greedy pour un lot d'états (mêmes arguments que
+        QLearningAgent.choisir_actions_lot) : un seul produit pour les 7 colonnes de tous les états
+        """
+        pieces, masque, _ = bitboards_depuis_cles(states)
+        x = caracteristiques_lot(*apres_coups(pieces, masque, np.broadcast_to(np.arange(1, 8), (len(pieces), 7))))
+        valeurs = (x @ self.poids).reshape(-1, 7)
+        actions = np.argmax(np.where(masques, valeurs, -np.inf), axis=1)
+        explorer = generateur.random(len(pieces)) < self.epsilon
+        if explorer.any():
+            hasard = np.where(masques[explorer], generateur.random((explorer.sum(), 7)), -1.0)
+            actions[explorer] = np.argmax(hasard, axis=1)
+        return actions + 1
+
+    def mettre_a_jour_lot(self, states, actions, rewards):
+        """
+        update_q_value vers un état terminal pour un lot de coups, en une seule correction
+        des poids (moyenne des corrections NLMS de chaque coup)
+        """
+        pieces, masque, _ = bitboards_depuis_cles(states)
+        x = caracteristiques_lot(*apres_coups(pieces, masque, np.asarray(actions)[:, None]))
+        erreurs = (np.asarray(rewards, dtype=np.float32) - x @ self.poids) / (x * x).sum(axis=1)
+        self.poids += self.alpha * (erreurs @ x) / len(x) * PAS_LOT
+
+    def save_model(self, filename=FICHIER_LINEAIRE):
+        """Sauvegarde les poids (fichier temporaire puis renommé)"""
+        temporaire = filename + '.tmp'
+        with open(temporaire, 'wb') as f:
+            f.write(EN_TETE.pack(MAGIQUE, VERSION, len(self.poids)))
+            f.write(self.poids.astype('<f4').tobytes())
+        os.replace(temporaire, filename)
+        print(f"Modèle sauvegardé dans {filename} ({len(self.poids)} poids)")
+
+    def load_model(self, filename=FICHIER_LINEAIRE):
+        """Charge les poids ; retourne False si le fichier n'existe pas"""
+        if not os.path.exists(filename):
+            return False
+        with open(filename, 'rb') as f:
+            magique, version, nb = EN_TETE.unpack(f.read(EN_TETE.size))
+            if magique != MAGIQUE or version != VERSION or nb != NB_CARACTERISTIQUES:
+                raise ValueError(f"{filename} n'est pas un modèle d'agent linéaire compatible")
+            self.poids = np.frombuffer(f.read(4 * nb), dtype='<f4').astype(np.float32)
+        print(f"Modèle chargé depuis {filename}")
+        return True
+
+
+def entrainer_agent_lineaire(episodes=10000, taille_lot=256, save_interval=1000, graine=None):
+    """Entraîne l'agent linéaire en le faisant jouer contre lui-même sur taille_lot parties à la fois"""
+    agent = AgentLineaire()
+    agent.load_model()
+
+    print(f"Début de l'entraînement de l'agent linéaire sur {episodes} parties ({taille_lot} à la fois)...")
+    resultats = jouer_parties_lot(agent, episodes, taille_lot, save_interval, np.random.default_rng(graine))
+
+    # Sauvegarde finale
+    agent.save_model()
+
+    print("\nEntraînement terminé!")
+    afficher_resultats(resultats)
+    return agent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraîne l'agent linéaire par self-play")
+    parser.add_argument("--parties", type=int, default=10000)
+    parser.add_argument("--lot", type=int, default=256, help="nombre de parties jouées en même temps")
+    parser.add_argument("--graine", type=int, default=None)
+    args = parser.parse_args()
+    entrainer_agent_lineaire(args.parties, args.lot, graine=args.graine)
@@ -0,0 +1,233 @@
+# Module pour faire jouer beaucoup de parties sans affichage (agent, Minimax, hasard) et mesurer les résultats
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from main import Grille
+from modele_fige import charger_agent
+from recherche import minimax_tt
+from transposition import TableTransposition
+from mcts import MCTS
+from agent_lineaire import AgentLineaire, FICHIER_LINEAIRE
+
+# Quantile de la loi normale pour un intervalle de confiance à 95 %
+Z_95 = 1.96
+
+
+class JoueurAgent:
+    def __init__(self, fichier='q_learning_model.bin'):
+        """L'agent d'apprentissage par renforcement, sans exploration (modèle figé s'il est à jour)"""
+        self.agent = charger_agent(fichier)
+        if self.agent is None:
+            raise FileNotFoundError(f"Pas de modèle entraîné trouvé dans {fichier}")
+
+    def nouvelle_partie(self, graine):
+        pass
+
+    def jouer(self, grille, piece):
+        return self.agent.choose_action(grille, [col+1 for col in grille.coups_valides()])
+
+
+class JoueurLineaire(JoueurAgent):
+    def __init__(self, fichier=FICHIER_LINEAIRE):
+        """L'agent à approximation linéaire, sans exploration"""
+        self.agent = AgentLineaire(epsilon=0.0)
+        if not self.agent.load_model(fichier):
+            raise FileNotFoundError(f"Pas de modèle entraîné trouvé dans {fichier}")
+
+
+class JoueurMinimax:
+    def __init__(self, profondeur=4):
+        """Minimax à profondeur fixe avec table de transposition (maximise pour le joueur 2)"""
+        self.profondeur = profondeur
+        self.table = TableTransposition()
+
+    def nouvelle_partie(self, graine):
+        self.table.vider()
+
+    def jouer(self, grille, piece):
+        return minimax_tt(grille, self.profondeur, float('-inf'), float('inf'), piece == 2, self.table)[0]
+
+
+class JoueurMCTS:
+    def __init__(self, simulations=2000):
+        """MCTS avec un nombre fixe de simulations par coup (reproductible, contrairement à un temps)"""
+        self.simulations = simulations
+        self.moteur = MCTS()
+
+    def nouvelle_partie(self, graine):
+        self.moteur.nouvelle_partie()
+        self.moteur.generateur.seed(graine)
+
+    def jouer(self, grille, piece):
+        return self.moteur.chercher(grille, iterations=self.simulations)[0]
+
+
+class JoueurAleatoire:
+    def __init__(self):
+        """Joue une colonne au hasard parmi les colonnes jouables"""
+        self.generateur = random.Random()
+
+    def nouvelle_partie(self, graine):
+        self.generateur.seed(graine)
+
+    def jouer(self, grille, piece):
+        return self.generateur.choice(grille.coups_valides()) + 1
+
+
+def creer_joueur(description):
+    """
+    Crée un joueur à partir de sa description :
+    "agent" ou "agent:fichier.bin", "lineaire" ou "lineaire:fichier.bin" (agent linéaire),
+    "minimax:k" (profondeur k), "mcts:n" (n simulations par coup), "aleatoire"
+    """
+    nom, _, parametre = description.partition(":")
+    if nom == "agent":
+        return JoueurAgent(parametre or 'q_learning_model.bin')
+    if nom == "lineaire":
+        return JoueurLineaire(parametre or FICHIER_LINEAIRE)
+    if nom == "minimax":
+        return JoueurMinimax(int(parametre or 4))
+    if nom == "mcts":
+        return JoueurMCTS(int(parametre or 2000))
+    if nom == "aleatoire":
+        return JoueurAleatoire()
+    raise ValueError(f"Joueur inconnu : {description}")
+
+
+# Les deux joueurs du processus (créés une seule fois par worker)
+_joueurs = None
+
+
+def _initialiser_worker(description_a, description_b):
+    """Crée les deux joueurs dans le processus worker"""
+    global _joueurs
+    _joueurs = (creer_joueur(description_a), creer_joueur(description_b))
+
+
+def _jouer_partie(numero, coups_ouverture, graine):
+    """
+    Joue la partie numero entre les joueurs A et B du worker
+
+    Les parties vont par deux : même ouverture de coups_ouverture coups au hasard,
+    A commence la partie paire et B la partie impaire.
+    Retourne le score de A (1 victoire, 0.5 nul, 0 défaite).
+    """
+    joueur_a, joueur_b = _joueurs
+    a_commence = numero % 2 == 0
+    pieces = {1: joueur_a, 2: joueur_b} if a_commence else {1: joueur_b, 2: joueur_a}
+    for piece, joueur in pieces.items():
+        joueur.nouvelle_partie((graine * 1000003 + numero) * 2 + piece)
+
+    grille = Grille()
+    ouverture = random.Random(graine * 1000003 + numero // 2)
+    piece = 1
+    for ply in range(42):
+        coups_valides = grille.coups_valides()
+        if not coups_valides:
+            return 0.5
+        if ply < coups_ouverture:
+            col = ouverture.choice(coups_valides) + 1
+        else:
+            col = pieces[piece].jouer(grille, piece)
+        grille.ajouter_piece(col, piece)
+        if grille.est_gagnant(piece):
+            # Une ouverture qui gagne déjà compte quand même (elle est rejouée en échangeant les rôles)
+            return 1.0 if (piece == 1) == a_commence else 0.0
+        piece = 3 - piece
+    return 0.5
+
+
+def intervalle_wilson(succes, total, z=Z_95):
+    """Intervalle de confiance de Wilson pour une proportion : (bas, haut)"""
+    if total == 0:
+        return 0.0, 1.0
+    p = succes / total
+    centre = (p + z * z / (2 * total)) / (1 + z * z / total)
+    marge = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / (1 + z * z / total)
+    return max(0.0, centre - marge), min(1.0, centre + marge)
+
+
+def elo_depuis_score(score):
+    """Écart Elo correspondant à un score moyen entre 0 et 1"""
+    if score <= 0:
+        return float('-inf')
+    if score >= 1:
+        return float('inf')
+    return 400 * math.log10(score / (1 - score))
+
+
+def bilan(scores, duree):
+    """Résume une liste de scores de A : taux, intervalles de confiance, Elo et vitesse"""
+    n = len(scores)
+    victoires = scores.count(1.0)
+    nuls = scores.count(0.5)
+    defaites = n - victoires - nuls
+    score = sum(scores) / n
+    # Écart-type du score moyen (chaque partie vaut 0, 0.5 ou 1)
+    ecart = math.sqrt(max(sum(s * s for s in scores) / n - score * score, 0.0) / n)
+    return {
+        "parties": n,
+        "victoires": victoires,
+        "nuls": nuls,
+        "defaites": defaites,
+        "taux_victoires": (victoires / n, intervalle_wilson(victoires, n)),
+        "taux_nuls": (nuls / n, intervalle_wilson(nuls, n)),
+        "taux_defaites": (defaites / n, intervalle_wilson(defaites, n)),
+        "score": score,
+        "elo": (elo_depuis_score(score),
+                (elo_depuis_score(score - Z_95 * ecart), elo_depuis_score(score + Z_95 * ecart))),
+        "parties_par_seconde": n / duree if duree > 0 else float('inf'),
+    }
+
+
+def arene(joueur_a, joueur_b, nb_parties=1000, nb_workers=None, coups_ouverture=2, graine=0):
+    """
+    Fait jouer nb_parties parties sans affichage entre deux joueurs (descriptions de creer_joueur)
+
+    Chaque joueur commence une partie sur deux. Les parties sont réparties
+    entre nb_workers processus (par défaut, un par cœur).
+    Retourne le bilan du point de vue du joueur A.
+    """
+    nb_workers = nb_workers or os.cpu_count() or 1
+    numeros = range(nb_parties)
+    debut = time.perf_counter()
+    if nb_workers == 1:
+        _initialiser_worker(joueur_a, joueur_b)
+        scores = [_jouer_partie(numero, coups_ouverture, graine) for numero in numeros]
+    else:
+        with ProcessPoolExecutor(max_workers=nb_workers, initializer=_initialiser_worker,
+                                 initargs=(joueur_a, joueur_b)) as executeur:
+            scores = list(executeur.map(_jouer_partie, numeros, [coups_ouverture] * nb_parties,
+                                        [graine] * nb_parties, chunksize=max(1, nb_parties // (8 * nb_workers))))
+    return bilan(scores, time.perf_counter() - debut)
+
+
+def afficher_bilan(joueur_a, joueur_b, resultats):
+    def pourcentage(taux):
+        valeur, (bas, haut) = taux
+        return f"{valeur*100:.1f}% [{bas*100:.1f} - {haut*100:.1f}]"
+
+    elo, (elo_bas, elo_haut) = resultats["elo"]
+    print(f"{joueur_a} contre {joueur_b} : {resultats['parties']} parties")
+    print(f"Victoires : {resultats['victoires']} ({pourcentage(resultats['taux_victoires'])})")
+    print(f"Nuls : {resultats['nuls']} ({pourcentage(resultats['taux_nuls'])})")
+    print(f"Défaites : {resultats['defaites']} ({pourcentage(resultats['taux_defaites'])})")
+    print(f"Score : {resultats['score']*100:.1f}%, Elo {elo:+.0f} [{elo_bas:+.0f} - {elo_haut:+.0f}]")
+    print(f"Vitesse : {resultats['parties_par_seconde']:.1f} parties/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fait jouer deux joueurs l'un contre l'autre sans affichage")
+    parser.add_argument("joueur_a", help='"agent", "agent:fichier.bin", "lineaire", "minimax:k", "mcts:n" ou "aleatoire"')
+    parser.add_argument("joueur_b", help="même format que joueur_a")
+    parser.add_argument("--parties", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut, un par cœur)")
+    parser.add_argument("--ouverture", type=int, default=2, help="nombre de premiers coups joués au hasard")
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args()
+    afficher_bilan(args.joueur_a, args.joueur_b,
+                   arene(args.joueur_a, args.joueur_b, args.parties, args.workers, args.ouverture, args.graine))
@@ -0,0 +1,277 @@
+# Module pour mesurer la vitesse du jeu, de l'évaluation, de la recherche et de l'entraînement
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from main import Grille, grille_depuis_coups, calculer_score_position, minimax, minimax_en_place
+from agent import QLearningAgent, jouer_partie_entrainement, apprendre_partie
+from memoire_experience import MemoireExperience
+from recherche import minimax_tt
+from transposition import TableTransposition
+from statistiques import StatistiquesRecherche
+
+# Graine des positions de test (toujours les mêmes d'une mesure à l'autre)
+GRAINE = 20240611
+# Nombre de suites de coups de chaque longueur depuis la grille vide (une partie finie s'arrête)
+PERFT_ATTENDU = {1: 7, 2: 49, 3: 343, 4: 2401, 5: 16807, 6: 117649, 7: 823536, 8: 5673234}
+# Ralentissement à partir duquel une mesure est signalée comme une régression
+SEUIL_REGRESSION = 0.10
+
+
+def positions_fixes(nombre=40, graine=GRAINE):
+    """
+    Tire des positions de milieu de partie (4 à 20 pièces, partie non finie)
+    en jouant au hasard avec une graine fixe. Retourne les coups joués ("4453...").
+    """
+    generateur = random.Random(graine)
+    positions = []
+    while len(positions) < nombre:
+        grille = Grille()
+        coups = ""
+        piece = 1
+        for _ in range(generateur.randint(4, 20)):
+            col = generateur.choice(grille.coups_valides()) + 1
+            grille.ajouter_piece(col, piece)
+            coups += str(col)
+            if grille.est_gagnant(piece):
+                break
+            piece = 3 - piece
+        else:
+            positions.append(coups)
+    return positions
+
+
+def _chronometrer(fonction, repetitions=3):
+    """Meilleur temps (en secondes) sur plusieurs exécutions"""
+    meilleur = float('inf')
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def mesurer_grille(positions, tours=200):
+    """Opérations de base de Grille par seconde"""
+    grilles = [grille_depuis_coups(coups) for coups in positions]
+    coups = [(g, g.coups_valides()[0] + 1, 1 + g.nb_pieces % 2) for g in grilles]
+    nb = tours * len(grilles)
+
+    def jouer_annuler():
+        for _ in range(tours):
+            for g, col, piece in coups:
+                g.ajouter_piece(col, piece)
+                g.annuler()
+
+    def gagnant():
+        for _ in range(tours):
+            for g in grilles:
+                g.est_gagnant(1)
+
+    def valides():
+        for _ in range(tours):
+            for g in grilles:
+                g.coups_valides()
+
+    def copier():
+        for _ in range(tours):
+            for g in grilles:
+                g.copier()
+
+    return {
+        "ajouter_piece_annuler": (nb / _chronometrer(jouer_annuler), "op/s"),
+        "est_gagnant": (nb / _chronometrer(gagnant), "op/s"),
+        "coups_valides": (nb / _chronometrer(valides), "op/s"),
+        "copier": (nb / _chronometrer(copier), "op/s"),
+    }
+
+
+def mesurer_evaluation(positions, tours=5):
+    """Évaluations complètes (calculer_score_position) par seconde"""
+    grilles = [grille_depuis_coups(coups) for coups in positions]
+    nb = tours * len(grilles)
+
+    def complete():
+        for _ in range(tours):
+            for g in grilles:
+                calculer_score_position(g, 2)
+
+    return {"calculer_score_position": (nb / _chronometrer(complete), "eval/s")}
+
+
+def mesurer_minimax(positions, profondeur=4):
+    """Noeuds par seconde des trois versions de minimax, à profondeur fixe"""
+    table = TableTransposition()
+    recherches = {
+        "minimax": lambda g, stats: minimax(g, profondeur, float('-inf'), float('inf'), True, stats),
+        "minimax_en_place": lambda g, stats: minimax_en_place(g, profondeur, float('-inf'), float('inf'), True, stats),
+        "minimax_tt": lambda g, stats: minimax_tt(g, profondeur, float('-inf'), float('inf'), True, table, stats),
+    }
+    mesures = {}
+    for nom, recherche in recherches.items():
+        stats = StatistiquesRecherche()
+        for coups in positions:
+            g = grille_depuis_coups(coups)
+            table.vider()
+            stats.demarrer()
+            recherche(g, stats)
+            stats.arreter()
+        mesures[f"{nom}_noeuds"] = (stats.nb_noeuds / stats.temps, "noeuds/s")
+    return mesures
+
+
+def mesurer_profondeurs(positions, profondeur_max=10):
+    """
+    Temps de minimax_tt (table vidée) pour atteindre chaque profondeur, additionné sur
+    les positions, avec le nombre de noeuds, la qualité de l'ordre des coups
+    (coupures au premier coup) et le facteur de branchement effectif
+    """
+    table = TableTransposition()
+    mesures = {}
+    for profondeur in range(1, profondeur_max + 1):
+        stats = StatistiquesRecherche()
+        for coups in positions:
+            grille = grille_depuis_coups(coups)
+            table.vider()
+            stats.demarrer()
+            minimax_tt(grille, profondeur, float('-inf'), float('inf'), grille.nb_pieces % 2 == 1, table, stats)
+            stats.arreter()
+        mesures[f"temps_profondeur_{profondeur}"] = (stats.temps, "s")
+        mesures[f"noeuds_profondeur_{profondeur}"] = (stats.nb_noeuds, "noeuds")
+    mesures["coupures_premier_coup"] = (stats.taux_premier_coup() * 100, "%")
+    mesures["facteur_branchement"] = (stats.facteur_branchement(), "")
+    return mesures
+
+
+def mesurer_entrainement(episodes=2000):
+    """
+    Parties d'entraînement par seconde : même boucle que entrainer_agent (mémoire
+    d'expérience et retours TD(lambda)), sur un agent neuf et sans lire ni écrire de modèle
+    """
+    random.seed(GRAINE)
+    agent = QLearningAgent()
+    memoire = MemoireExperience(graine=GRAINE)
+    debut = time.perf_counter()
+    for _ in range(episodes):
+        historique, gagnant = jouer_partie_entrainement(agent, Grille())
+        apprendre_partie(agent, memoire, historique, gagnant)
+    return {"entrainement": (episodes / (time.perf_counter() - debut), "parties/s")}
+
+
+def perft(grille, profondeur, piece):
+    """Nombre de suites de profondeur coups jouables depuis la grille (une partie finie s'arrête)"""
+    if profondeur == 0:
+        return 1
+    total = 0
+    for col in grille.coups_valides():
+        grille.ajouter_piece(col+1, piece)
+        if profondeur == 1:
+            total += 1
+        elif not grille.est_gagnant(piece) and not grille.est_pleine():
+            total += perft(grille, profondeur-1, 3 - piece)
+        grille.annuler()
+    return total
+
+
+def mesurer_perft(profondeur=6):
+    """Vérifie le générateur de coups avec perft et mesure sa vitesse"""
+    debut = time.perf_counter()
+    noeuds = perft(Grille(), profondeur, 1)
+    duree = time.perf_counter() - debut
+    return {
+        f"perft_{profondeur}": (noeuds, "noeuds"),
+        "perft_noeuds": (noeuds / duree, "noeuds/s"),
+    }
+
+
+def lancer(rapide=False, profondeur_max=10, profondeur_perft=6):
+    """Lance toutes les mesures et retourne les résultats (prêts à écrire en JSON)"""
+    positions = positions_fixes(10 if rapide else 40)
+    mesures = {}
+    print("Opérations de la grille...")
+    mesures.update(mesurer_grille(positions, 50 if rapide else 200))
+    print("Évaluation...")
+    mesures.update(mesurer_evaluation(positions, 1 if rapide else 5))
+    print("Minimax...")
+    mesures.update(mesurer_minimax(positions[:10], 3 if rapide else 4))
+    print("Temps par profondeur...")
+    mesures.update(mesurer_profondeurs([""] + positions[:2], min(profondeur_max, 6) if rapide else profondeur_max))
+    print("Entraînement...")
+    mesures.update(mesurer_entrainement(300 if rapide else 2000))
+    print("Perft...")
+    mesures.update(mesurer_perft(profondeur_perft))
+    return {
+        "infos": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "machine": platform.platform(),
+            "rapide": rapide,
+        },
+        "mesures": {nom: {"valeur": valeur, "unite": unite} for nom, (valeur, unite) in mesures.items()},
+    }
+
+
+def verifier_perft(resultats):
+    """Retourne les erreurs de perft (nombre de noeuds différent de la valeur attendue)"""
+    erreurs = []
+    for nom, mesure in resultats["mesures"].items():
+        if nom.startswith("perft_") and mesure["unite"] == "noeuds":
+            profondeur = int(nom.split("_")[1])
+            attendu = PERFT_ATTENDU.get(profondeur)
+            if attendu is not None and mesure["valeur"] != attendu:
+                erreurs.append(f"{nom} : {mesure['valeur']} noeuds au lieu de {attendu}")
+    return erreurs
+
+
+def comparer(resultats, reference, seuil=SEUIL_REGRESSION):
+    """
+    Compare deux séries de mesures et retourne les régressions de plus de seuil :
+    une vitesse (unité en "/s") qui baisse ou un temps (unité "s") qui augmente
+    """
+    if reference["infos"].get("rapide") != resultats["infos"]["rapide"]:
+        return ["les deux mesures n'ont pas été faites dans le même mode (--rapide)"]
+    regressions = []
+    for nom, mesure in resultats["mesures"].items():
+        ancienne = reference["mesures"].get(nom)
+        if ancienne is None or ancienne["unite"] != mesure["unite"] or not ancienne["valeur"]:
+            continue
+        rapport = mesure["valeur"] / ancienne["valeur"]
+        if mesure["unite"].endswith("/s") and rapport < 1 - seuil:
+            regressions.append(f"{nom} : {ancienne['valeur']:.4g} -> {mesure['valeur']:.4g} {mesure['unite']} ({(rapport - 1)*100:+.1f}%)")
+        elif mesure["unite"] == "s" and rapport > 1 + seuil:
+            regressions.append(f"{nom} : {ancienne['valeur']:.4g} -> {mesure['valeur']:.4g} s ({(rapport - 1)*100:+.1f}%)")
+    return regressions
+
+
+def afficher(resultats):
+    for nom, mesure in resultats["mesures"].items():
+        print(f"{nom:28} {mesure['valeur']:>14,.4g} {mesure['unite']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure la vitesse du jeu, de la recherche et de l'entraînement")
+    parser.add_argument("--sortie", help="fichier JSON où écrire les résultats")
+    parser.add_argument("--reference", help="résultats JSON d'une mesure précédente à comparer")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION, help="ralentissement toléré (0.10 = 10 %%)")
+    parser.add_argument("--rapide", action="store_true", help="moins de positions et de profondeur")
+    parser.add_argument("--profondeur", type=int, default=10, help="profondeur maximale du temps par profondeur")
+    parser.add_argument("--perft", type=int, default=6, help="profondeur de perft")
+    args = parser.parse_args()
+
+    resultats = lancer(args.rapide, args.profondeur, args.perft)
+    afficher(resultats)
+    if args.sortie:
+        with open(args.sortie, "w") as f:
+            json.dump(resultats, f, indent=2)
+        print(f"Résultats écrits dans {args.sortie}")
+
+    problemes = verifier_perft(resultats)
+    if args.reference:
+        with open(args.reference) as f:
+            problemes += comparer(resultats, json.load(f), args.seuil)
+    for probleme in problemes:
+        print(f"⚠️ {probleme}")
+    sys.exit(1 if problemes else 0)
@@ -0,0 +1,144 @@
+# Module pour entraîner l'agent avec plusieurs processus de self-play en parallèle
+import multiprocessing
+import random
+
+import numpy as np
+from tqdm import tqdm
+
+from agent import (QLearningAgent, jouer_partie_entrainement, recompenses_partie,
+                   compter_resultat, afficher_resultats)
+
+
+def _worker(connexion, graine, epsilon, alpha, gamma, symetrie, etats_max):
+    """
+    Boucle d'un processus d'entraînement
+
+    À chaque tour, le worker reçoit (nombre de parties, clés, valeurs fraîches),
+    recopie les valeurs fraîches dans sa table, joue ses parties en apprenant
+    localement, puis renvoie ses résultats et la variation des valeurs Q de
+    chaque état qu'il a modifié (clés canoniques, tableau (n, 7)).
+    """
+    # Import ici pour éviter les problèmes d'importation circulaire
+    from main import Grille
+
+    random.seed(graine)
+    agent = QLearningAgent(alpha=alpha, gamma=gamma, epsilon=epsilon, symetrie=symetrie, etats_max=etats_max)
+    while True:
+        message = connexion.recv()
+        if message is None:
+            break
+        nb_parties, cles_fraiches, valeurs_fraiches = message
+        if len(cles_fraiches):
+            indices = agent.q_table.inserer_lot(cles_fraiches)  # Peut agrandir la table
+            agent.q_table.q[indices] = valeurs_fraiches
+
+        resultats = {"victoires_joueur1": 0, "victoires_joueur2": 0, "matchs_nuls": 0}
+        avant = {}  # Valeurs de chaque état modifié au début du tour
+        for _ in range(nb_parties):
+            historique, gagnant = jouer_partie_entrainement(agent, Grille())
+            compter_resultat(resultats, gagnant)
+            for etat, action, r in recompenses_partie(historique, gagnant):
+                cle, _ = agent.cle_table(etat, action)
+                if cle not in avant:
+                    valeurs = agent.q_table.valeurs(cle)
+                    avant[cle] = valeurs.copy() if valeurs is not None else np.zeros(7, dtype=np.float32)
+                agent.update_q_value(etat, action, r, None, [])
+
+        cles = np.fromiter(avant.keys(), dtype=np.uint64, count=len(avant))
+        indices = agent.q_table.trouver_lot(cles)
+        # Avec une table bornée, un état modifié a pu être oublié depuis : il n'est pas renvoyé
+        gardes = indices >= 0
+        deltas = agent.q_table.q[indices[gardes]] - np.array(list(avant.values()), dtype=np.float32).reshape(-1, 7)[gardes]
+        cles = cles[gardes]
+        connexion.send((resultats, cles, deltas))
+
+
+def entrainer_agent_parallele(episodes=10000, nb_workers=None, parties_par_tour=250,
+                              save_interval=1000, epsilons=None, graine=None, etats_max=None):
+    """
+    Entraîne l'agent avec plusieurs processus qui jouent contre eux-mêmes
+
+    - nb_workers: nombre de processus (par défaut, un par cœur)
+    - parties_par_tour: parties jouées par chaque worker entre deux fusions
+    - epsilons: taux d'exploration de chaque worker (par défaut, répartis de epsilon/2 à 2*epsilon)
+    - graine: graine de départ (chaque worker reçoit la sienne)
+    - etats_max: nombre maximum d'états de la table Q (du coordinateur et de chaque worker)
+
+    Le coordinateur additionne les variations envoyées par les workers dans la
+    table principale, puis renvoie à chacun les valeurs fusionnées des états modifiés.
+    """
+    agent = QLearningAgent(etats_max=etats_max)
+    agent.load_model()
+
+    nb_workers = nb_workers or multiprocessing.cpu_count()
+    if epsilons is None:
+        epsilons = np.linspace(agent.epsilon / 2, agent.epsilon * 2, nb_workers).tolist() if nb_workers > 1 else [agent.epsilon]
+    generateur = random.Random(graine)
+
+    print(f"Début de l'entraînement sur {episodes} parties avec {nb_workers} processus...")
+    resultats = {"victoires_joueur1": 0, "victoires_joueur2": 0, "matchs_nuls": 0}
+
+    connexions, processus = [], []
+    for i in range(nb_workers):
+        connexion, connexion_worker = multiprocessing.Pipe()
+        p = multiprocessing.Process(
+            target=_worker,
+            args=(connexion_worker, generateur.getrandbits(32), epsilons[i], agent.alpha, agent.gamma, agent.symetrie, etats_max),
+            daemon=True,
+        )
+        p.start()
+        connexions.append(connexion)
+        processus.append(p)
+
+    # Au premier tour, chaque worker reçoit toute la table existante
+    cles_fraiches = np.fromiter((cle for cle, _ in agent.q_table.etats()), dtype=np.uint64)
+    valeurs_fraiches = agent.q_table.q[agent.q_table.trouver_lot(cles_fraiches)]
+
+    parties_jouees = 0
+    prochaine_sauvegarde = save_interval
+    barre = tqdm(total=episodes)
+    try:
+        while parties_jouees < episodes:
+            # Répartit exactement les parties restantes de ce tour entre les workers
+            a_jouer = min(episodes - parties_jouees, parties_par_tour * nb_workers)
+            parts = [a_jouer // nb_workers + (1 if i < a_jouer % nb_workers else 0) for i in range(nb_workers)]
+            for connexion, nb in zip(connexions, parts):
+                connexion.send((nb, cles_fraiches, valeurs_fraiches))
+
+            # Fusionne les variations de chaque worker dans la table principale
+            cles_modifiees = []
+            for connexion in connexions:
+                resultats_worker, cles, deltas = connexion.recv()
+                for cle in resultats:
+                    resultats[cle] += resultats_worker[cle]
+                if len(cles):
+                    indices = agent.q_table.inserer_lot(cles)  # Peut agrandir la table
+                    agent.q_table.q[indices] += deltas
+                    cles_modifiees.append(cles)
+
+            cles_fraiches = np.unique(np.concatenate(cles_modifiees)) if cles_modifiees else np.zeros(0, dtype=np.uint64)
+            indices = agent.q_table.trouver_lot(cles_fraiches)
+            cles_fraiches = cles_fraiches[indices >= 0]  # Sauf les états oubliés entre-temps
+            valeurs_fraiches = agent.q_table.q[indices[indices >= 0]]
+
+            parties_jouees += a_jouer
+            barre.update(a_jouer)
+            if parties_jouees >= prochaine_sauvegarde:
+                prochaine_sauvegarde += save_interval * ((parties_jouees - prochaine_sauvegarde) // save_interval + 1)
+                agent.save_model()
+                print(f"\nAprès {parties_jouees} parties:")
+                afficher_resultats(resultats)
+    finally:
+        barre.close()
+        for connexion in connexions:
+            connexion.send(None)
+        for p in processus:
+            p.join()
+
+    # Sauvegarde finale
+    agent.save_model()
+    agent.exporter_modele_fige()
+
+    print("\nEntraînement terminé!")
+    afficher_resultats(resultats)
+    return agent
@@ -0,0 +1,213 @@
+# Module pour faire jouer des milliers de parties d'entraînement en même temps avec NumPy
+import argparse
+
+import numpy as np
+from tqdm import tqdm
+
+from main import HAUTEUR, LARGEUR, HAUTEUR_BITS, BAS, PLATEAU, MASQUES_COLONNES
+from agent import QLearningAgent, afficher_resultats
+
+_DECALAGES = tuple(np.uint64(d) for d in (1, HAUTEUR_BITS, HAUTEUR_BITS - 1, HAUTEUR_BITS + 1))
+
+
+def aligne_quatre_lot(bitboards):
+    """Version vectorisée de aligne_quatre pour un tableau de bitboards uint64"""
+    gagne = np.zeros(len(bitboards), dtype=bool)
+    for decalage in _DECALAGES:
+        m = bitboards & (bitboards >> decalage)
+        gagne |= (m & (m >> (decalage + decalage))) != 0
+    return gagne
+
+
+def positions_gagnantes_lot(pieces, masque):
+    """Version vectorisée de positions_gagnantes pour des tableaux de bitboards uint64"""
+    un, deux, trois = np.uint64(1), np.uint64(2), np.uint64(3)
+    r = (pieces << un) & (pieces << deux) & (pieces << trois)
+    for decalage in _DECALAGES[1:]:
+        p = (pieces << decalage) & (pieces << deux * decalage)
+        r |= p & (pieces << trois * decalage)
+        r |= p & (pieces >> decalage)
+        p = (pieces >> decalage) & (pieces >> deux * decalage)
+        r |= p & (pieces << decalage)
+        r |= p & (pieces >> trois * decalage)
+    return r & (np.uint64(PLATEAU) ^ masque)
+
+
+def _bit_le_plus_bas(bits):
+    return bits & (~bits + np.uint64(1))
+
+
+_MASQUES_COLONNES = np.array(MASQUES_COLONNES, dtype=np.uint64)
+
+
+class EnvironnementLot:
+    def __init__(self, nb_parties, parties_total=None):
+        """
+        Plusieurs parties de Puissance 4 jouées en même temps (le joueur 1 commence)
+
+        nb_parties: nombre de grilles jouées en parallèle
+        parties_total: nombre total de parties à jouer (par défaut, sans limite) ;
+        une partie finie est relancée sur une grille vide tant qu'il en reste à jouer.
+
+        Les grilles sont stockées comme dans Grille : un bitboard par joueur
+        (tableaux uint64) et la hauteur de chaque colonne.
+        """
+        self.nb_parties = nb_parties
+        self.bitboards = np.zeros((3, nb_parties), dtype=np.uint64)  # Index 1 et 2 : pièces de chaque joueur
+        self.hauteurs = np.zeros((nb_parties, LARGEUR), dtype=np.int64)
+        self.nb_pieces = np.zeros(nb_parties, dtype=np.int64)
+        self.en_cours = np.ones(nb_parties, dtype=bool)
+        self.parties_a_lancer = None if parties_total is None else max(parties_total - nb_parties, 0)
+        if parties_total is not None and parties_total < nb_parties:
+            self.en_cours[parties_total:] = False
+
+    def joueurs(self):
+        """Joueur qui doit jouer dans chaque partie"""
+        return 1 + self.nb_pieces % 2
+
+    def masques_valides(self):
+        """Tableau (N, 7) de booléens : True pour les colonnes jouables"""
+        return self.hauteurs < HAUTEUR
+
+    def masques_non_perdants(self):
+        """
+        Tableau (N, 7) de booléens : les colonnes de Grille.coups_non_perdants pour le joueur au trait,
+        ou toutes les colonnes jouables si tous les coups perdent (comme QLearningAgent.choose_action)
+        """
+        au_trait = self.nb_pieces % 2 == 0
+        pieces = np.where(au_trait, self.bitboards[1], self.bitboards[2])
+        masque = self.bitboards[1] | self.bitboards[2]
+        adversaire = pieces ^ masque
+        libres = (masque + np.uint64(BAS)) & np.uint64(PLATEAU)
+        gagnants = positions_gagnantes_lot(pieces, masque) & libres
+        menaces = positions_gagnantes_lot(adversaire, masque)
+        forces = libres & menaces
+        jouables = np.where(forces != 0, forces, libres)
+        surs = jouables & ~(menaces >> np.uint64(1))
+        perdu = (surs == 0) | ((forces & (forces - np.uint64(1))) != 0)
+        choix = np.where(perdu, libres, surs)
+        choix = np.where(gagnants != 0, _bit_le_plus_bas(gagnants), choix)
+        return (choix[:, None] & _MASQUES_COLONNES) != 0
+
+    def cles(self):
+        """Clé de chaque grille, identique à Grille.cle()"""
+        return self.bitboards[1] + (self.bitboards[1] | self.bitboards[2]) + np.uint64(BAS)
+
+    def jouer(self, actions):
+        """
+        Joue une action (de 1 à 7, forcément jouable) dans chaque partie en cours
+
+        actions: tableau de N actions (ignorées pour les parties terminées)
+        Retourne (parties, gagnants, nb_coups) pour les parties qui viennent de se finir :
+        leurs indices, leur gagnant (1 ou 2, ou 0 pour un match nul) et leur nombre de coups.
+        Ces parties sont ensuite relancées sur une grille vide s'il en reste à jouer.
+        """
+        lignes = np.flatnonzero(self.en_cours)
+        colonnes = np.asarray(actions)[lignes] - 1
+        joueurs = 1 + self.nb_pieces[lignes] % 2
+        bits = np.left_shift(np.uint64(1), (colonnes * HAUTEUR_BITS + self.hauteurs[lignes, colonnes]).astype(np.uint64))
+        self.bitboards[joueurs, lignes] |= bits
+        self.hauteurs[lignes, colonnes] += 1
+        self.nb_pieces[lignes] += 1
+
+        # Seul le joueur qui vient de jouer peut avoir gagné
+        gagne = aligne_quatre_lot(self.bitboards[joueurs, lignes])
+        finies = gagne | (self.nb_pieces[lignes] == HAUTEUR * LARGEUR)
+        parties = lignes[finies]
+        gagnants = np.where(gagne[finies], joueurs[finies], 0)
+        nb_coups = self.nb_pieces[parties]
+        self._relancer(parties)
+        return parties, gagnants, nb_coups
+
+    def _relancer(self, parties):
+        """Vide les grilles des parties finies et arrête celles qui dépassent le nombre total"""
+        self.bitboards[:, parties] = 0
+        self.hauteurs[parties] = 0
+        self.nb_pieces[parties] = 0
+        if self.parties_a_lancer is not None:
+            relancees = min(len(parties), self.parties_a_lancer)
+            self.parties_a_lancer -= relancees
+            self.en_cours[parties[relancees:]] = False
+
+
+def entrainer_agent_lot(episodes=10000, taille_lot=1024, save_interval=1000, graine=None, etats_max=None):
+    """
+    Entraîne l'agent en le faisant jouer contre lui-même sur taille_lot parties à la fois
+
+    Mêmes parties et mêmes récompenses que entrainer_agent, mais les actions de tout
+    le lot sont choisies d'un coup et les valeurs Q d'une partie sont mises à jour
+    dès qu'elle se termine. etats_max borne la table Q comme pour entrainer_agent.
+    """
+    agent = QLearningAgent(etats_max=etats_max)
+    agent.load_model()
+
+    print(f"Début de l'entraînement sur {episodes} parties ({taille_lot} à la fois)...")
+    resultats = jouer_parties_lot(agent, episodes, taille_lot, save_interval, np.random.default_rng(graine))
+
+    # Sauvegarde finale
+    agent.save_model()
+    agent.exporter_modele_fige()
+
+    print("\nEntraînement terminé!")
+    afficher_resultats(resultats)
+    return agent
+
+
+def jouer_parties_lot(agent, episodes, taille_lot, save_interval, generateur):
+    """
+    Boucle d'entraînement par lots, pour tout agent qui a choisir_actions_lot,
+    mettre_a_jour_lot et save_model ; retourne les résultats des parties
+    """
+    resultats = {"victoires_joueur1": 0, "victoires_joueur2": 0, "matchs_nuls": 0}
+
+    env = EnvironnementLot(min(taille_lot, episodes), episodes)
+    coups_max = HAUTEUR * LARGEUR
+    etats = np.zeros((env.nb_parties, coups_max), dtype=np.uint64)
+    actions_jouees = np.zeros((env.nb_parties, coups_max), dtype=np.int64)
+    toutes = np.arange(env.nb_parties)
+    rang = np.arange(coups_max)
+
+    parties_jouees = 0
+    prochaine_sauvegarde = save_interval
+    barre = tqdm(total=episodes)
+    while env.en_cours.any():
+        cles = env.cles()
+        actions = agent.choisir_actions_lot(cles, env.masques_non_perdants(), generateur)
+        etats[toutes, env.nb_pieces] = cles
+        actions_jouees[toutes, env.nb_pieces] = actions
+        parties, gagnants, nb_coups = env.jouer(actions)
+        if not parties.size:
+            continue
+
+        # Coups des parties finies, du dernier au premier (comme recompenses_partie)
+        numeros = nb_coups[:, None] - 1 - rang
+        valides = numeros >= 0
+        numeros = np.maximum(numeros, 0)
+        joueurs_coups = 1 + numeros % 2
+        rewards = np.where(gagnants[:, None] == 0, 0, np.where(joueurs_coups == gagnants[:, None], 1, -1))
+        agent.mettre_a_jour_lot(etats[parties[:, None], numeros][valides],
+                                actions_jouees[parties[:, None], numeros][valides],
+                                rewards[valides])
+
+        for gagnant, nb in zip(*np.unique(gagnants, return_counts=True)):
+            cle = ("matchs_nuls", "victoires_joueur1", "victoires_joueur2")[gagnant]
+            resultats[cle] += int(nb)
+        parties_jouees += len(parties)
+        barre.update(len(parties))
+        if parties_jouees >= prochaine_sauvegarde:
+            prochaine_sauvegarde += save_interval * ((parties_jouees - prochaine_sauvegarde) // save_interval + 1)
+            agent.save_model()
+            print(f"\nAprès {parties_jouees} parties:")
+            afficher_resultats(resultats)
+    barre.close()
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraîne l'agent sur beaucoup de parties jouées en même temps")
+    parser.add_argument("--parties", type=int, default=10000)
+    parser.add_argument("--lot", type=int, default=1024, help="nombre de parties jouées en même temps")
+    parser.add_argument("--graine", type=int, default=None)
+    parser.add_argument("--etats-max", type=int, default=None, help="nombre maximum d'états de la table Q")
+    args = parser.parse_args()
+    entrainer_agent_lot(args.parties, args.lot, graine=args.graine, etats_max=args.etats_max)
@@ -0,0 +1,112 @@
+# Module pour évaluer beaucoup de positions d'un coup avec NumPy
+import numpy as np
+
+from main import FENETRES, HAUTEUR, LARGEUR, HAUTEUR_BITS, COLONNE_CENTRALE, VALEUR_FENETRE
+
+# Pour chaque fenêtre, les 4 cases en indices "à plat" d'un tableau 6x7 (ligne 0 en haut)
+INDICES_FENETRES = np.array(
+    [[(HAUTEUR - 1 - indice % HAUTEUR_BITS) * LARGEUR + indice // HAUTEUR_BITS for indice in fenetre]
+     for fenetre in FENETRES],
+    dtype=np.intp,
+)
+# Score d'une fenêtre indexé par [pièces du joueur, pièces de l'adversaire]
+TABLE_VALEURS = np.array(VALEUR_FENETRE, dtype=np.int64)
+# Position dans le bitboard de chaque case du tableau 6x7
+DECALAGES_CASES = np.array(
+    [colonne * HAUTEUR_BITS + HAUTEUR - 1 - ligne for ligne in range(HAUTEUR) for colonne in range(LARGEUR)],
+    dtype=np.int64,
+)
+
+
+def grilles_vers_tableau(grilles):
+    """Convertit une liste de Grille en tableau (N, 6, 7) int8 (0 = vide, 1 ou 2 = pièce)"""
+    bitboards = np.array([[g.bitboards[1], g.bitboards[2]] for g in grilles], dtype=np.int64).reshape(-1, 2)
+    bits = (bitboards[:, :, None] >> DECALAGES_CASES) & 1
+    return (bits[:, 0] + 2 * bits[:, 1]).astype(np.int8).reshape(-1, HAUTEUR, LARGEUR)
+
+
+def calculer_scores_lot(grilles, piece):
+    """
+    Évalue N positions en un seul appel
+
+    grilles: tableau (N, 6, 7) int8 (mêmes conventions que Grille.grille)
+    Retourne un tableau de N scores, identiques à calculer_score_position.
+    """
+    grilles = np.asarray(grilles, dtype=np.int8)
+    fenetres = grilles.reshape(len(grilles), HAUTEUR * LARGEUR)[:, INDICES_FENETRES]  # (N, 69, 4)
+    pieces_joueur = (fenetres == piece).sum(axis=2)
+    pieces_adversaire = (fenetres == 3 - piece).sum(axis=2)
+    scores = TABLE_VALEURS[pieces_joueur, pieces_adversaire].sum(axis=1)
+    # Favorise les pièces au centre
+    scores += (grilles[:, :, COLONNE_CENTRALE] == piece).sum(axis=1) * 3
+    return scores
+
+
+def _scores_enfants(grille, coups_valides, piece):
+    """Valeurs Minimax (IA = joueur 2) des enfants d'une grille pour les coups donnés, évaluées en un seul lot"""
+    enfants = np.repeat(grilles_vers_tableau([grille]), len(coups_valides), axis=0)
+    valeurs = [None] * len(coups_valides)
+    a_evaluer = []
+    for k, col in enumerate(coups_valides):
+        enfants[k, HAUTEUR - 1 - grille.hauteurs[col], col] = piece
+        # Les positions terminales gardent leur valeur exacte
+        grille.ajouter_piece(col+1, piece)
+        if grille.est_gagnant(2):
+            valeurs[k] = 1000000
+        elif grille.est_gagnant(1):
+            valeurs[k] = -1000000
+        elif grille.est_pleine():
+            valeurs[k] = 0
+        else:
+            a_evaluer.append(k)
+        grille.annuler()
+    if a_evaluer:
+        for k, score in zip(a_evaluer, calculer_scores_lot(enfants[a_evaluer], 2).tolist()):
+            valeurs[k] = score
+    return valeurs
+
+
+def minimax_lot(grille, profondeur, alpha, beta, maximisant):
+    """
+    Minimax alpha-beta où tous les enfants d'un noeud du dernier niveau
+    sont évalués en un seul lot NumPy. Même résultat (colonne, score) que minimax.
+    """
+    coups_valides = grille.coups_valides()
+    if grille.est_gagnant(2):
+        return (None, 1000000)
+    if grille.est_gagnant(1):
+        return (None, -1000000)
+    if not coups_valides:
+        return (None, 0)
+    if profondeur == 0:
+        return (None, int(calculer_scores_lot(grilles_vers_tableau([grille]), 2)[0]))
+
+    # Mêmes coups que minimax : gagner, bloquer, ne pas offrir une case gagnante
+    piece = 2 if maximisant else 1
+    coups_valides = grille.coups_non_perdants(piece)
+    if not coups_valides:
+        return grille.coups_valides()[0]+1, (-1000000 if maximisant else 1000000)  # Tous les coups perdent
+    if profondeur == 1:
+        valeurs = _scores_enfants(grille, coups_valides, piece)
+    valeur = float('-inf') if maximisant else float('inf')
+    colonne = coups_valides[0]
+    for k, col in enumerate(coups_valides):
+        if profondeur == 1:
+            nouveau_score = valeurs[k]
+        else:
+            grille.ajouter_piece(col+1, piece)
+            nouveau_score = minimax_lot(grille, profondeur-1, alpha, beta, not maximisant)[1]
+            grille.annuler()
+        if maximisant:
+            if nouveau_score > valeur:
+                valeur = nouveau_score
+                colonne = col
+            alpha = max(alpha, valeur)
+        else:
+            if nouveau_score < valeur:
+                valeur = nouveau_score
+                colonne = col
+            beta = min(beta, valeur)
+        if alpha >= beta:
+            break
+    return colonne+1, valeur
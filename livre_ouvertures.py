@@ -0,0 +1,162 @@
+# Module pour le livre d'ouvertures : meilleurs coups des premières positions, calculés une fois pour toutes
+import argparse
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from main import grille_depuis_coups
+from recherche import minimax_tt
+from table_q import cle_canonique
+from transposition import TableTransposition
+
+FICHIER_LIVRE = 'livre_ouvertures.bin'
+
+# Une entrée = clé canonique de la position, meilleur coup (colonne 0 à 6 dans
+# l'orientation canonique) et score Minimax (positif = bon pour le joueur 2) : 13 octets
+ENTREE = np.dtype([('cle', '<u8'), ('coup', 'u1'), ('score', '<i4')])
+
+# Fichier : en-tête (magique, version, nombre de coups des positions, profondeur de
+# recherche, nombre d'entrées) puis les entrées triées par clé
+MAGIQUE = b'P4LIVRE\0'
+VERSION = 1
+EN_TETE = struct.Struct('<8sIIIQ')
+
+
+class LivreOuvertures:
+    def __init__(self, entrees, plies, profondeur):
+        """
+        Livre d'ouvertures consulté avant de lancer une recherche
+
+        entrees: tableau ENTREE trié par clé (les recherches se font par dichotomie)
+        plies: les positions jusqu'à ce nombre de coups joués sont dans le livre
+        profondeur: profondeur de la recherche Minimax qui a calculé chaque entrée
+        """
+        self.entrees = entrees
+        self.cles = entrees['cle']
+        self.plies = plies
+        self.profondeur = profondeur
+
+    def __len__(self):
+        return len(self.entrees)
+
+    def _indice(self, cle):
+        """Indice de l'entrée de la clé (canonique), ou -1 si elle est absente"""
+        i = int(np.searchsorted(self.cles, np.uint64(cle)))
+        if i < len(self.cles) and self.cles[i] == cle:
+            return i
+        return -1
+
+    def consulter(self, grille):
+        """Retourne (colonne de 1 à 7, score) pour le joueur au trait, ou None si la position est absente"""
+        if grille.nb_pieces > self.plies:
+            return None
+        cle, miroir = cle_canonique(grille.cle())
+        i = self._indice(cle)
+        if i < 0:
+            return None
+        coup = int(self.entrees['coup'][i])
+        return (6 - coup if miroir else coup) + 1, int(self.entrees['score'][i])
+
+    @classmethod
+    def ouvrir(cls, fichier=FICHIER_LIVRE):
+        """Ouvre un livre en projetant le fichier en mémoire (rien n'est copié)"""
+        with open(fichier, 'rb') as f:
+            magique, version, plies, profondeur, nb = EN_TETE.unpack(f.read(EN_TETE.size))
+        if magique != MAGIQUE or version != VERSION:
+            raise ValueError(f"{fichier} n'est pas un livre d'ouvertures")
+        entrees = np.memmap(fichier, dtype=ENTREE, mode='r', offset=EN_TETE.size, shape=(nb,)) if nb else np.zeros(0, dtype=ENTREE)
+        return cls(entrees, plies, profondeur)
+
+    def sauvegarder(self, fichier=FICHIER_LIVRE):
+        """Écrit le livre dans un fichier temporaire puis le renomme (jamais de fichier à moitié écrit)"""
+        temporaire = fichier + '.tmp'
+        with open(temporaire, 'wb') as f:
+            f.write(EN_TETE.pack(MAGIQUE, VERSION, self.plies, self.profondeur, len(self.entrees)))
+            f.write(self.entrees.tobytes())
+        os.replace(temporaire, fichier)
+
+
+_livre_charge = {}
+
+
+def charger_livre(fichier=FICHIER_LIVRE):
+    """Ouvre le livre une seule fois par processus ; retourne None s'il n'existe pas"""
+    if fichier not in _livre_charge:
+        _livre_charge[fichier] = LivreOuvertures.ouvrir(fichier) if os.path.exists(fichier) else None
+    return _livre_charge[fichier]
+
+
+def positions_jusqua(plies):
+    """
+    Toutes les positions non terminées d'au plus plies coups, une seule par paire
+    de positions symétriques. Retourne les coups qui y mènent ("4453...").
+    """
+    positions = []
+    niveau = [""]
+    for ply in range(plies + 1):
+        positions += niveau
+        if ply == plies:
+            break
+        suivant = {}
+        piece = 1 + ply % 2
+        for coups in niveau:
+            grille = grille_depuis_coups(coups)
+            for col in grille.coups_valides():
+                grille.ajouter_piece(col+1, piece)
+                if not grille.est_gagnant(piece) and not grille.est_pleine():
+                    suivant.setdefault(cle_canonique(grille.cle())[0], coups + str(col+1))
+                grille.annuler()
+        niveau = list(suivant.values())
+    return positions
+
+
+# Table de transposition du worker (créée une seule fois par processus)
+_table = None
+
+
+def _analyser(coups, profondeur):
+    """Cherche le meilleur coup d'une position dans un worker et retourne (clé canonique, coup, score)"""
+    global _table
+    if _table is None:
+        _table = TableTransposition()
+    _table.vider()  # Chaque position est analysée de la même façon, quel que soit le worker
+    grille = grille_depuis_coups(coups)
+    col, score = minimax_tt(grille, profondeur, float('-inf'), float('inf'), grille.nb_pieces % 2 == 1, _table)
+    cle, miroir = cle_canonique(grille.cle())
+    coup = col - 1
+    return cle, 6 - coup if miroir else coup, score
+
+
+def construire_livre(plies=4, profondeur=8, nb_workers=None, fichier=FICHIER_LIVRE):
+    """
+    Analyse toutes les positions jusqu'à plies coups avec Minimax à la profondeur
+    donnée, en répartissant les positions entre plusieurs processus, puis écrit le livre
+    """
+    positions = positions_jusqua(plies)
+    nb_workers = nb_workers or os.cpu_count() or 1
+    print(f"Analyse de {len(positions)} positions à la profondeur {profondeur} avec {nb_workers} processus...")
+    debut = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=nb_workers) as executeur:
+        resultats = list(executeur.map(_analyser, positions, [profondeur] * len(positions),
+                                       chunksize=max(1, len(positions) // (16 * nb_workers))))
+
+    entrees = np.array(resultats, dtype=ENTREE)
+    entrees.sort(order='cle')
+    livre = LivreOuvertures(entrees, plies, profondeur)
+    livre.sauvegarder(fichier)
+    print(f"Livre écrit dans {fichier} : {len(entrees)} positions, "
+          f"{os.path.getsize(fichier)} octets, en {time.perf_counter() - debut:.1f} s")
+    return livre
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit le livre d'ouvertures")
+    parser.add_argument("--plies", type=int, default=4, help="nombre de coups des positions analysées")
+    parser.add_argument("--profondeur", type=int, default=8, help="profondeur de la recherche Minimax")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut, un par cœur)")
+    parser.add_argument("--fichier", default=FICHIER_LIVRE)
+    args = parser.parse_args()
+    construire_livre(args.plies, args.profondeur, args.workers, args.fichier)
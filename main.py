@@ -1,5 +1,8 @@
 # Jeu de Puissance 4 avec IA
 from agent import *
+from transposition import ZOBRIST
+from statistiques import StatistiquesRecherche
+from modele_fige import charger_agent
 
 class Couleur:
     ROUGE = '\033[91m'
@@ -9,24 +12,137 @@ class Couleur:
     FOND_BLEU = '\033[44m'
     BLANC = '\033[97m'
 
+# Représentation bitboard : chaque colonne occupe 7 bits (6 cases + 1 bit sentinelle),
+# le bit d'index colonne*7 + ligne correspond à la case (ligne 0 = en bas).
+HAUTEUR = 6
+LARGEUR = 7
+HAUTEUR_BITS = HAUTEUR + 1
+# Bit du bas de chaque colonne
+BAS = sum(1 << (colonne * HAUTEUR_BITS) for colonne in range(LARGEUR))
+
+# Colonnes jouables pour chaque combinaison de colonnes pleines (évite de reconstruire une liste)
+_COUPS_PAR_MASQUE = tuple(
+    tuple(colonne for colonne in range(LARGEUR) if not masque >> colonne & 1)
+    for masque in range(1 << LARGEUR)
+)
+
+
+def aligne_quatre(bitboard):
+    """Vérifie si un bitboard contient 4 pièces alignées (quelques décalages et ET logiques)"""
+    # Décalages : 1 = vertical, 7 = horizontal, 6 = diagonale \, 8 = diagonale /
+    for decalage in (1, HAUTEUR_BITS, HAUTEUR_BITS - 1, HAUTEUR_BITS + 1):
+        m = bitboard & (bitboard >> decalage)
+        if m & (m >> (2 * decalage)):
+            return True
+    return False
+
+
+# Toutes les cases de la grille (sans le bit sentinelle de chaque colonne)
+PLATEAU = BAS * ((1 << HAUTEUR) - 1)
+
+
+def positions_gagnantes(pieces, masque):
+    """
+    Cases vides (bitboard) où une pièce de plus donnerait 4 alignées au joueur qui a les pièces pieces
+
+    masque: toutes les cases occupées. Les cases renvoyées ne sont pas forcément jouables tout de suite.
+    """
+    # Vertical : 3 pièces juste en dessous
+    r = (pieces << 1) & (pieces << 2) & (pieces << 3)
+    # Horizontal et diagonales : la case peut compléter la ligne à une extrémité ou au milieu
+    for decalage in (HAUTEUR_BITS, HAUTEUR_BITS - 1, HAUTEUR_BITS + 1):
+        p = (pieces << decalage) & (pieces << 2 * decalage)
+        r |= p & (pieces << 3 * decalage)
+        r |= p & (pieces >> decalage)
+        p = (pieces >> decalage) & (pieces >> 2 * decalage)
+        r |= p & (pieces << decalage)
+        r |= p & (pieces >> 3 * decalage)
+    return r & (PLATEAU ^ masque)
+
+
+# Cases de chaque colonne
+MASQUES_COLONNES = tuple(((1 << HAUTEUR) - 1) << (colonne * HAUTEUR_BITS) for colonne in range(LARGEUR))
+
+
+def coups_utiles(pieces, masque):
+    """
+    Cases (bitboard) des coups qui valent la peine d'être joués par le joueur qui a les pièces pieces :
+    - s'il peut gagner tout de suite, seulement ce coup
+    - si l'adversaire menace de gagner au prochain coup, seulement le blocage
+    - jamais un coup juste sous une case gagnante de l'adversaire
+    Retourne 0 si tous les coups perdent (deux menaces par exemple) : l'adversaire gagne au coup suivant.
+    """
+    jouables = (masque + BAS) & PLATEAU
+    gagnants = positions_gagnantes(pieces, masque) & jouables
+    if gagnants:
+        return gagnants & -gagnants
+    menaces = positions_gagnantes(pieces ^ masque, masque)
+    forces = jouables & menaces
+    if forces:
+        if forces & (forces - 1):
+            return 0
+        jouables = forces
+    return jouables & ~(menaces >> 1)
+
+
+# Les 69 fenêtres de 4 cases (horizontales, verticales, diagonales), en indices de bits
+FENETRES = tuple(
+    tuple((colonne + k * dc) * HAUTEUR_BITS + ligne + k * dl for k in range(4))
+    for dc, dl in ((1, 0), (0, 1), (1, 1), (1, -1))
+    for colonne in range(LARGEUR)
+    for ligne in range(HAUTEUR)
+    if 0 <= colonne + 3 * dc < LARGEUR and 0 <= ligne + 3 * dl < HAUTEUR
+)
+# Fenêtres qui passent par chaque case (indexé par indice de bit)
+FENETRES_PAR_CASE = tuple(
+    tuple(f for f, fenetre in enumerate(FENETRES) if indice in fenetre)
+    for indice in range(LARGEUR * HAUTEUR_BITS)
+)
+COLONNE_CENTRALE = 3
+
+
 class Grille:
     def __init__(self):
-        # Grille de 6 par 7
-        self.grille = [[0 for _ in range(7)] for _ in range(6)]
-        self.largeur = len(self.grille[0])
-        self.hauteur = len(self.grille)
+        # Grille de 6 par 7 stockée sous forme de deux bitboards (un par joueur)
+        self.largeur = LARGEUR
+        self.hauteur = HAUTEUR
+        self.bitboards = [0, 0, 0]  # Index 1 et 2 : pièces de chaque joueur
+        self.hauteurs = [0] * LARGEUR  # Nombre de pièces dans chaque colonne
+        self.colonnes_pleines = 0  # Bit j à 1 si la colonne j est pleine
+        self.nb_pieces = 0
+        self.historique = []  # Pile des colonnes jouées (0 à 6), pour annuler les coups
+        self.hash = 0  # Clé de Zobrist de la position, mise à jour à chaque coup
+        self.hash_miroir = 0  # Clé de Zobrist de la position symétrique (gauche-droite)
+        # Nombre de pièces de chaque joueur dans chacune des 69 fenêtres,
+        # et score de calculer_score_position tenu à jour pour chaque joueur
+        self.comptes = [None, [0] * len(FENETRES), [0] * len(FENETRES)]
+        self.scores = [0, 0, 0]
+
+    @property
+    def grille(self):
+        # Vue 6x7 (ligne 0 en haut) reconstruite à partir des bitboards
+        b1, b2 = self.bitboards[1], self.bitboards[2]
+        lignes = []
+        for i in range(self.hauteur):
+            ligne = []
+            for j in range(self.largeur):
+                bit = 1 << (j * HAUTEUR_BITS + self.hauteur - 1 - i)
+                ligne.append(1 if b1 & bit else 2 if b2 & bit else 0)
+            lignes.append(ligne)
+        return lignes
     
     def __str__(self):
         # Affiche la grille avec un style amélioré
+        grille = self.grille
         s = Couleur.BLEU + "\n  1   2   3   4   5   6   7\n"+ Couleur.FIN
         s += Couleur.BLEU + "┌" + "───┬" * (self.largeur-1) + "───┐" + Couleur.FIN + "\n"
         
         for i in range(self.hauteur):
             s += Couleur.BLEU + "│" + Couleur.FIN
             for j in range(self.largeur):
-                if self.grille[i][j] == 0:
+                if grille[i][j] == 0:
                     s += "   "
-                elif self.grille[i][j] == 1:
+                elif grille[i][j] == 1:
                     s += " " + Couleur.ROUGE + "X" + Couleur.FIN + " "
                 else:
                     s += " " + Couleur.JAUNE + "O" + Couleur.FIN + " "
@@ -43,59 +159,112 @@ class Grille:
     def ajouter_piece(self, colonne, piece):
         # Ajoute une pièce dans la grille
         colonne -= 1  # Ajuste l'index de la colonne
-        for i in range(self.hauteur-1, -1, -1):
-            if self.grille[i][colonne] == 0:
-                self.grille[i][colonne] = piece
-                return True
-        return False
-    
+        if colonne < 0 or colonne >= self.largeur:
+            return False
+        ligne = self.hauteurs[colonne]
+        if ligne >= self.hauteur:
+            return False
+        indice = colonne * HAUTEUR_BITS + ligne
+        self.bitboards[piece] |= 1 << indice
+        self.hash ^= ZOBRIST[piece][indice]
+        self.hash_miroir ^= ZOBRIST[piece][(self.largeur - 1 - colonne) * HAUTEUR_BITS + ligne]
+        self._mettre_a_jour_scores(colonne, indice, piece, 1)
+        self.hauteurs[colonne] = ligne + 1
+        if ligne + 1 == self.hauteur:
+            self.colonnes_pleines |= 1 << colonne
+        self.nb_pieces += 1
+        self.historique.append(colonne)
+        return True
+
+    def annuler(self):
+        # Retire la dernière pièce jouée et retourne sa colonne (de 1 à 7)
+        colonne = self.historique.pop()
+        ligne = self.hauteurs[colonne] - 1
+        indice = colonne * HAUTEUR_BITS + ligne
+        piece = 1 if self.bitboards[1] >> indice & 1 else 2
+        self.bitboards[piece] ^= 1 << indice
+        self.hash ^= ZOBRIST[piece][indice]
+        self.hash_miroir ^= ZOBRIST[piece][(self.largeur - 1 - colonne) * HAUTEUR_BITS + ligne]
+        self._mettre_a_jour_scores(colonne, indice, piece, -1)
+        self.hauteurs[colonne] = ligne
+        self.colonnes_pleines &= ~(1 << colonne)
+        self.nb_pieces -= 1
+        return colonne + 1
+    
+    def _mettre_a_jour_scores(self, colonne, indice, piece, sens):
+        # Met à jour les fenêtres passant par la case (sens = 1 pour un ajout, -1 pour un retrait)
+        comptes_joueur = self.comptes[piece]
+        comptes_adversaire = self.comptes[3 - piece]
+        delta_joueur = 3 * sens if colonne == COLONNE_CENTRALE else 0  # Bonus du centre
+        delta_adversaire = 0
+        for f in FENETRES_PAR_CASE[indice]:
+            avant = comptes_joueur[f]
+            apres = avant + sens
+            adverse = comptes_adversaire[f]
+            delta_joueur += VALEUR_FENETRE[apres][adverse] - VALEUR_FENETRE[avant][adverse]
+            delta_adversaire += VALEUR_FENETRE[adverse][apres] - VALEUR_FENETRE[adverse][avant]
+            comptes_joueur[f] = apres
+        self.scores[piece] += delta_joueur
+        self.scores[3 - piece] += delta_adversaire
+
+    def joueur_au_trait(self):
+        # Joueur qui doit jouer le prochain coup (le joueur 1 commence)
+        return 1 + self.nb_pieces % 2
+
     def est_pleine(self):
         # Vérifie si la grille est pleine
-        for i in range(self.hauteur):
-            for j in range(self.largeur):
-                if self.grille[i][j] == 0:
-                    return False
-        return True
+        return self.nb_pieces == self.largeur * self.hauteur
     
     def est_gagnant(self, piece):
         # Vérifie s'il y a un gagnant
-        # Vérifie les lignes
-        for i in range(self.hauteur):
-            for j in range(self.largeur-3):
-                if self.grille[i][j] == piece and self.grille[i][j+1] == piece and self.grille[i][j+2] == piece and self.grille[i][j+3] == piece:
-                    return True
-        # Vérifie les colonnes
-        for i in range(self.hauteur-3):
-            for j in range(self.largeur):
-                if self.grille[i][j] == piece and self.grille[i+1][j] == piece and self.grille[i+2][j] == piece and self.grille[i+3][j] == piece:
-                    return True
-        # Vérifie les diagonales
-        for i in range(self.hauteur-3):
-            for j in range(self.largeur-3):
-                if self.grille[i][j] == piece and self.grille[i+1][j+1] == piece and self.grille[i+2][j+2] == piece and self.grille[i+3][j+3] == piece:
-                    return True
-        for i in range(3, self.hauteur):
-            for j in range(self.largeur-3):
-                if self.grille[i][j] == piece and self.grille[i-1][j+1] == piece and self.grille[i-2][j+2] == piece and self.grille[i-3][j+3] == piece:
-                    return True
-        return False
+        return aligne_quatre(self.bitboards[piece])
     
     def coups_valides(self):
-        # Retourne les colonnes valides (où on peut encore jouer)
-        coups_valides = []
-        for i in range(self.largeur):
-            if self.grille[0][i] == 0:  # Si la première ligne de la colonne est vide
-                coups_valides.append(i)
-        return coups_valides
+        # Retourne les colonnes valides (où on peut encore jouer), sous forme de tuple précalculé
+        return _COUPS_PAR_MASQUE[self.colonnes_pleines]
+
+    def cases_gagnantes(self, piece):
+        # Cases vides (bitboard) où piece alignerait 4 pièces
+        return positions_gagnantes(self.bitboards[piece], self.bitboards[1] | self.bitboards[2])
+
+    def coups_non_perdants(self, piece):
+        # Colonnes (0 à 6) de coups_utiles pour piece, dans le même ordre que coups_valides
+        # (vide si tous les coups perdent)
+        coups = _COUPS_PAR_MASQUE[self.colonnes_pleines]
+        masque = self.bitboards[1] | self.bitboards[2]
+        utiles = coups_utiles(self.bitboards[piece], masque)
+        if utiles == (masque + BAS) & PLATEAU:
+            return coups
+        return tuple(col for col in coups if utiles & MASQUES_COLONNES[col])
+
+    def cle(self):
+        # Entier unique (49 bits) identifiant la position : pièces du joueur 1 + cases occupées + bas des colonnes
+        return self.bitboards[1] + (self.bitboards[1] | self.bitboards[2]) + BAS
 
     def copier(self):
-        # Crée une copie de la grille actuelle
-        grille_copie = Grille()
-        for i in range(self.hauteur):
-            for j in range(self.largeur):
-                grille_copie.grille[i][j] = self.grille[i][j]
+        # Crée une copie de la grille actuelle (de la même classe)
+        grille_copie = self.__class__.__new__(self.__class__)
+        grille_copie.largeur = self.largeur
+        grille_copie.hauteur = self.hauteur
+        grille_copie.bitboards = self.bitboards[:]
+        grille_copie.hauteurs = self.hauteurs[:]
+        grille_copie.colonnes_pleines = self.colonnes_pleines
+        grille_copie.nb_pieces = self.nb_pieces
+        grille_copie.historique = self.historique[:]
+        grille_copie.hash = self.hash
+        grille_copie.hash_miroir = self.hash_miroir
+        grille_copie.comptes = [None, self.comptes[1][:], self.comptes[2][:]]
+        grille_copie.scores = self.scores[:]
         return grille_copie
 
+
+def grille_depuis_coups(coups):
+    """Rejoue une suite de coups (colonnes de 1 à 7, le joueur 1 commence)"""
+    grille = Grille()
+    for i, col in enumerate(coups):
+        grille.ajouter_piece(int(col), 1 + i % 2)
+    return grille
+
 # Fonctions pour l'IA
 
 def evaluer_fenetre(fenetre, piece):
@@ -117,24 +286,37 @@ def evaluer_fenetre(fenetre, piece):
         
     return score
 
+# Score d'une fenêtre selon le nombre de pièces du joueur et de l'adversaire qu'elle contient
+VALEUR_FENETRE = [
+    [evaluer_fenetre([1] * joueur + [2] * adversaire + [0] * (4 - joueur - adversaire), 1) if joueur + adversaire <= 4 else 0
+     for adversaire in range(5)]
+    for joueur in range(5)
+]
+
 def calculer_score_position(grille, piece):
-    """Évalue le score total d'une position pour un joueur donné"""
+    """
+    Évalue le score total d'une position pour un joueur donné
+
+    Version de référence qui relit toute la grille : pendant la recherche,
+    le même score est tenu à jour par la grille dans grille.scores[piece].
+    """
     score = 0
+    cases = grille.grille  # Vue 6x7 reconstruite une seule fois
     
     # Favorise les pièces au centre (colonne 4)
-    colonne_centrale = [grille.grille[i][3] for i in range(grille.hauteur)]
+    colonne_centrale = [cases[i][3] for i in range(grille.hauteur)]
     score += colonne_centrale.count(piece) * 3
     
     # Évalue les lignes
     for i in range(grille.hauteur):
-        ligne = [grille.grille[i][j] for j in range(grille.largeur)]
+        ligne = [cases[i][j] for j in range(grille.largeur)]
         for j in range(grille.largeur - 3):
             fenetre = ligne[j:j+4]
             score += evaluer_fenetre(fenetre, piece)
     
     # Évalue les colonnes
     for j in range(grille.largeur):
-        colonne = [grille.grille[i][j] for i in range(grille.hauteur)]
+        colonne = [cases[i][j] for i in range(grille.hauteur)]
         for i in range(grille.hauteur - 3):
             fenetre = colonne[i:i+4]
             score += evaluer_fenetre(fenetre, piece)
@@ -142,13 +324,13 @@ def calculer_score_position(grille, piece):
     # Évalue les diagonales montantes (/)
     for i in range(grille.hauteur - 3):
         for j in range(grille.largeur - 3):
-            fenetre = [grille.grille[i+k][j+k] for k in range(4)]
+            fenetre = [cases[i+k][j+k] for k in range(4)]
             score += evaluer_fenetre(fenetre, piece)
     
     # Évalue les diagonales descendantes (\)
     for i in range(grille.hauteur - 3):
         for j in range(grille.largeur - 3):
-            fenetre = [grille.grille[i+3-k][j+k] for k in range(4)]
+            fenetre = [cases[i+3-k][j+k] for k in range(4)]
             score += evaluer_fenetre(fenetre, piece)
     
     return score
@@ -157,7 +339,7 @@ def est_noeud_terminal(grille):
     """Vérifie si la partie est terminée"""
     return grille.est_gagnant(1) or grille.est_gagnant(2) or len(grille.coups_valides()) == 0
 
-def minimax(grille, profondeur, alpha, beta, maximisant):
+def minimax(grille, profondeur, alpha, beta, maximisant, stats=None):
     """
     Algorithme Minimax avec élagage Alpha-Beta
     
@@ -165,13 +347,21 @@ def minimax(grille, profondeur, alpha, beta, maximisant):
     - profondeur: nombre de coups à anticiper
     - alpha, beta: paramètres pour l'élagage
     - maximisant: True si c'est au tour de l'IA, False sinon
+    - stats: StatistiquesRecherche à remplir (optionnel)
     """
     # On récupère les colonnes où on peut jouer
     coups_valides = grille.coups_valides()
+    if stats is not None:
+        stats.noeuds[profondeur] += 1
     
     # Si on a atteint la profondeur max ou si le jeu est terminé
     est_terminal = est_noeud_terminal(grille)
     if profondeur == 0 or est_terminal:
+        if stats is not None:
+            if est_terminal:
+                stats.terminaux += 1
+            else:
+                stats.evaluations += 1
         if est_terminal:
             # Si l'IA gagne
             if grille.est_gagnant(2):  # 2 pour l'IA
@@ -184,7 +374,13 @@ def minimax(grille, profondeur, alpha, beta, maximisant):
                 return (None, 0)
         # Si on a atteint la profondeur maximale
         else:
-            return (None, calculer_score_position(grille, 2))
+            return (None, grille.scores[2])
+
+    # On ne garde que les coups utiles : gagner, bloquer, ne pas offrir une case gagnante
+    coups_valides = grille.coups_non_perdants(2 if maximisant else 1)
+    # S'il n'en reste aucun, l'adversaire gagne au coup suivant quoi qu'on joue
+    if not coups_valides:
+        return grille.coups_valides()[0]+1, (-1000000 if maximisant else 1000000)
     
     # Si c'est au tour de l'IA (maximisant)
     if maximisant:
@@ -192,7 +388,7 @@ def minimax(grille, profondeur, alpha, beta, maximisant):
         colonne = coups_valides[0] if coups_valides else 0  # Colonne par défaut
         
         # On teste chaque colonne possible
-        for col in coups_valides:
+        for rang, col in enumerate(coups_valides):
             # On crée une copie de la grille pour simuler le coup
             grille_copie = grille.copier()
             
@@ -200,7 +396,7 @@ def minimax(grille, profondeur, alpha, beta, maximisant):
             grille_copie.ajouter_piece(col+1, 2)  # 2 pour l'IA
             
             # On évalue ce coup avec minimax récursivement
-            nouveau_score = minimax(grille_copie, profondeur-1, alpha, beta, False)[1]
+            nouveau_score = minimax(grille_copie, profondeur-1, alpha, beta, False, stats)[1]
             
             # Si ce coup est meilleur, on le garde
             if nouveau_score > valeur:
@@ -212,6 +408,8 @@ def minimax(grille, profondeur, alpha, beta, maximisant):
             
             # Élagage Alpha-Beta
             if alpha >= beta:
+                if stats is not None:
+                    stats.coupure(rang)
                 break
                 
         return colonne+1, valeur  # +1 car on veut retourner un index de 1 à 7
@@ -222,7 +420,7 @@ def minimax(grille, profondeur, alpha, beta, maximisant):
         colonne = coups_valides[0] if coups_valides else 0  # Colonne par défaut
         
         # On teste chaque colonne possible
-        for col in coups_valides:
+        for rang, col in enumerate(coups_valides):
             # On crée une copie de la grille pour simuler le coup
             grille_copie = grille.copier()
             
@@ -230,7 +428,7 @@ def minimax(grille, profondeur, alpha, beta, maximisant):
             grille_copie.ajouter_piece(col+1, 1)  # 1 pour le joueur humain
             
             # On évalue ce coup avec minimax récursivement
-            nouveau_score = minimax(grille_copie, profondeur-1, alpha, beta, True)[1]
+            nouveau_score = minimax(grille_copie, profondeur-1, alpha, beta, True, stats)[1]
             
             # Si ce coup est meilleur (pire pour l'IA), on le garde
             if nouveau_score < valeur:
@@ -242,16 +440,236 @@ def minimax(grille, profondeur, alpha, beta, maximisant):
             
             # Élagage Alpha-Beta
             if alpha >= beta:
+                if stats is not None:
+                    stats.coupure(rang)
                 break
                 
         return colonne+1, valeur  # +1 car on veut retourner un index de 1 à 7
 
+def _valeur_en_place(grille, profondeur, alpha, beta, maximisant, stats=None):
+    """Valeur Minimax d'un noeud, calculée en jouant puis annulant les coups sur la même grille"""
+    coups_valides = grille.coups_valides()
+    if grille.est_gagnant(2):
+        valeur = 1000000
+    elif grille.est_gagnant(1):
+        valeur = -1000000
+    elif not coups_valides:
+        valeur = 0
+    else:
+        valeur = None
+    if stats is not None:
+        stats.noeuds[profondeur] += 1
+        if valeur is not None:
+            stats.terminaux += 1
+        elif profondeur == 0:
+            stats.evaluations += 1
+    if valeur is not None:
+        return valeur
+    if profondeur == 0:
+        return grille.scores[2]  # Score tenu à jour par la grille
+
+    coups_valides = grille.coups_non_perdants(2 if maximisant else 1)
+    if not coups_valides:
+        return -1000000 if maximisant else 1000000  # Tous les coups perdent
+    if maximisant:
+        valeur = float('-inf')
+        for rang, col in enumerate(coups_valides):
+            grille.ajouter_piece(col+1, 2)
+            nouveau_score = _valeur_en_place(grille, profondeur-1, alpha, beta, False, stats)
+            grille.annuler()
+            if nouveau_score > valeur:
+                valeur = nouveau_score
+            alpha = max(alpha, valeur)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.coupure(rang)
+                break
+        return valeur
+    else:
+        valeur = float('inf')
+        for rang, col in enumerate(coups_valides):
+            grille.ajouter_piece(col+1, 1)
+            nouveau_score = _valeur_en_place(grille, profondeur-1, alpha, beta, True, stats)
+            grille.annuler()
+            if nouveau_score < valeur:
+                valeur = nouveau_score
+            beta = min(beta, valeur)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.coupure(rang)
+                break
+        return valeur
+
+def minimax_en_place(grille, profondeur, alpha, beta, maximisant, stats=None):
+    """
+    Même recherche que minimax, mais sans copier la grille à chaque noeud :
+    chaque coup est joué, exploré puis annulé sur la grille reçue (qui est
+    rendue dans son état initial). Retourne (colonne de 1 à 7, score).
+    """
+    coups_valides = grille.coups_valides()
+    if profondeur == 0 or est_noeud_terminal(grille):
+        return (None, _valeur_en_place(grille, 0, alpha, beta, maximisant, stats))
+
+    if stats is not None:
+        stats.noeuds[profondeur] += 1
+    piece = 2 if maximisant else 1
+    coups_valides = grille.coups_non_perdants(piece)
+    if not coups_valides:
+        return grille.coups_valides()[0]+1, (-1000000 if maximisant else 1000000)  # Tous les coups perdent
+    valeur = float('-inf') if maximisant else float('inf')
+    colonne = coups_valides[0]
+    for rang, col in enumerate(coups_valides):
+        grille.ajouter_piece(col+1, piece)
+        nouveau_score = _valeur_en_place(grille, profondeur-1, alpha, beta, not maximisant, stats)
+        grille.annuler()
+        if maximisant:
+            if nouveau_score > valeur:
+                valeur = nouveau_score
+                colonne = col
+            alpha = max(alpha, valeur)
+        else:
+            if nouveau_score < valeur:
+                valeur = nouveau_score
+                colonne = col
+            beta = min(beta, valeur)
+        if alpha >= beta:
+            if stats is not None:
+                stats.coupure(rang)
+            break
+    return colonne+1, valeur
+
+
+def demander_reglages_minimax(question_difficulte):
+    """Demande si Minimax réfléchit à profondeur fixe (difficulté) ou avec un temps limité par coup"""
+    reglages = {"difficulte": 4, "temps": None, "workers": None, "statistiques": False}  # Difficulté par défaut
+    mode = ""
+    while mode not in ["1", "2", "3"]:
+        mode = input("Comment Minimax doit-il réfléchir ?\n"
+                     "1 - Profondeur fixe (difficulté)\n"
+                     "2 - Temps limité par coup\n"
+                     "3 - Profondeur fixe sur plusieurs cœurs\n"
+                     "Ton choix : ")
+    reglages["statistiques"] = input("Afficher les statistiques de recherche après chaque coup ? (o/n) : ").lower() == "o"
+    
+    if mode == "2":
+        try:
+            reglages["temps"] = float(input("Temps de réflexion maximum par coup (en secondes) : "))
+            if reglages["temps"] <= 0:
+                print(Couleur.ROUGE + "⚠️ Temps invalide ! Réglage à 2 secondes par défaut." + Couleur.FIN)
+                reglages["temps"] = 2.0
+        except ValueError:
+            print(Couleur.ROUGE + "⚠️ Entrée invalide ! Temps réglé à 2 secondes par défaut." + Couleur.FIN)
+            reglages["temps"] = 2.0
+        return reglages
+    
+    if mode == "3":
+        import os
+        try:
+            reglages["workers"] = int(input(f"Nombre de cœurs à utiliser (1-{os.cpu_count()}) : "))
+            if reglages["workers"] < 1:
+                raise ValueError
+        except ValueError:
+            print(Couleur.ROUGE + f"⚠️ Nombre invalide ! On utilise les {os.cpu_count()} cœurs." + Couleur.FIN)
+            reglages["workers"] = os.cpu_count()
+    
+    try:
+        reglages["difficulte"] = int(input(question_difficulte))
+        if reglages["difficulte"] < 1 or reglages["difficulte"] > 10:
+            print(Couleur.ROUGE + "⚠️ Difficulté invalide ! Réglage à 4 par défaut." + Couleur.FIN)
+            reglages["difficulte"] = 4
+    except ValueError:
+        print(Couleur.ROUGE + "⚠️ Entrée invalide ! Difficulté réglée à 4 par défaut." + Couleur.FIN)
+    return reglages
+
+def creer_moteur_minimax(reglages):
+    """Crée le moteur de recherche de Minimax (table de transposition ou processus workers)"""
+    # Import ici pour éviter les problèmes d'importation circulaire
+    if reglages["workers"] is not None:
+        from parallele import RechercheParallele
+        return RechercheParallele(reglages["workers"])
+    from recherche import RechercheIterative
+    return RechercheIterative()
+
+def demander_reglages_mcts():
+    """Demande si MCTS réfléchit avec un temps limité ou un nombre de simulations par coup"""
+    reglages = {"temps": None, "iterations": None}
+    mode = ""
+    while mode not in ["1", "2"]:
+        mode = input("Comment MCTS doit-il réfléchir ?\n"
+                     "1 - Temps limité par coup\n"
+                     "2 - Nombre de simulations par coup\n"
+                     "Ton choix : ")
+    if mode == "1":
+        try:
+            reglages["temps"] = float(input("Temps de réflexion maximum par coup (en secondes) : "))
+            if reglages["temps"] <= 0:
+                raise ValueError
+        except ValueError:
+            print(Couleur.ROUGE + "⚠️ Temps invalide ! Réglage à 2 secondes par défaut." + Couleur.FIN)
+            reglages["temps"] = 2.0
+    else:
+        try:
+            reglages["iterations"] = int(input("Nombre de simulations par coup (5000 par exemple) : "))
+            if reglages["iterations"] < 1:
+                raise ValueError
+        except ValueError:
+            print(Couleur.ROUGE + "⚠️ Nombre invalide ! Réglage à 5000 simulations par défaut." + Couleur.FIN)
+            reglages["iterations"] = 5000
+    return reglages
+
+def creer_moteur_mcts():
+    """Crée le moteur MCTS (son arbre est gardé d'un coup à l'autre pendant la partie)"""
+    # Import ici pour éviter les problèmes d'importation circulaire
+    from mcts import MCTS
+    return MCTS()
+
+def coup_minimax(g, reglages, moteur, stats=None, reflexion=None):
+    """
+    Fait réfléchir Minimax (IA = joueur 2) et retourne (colonne de 1 à 7, score)
+
+    stats: StatistiquesRecherche à remplir pendant la recherche (optionnel)
+    reflexion: ReflexionAnticipee qui a réfléchi pendant le tour du joueur (optionnel) ;
+    sa réponse est jouée directement si elle est aussi aboutie qu'une vraie recherche
+
+    Les coups d'ouverture viennent du livre d'ouvertures s'il existe (et s'il a été
+    calculé au moins aussi profondément que la difficulté demandée). Quand il reste
+    peu de cases vides, le solveur exact joue à la place de Minimax.
+    """
+    from recherche import minimax_tt
+    from livre_ouvertures import charger_livre
+    from solveur import CASES_VIDES_SOLVEUR, solveur_partage
+    if HAUTEUR * LARGEUR - g.nb_pieces <= CASES_VIDES_SOLVEUR:
+        # L'IA joue toujours la pièce 2, même quand elle a commencé la partie
+        col, score = solveur_partage().meilleur_coup(g, 2)
+        # Score exact ramené à la convention de Minimax (positif = bon pour le joueur 2)
+        return col, 1000000 if score > 0 else -1000000 if score < 0 else 0
+    livre = charger_livre()
+    if livre is not None and (reglages["temps"] is not None or livre.profondeur >= reglages["difficulte"]):
+        resultat = livre.consulter(g)
+        if resultat is not None:
+            return resultat
+    if reflexion is not None:
+        resultat = reflexion.resultat(g)
+        if resultat is not None:
+            return resultat
+    if stats is not None:
+        stats.demarrer()
+    if reglages["workers"] is not None:
+        resultat = moteur.chercher(g, reglages["difficulte"], stats=stats)
+    elif reglages["temps"] is not None:
+        resultat = moteur.chercher(g, reglages["temps"], stats=stats)[:2]
+    else:
+        resultat = minimax_tt(g, reglages["difficulte"], float('-inf'), float('inf'), True, moteur.table, stats)
+    if stats is not None:
+        stats.arreter()
+    return resultat
+
 
 def agent_vs_minimax():
     """Fait jouer l'agent contre l'IA Minimax"""
-    # Charge l'agent
-    agent = QLearningAgent(epsilon=0.0)  # Epsilon à 0 pour jouer de façon optimale
-    if not agent.load_model():
+    # Charge l'agent (le modèle figé s'il est à jour, sans exploration)
+    agent = charger_agent()
+    if agent is None:
         print(Couleur.ROUGE + "⚠️ Pas de modèle entraîné trouvé! Il faut d'abord entraîner l'agent (option 4)." + Couleur.FIN)
         return
     
@@ -262,23 +680,26 @@ def agent_vs_minimax():
     symboles = {1: Couleur.ROUGE + "X" + Couleur.FIN, 2: Couleur.JAUNE + "O" + Couleur.FIN}
     noms = {1: "Agent (apprentissage par renforcement)", 2: "Minimax"}
     
+    # Demande contre quelle IA joue l'agent
+    adversaire = ""
+    while adversaire not in ["1", "2"]:
+        adversaire = input("Adversaire de l'Agent :\n1 - Minimax\n2 - MCTS (Monte-Carlo)\nTon choix : ")
+    mode_mcts = adversaire == "2"
+    if mode_mcts:
+        noms[2] = "MCTS"
+    
     # Demande qui commence
     debut = ""
     while debut not in ["1", "2"]:
-        debut = input("Qui commence ?\n1 - L'Agent (IA par renforcement)\n2 - Minimax\nTon choix : ")
+        debut = input(f"Qui commence ?\n1 - L'Agent (IA par renforcement)\n2 - {noms[2]}\nTon choix : ")
     
     joueur = 1 if debut == "1" else 2
     
-    # Demande la difficulté pour Minimax
-    difficulte = 4  # Difficulté par défaut
-    try:
-        diff_input = input("Choisis la difficulté de Minimax (1-10) : ")
-        difficulte = int(diff_input)
-        if difficulte < 1 or difficulte > 10:
-            print(Couleur.ROUGE + "⚠️ Difficulté invalide ! Réglage à 4 par défaut." + Couleur.FIN)
-            difficulte = 4
-    except ValueError:
-        print(Couleur.ROUGE + "⚠️ Entrée invalide ! Difficulté réglée à 4 par défaut." + Couleur.FIN)
+    # Demande comment l'adversaire doit réfléchir
+    if mode_mcts:
+        reglages = demander_reglages_mcts()
+    else:
+        reglages = demander_reglages_minimax("Choisis la difficulté de Minimax (1-10) : ")
     
     # Demande la vitesse d'exécution
     vitesse = ""
@@ -299,7 +720,10 @@ def agent_vs_minimax():
         nb_parties = 1
     
     # Statistiques
-    stats = {"agent": 0, "minimax": 0, "nuls": 0}
+    stats = {"agent": 0, "adversaire": 0, "nuls": 0}
+    
+    # Moteur de l'adversaire (table de transposition de Minimax ou arbre de MCTS)
+    moteur = creer_moteur_mcts() if mode_mcts else creer_moteur_minimax(reglages)
     
     # Joue plusieurs parties
     for partie in range(nb_parties):
@@ -307,6 +731,7 @@ def agent_vs_minimax():
         
         # Réinitialise la grille pour chaque partie
         g = Grille()
+        moteur.nouvelle_partie()  # La table (ou l'arbre) ne sert que pendant une même partie
         game_over = False
         joueur = 1 if debut == "1" else 2  # Réinitialise qui commence
         
@@ -326,12 +751,22 @@ def agent_vs_minimax():
                 g.ajouter_piece(col, joueur)
                 print(f"L'Agent joue dans la colonne {col}")
             
+            # Tour de MCTS
+            elif mode_mcts:
+                print("MCTS réfléchit...")
+                col, chances, simulations = moteur.chercher(g, reglages["temps"], reglages["iterations"])
+                g.ajouter_piece(col, joueur)
+                print(f"MCTS joue dans la colonne {col} ({simulations} simulations, {chances*100:.0f}% de chances de gagner estimées)")
+            
             # Tour de Minimax
             else:
                 print("Minimax réfléchit...")
-                col, _ = minimax(g, difficulte, float('-inf'), float('inf'), True)
+                stats_recherche = StatistiquesRecherche() if reglages["statistiques"] else None
+                col, _ = coup_minimax(g, reglages, moteur, stats_recherche)
                 g.ajouter_piece(col, joueur)
                 print(f"Minimax joue dans la colonne {col}")
+                if stats_recherche is not None:
+                    print(stats_recherche)
             
             # Pause pour voir le jeu se dérouler
             if temps_pause > 0:
@@ -345,8 +780,8 @@ def agent_vs_minimax():
                     print(f"🧠 {Couleur.FOND_BLEU + Couleur.BLANC} L'Agent a gagné! {Couleur.FIN} 🧠")
                     stats["agent"] += 1
                 else:
-                    print(f"🤖 {Couleur.FOND_BLEU + Couleur.BLANC} Minimax a gagné! {Couleur.FIN} 🤖")
-                    stats["minimax"] += 1
+                    print(f"🤖 {Couleur.FOND_BLEU + Couleur.BLANC} {noms[2]} a gagné! {Couleur.FIN} 🤖")
+                    stats["adversaire"] += 1
                 game_over = True
                 
             # Vérifie si la grille est pleine
@@ -364,7 +799,7 @@ def agent_vs_minimax():
     print("\n" + "="*40)
     print(f"{Couleur.FOND_BLEU + Couleur.BLANC} RÉSULTATS APRÈS {nb_parties} PARTIES {Couleur.FIN}")
     print(f"Victoires de l'Agent : {stats['agent']} ({stats['agent']/nb_parties*100:.1f}%)")
-    print(f"Victoires de Minimax : {stats['minimax']} ({stats['minimax']/nb_parties*100:.1f}%)")
+    print(f"Victoires de {noms[2]} : {stats['adversaire']} ({stats['adversaire']/nb_parties*100:.1f}%)")
     print(f"Matchs nuls : {stats['nuls']} ({stats['nuls']/nb_parties*100:.1f}%)")
     print("="*40)
 
@@ -393,13 +828,14 @@ def jeu():
     
     # Demande si le joueur veut jouer contre l'IA
     mode_jeu = ""
-    while mode_jeu not in ["1", "2", "3", "4", "5"]:  # Ajout de l'option 5
+    while mode_jeu not in ["1", "2", "3", "4", "5", "6"]:
         mode_jeu = input("Choisis le mode de jeu :\n"
                          "1 - Joueur contre Joueur\n"
                          "2 - Joueur contre IA Minimax\n"
                          "3 - Joueur contre Agent (IA par renforcement)\n"
                          "4 - Entraîner l'Agent\n"
-                         "5 - Agent contre Minimax (spectateur)\n"
+                         "5 - Agent contre Minimax ou MCTS (spectateur)\n"
+                         "6 - Joueur contre IA MCTS (Monte-Carlo)\n"
                          "Ton choix : ")
     
     # Si on veut faire jouer l'agent contre minimax
@@ -411,37 +847,59 @@ def jeu():
     if mode_jeu == "4":
         try:
             nb_parties = int(input("Combien de parties d'entraînement ? (5000 recommandé pour débuter) : "))
-            entrainer_agent(episodes=nb_parties)
         except ValueError:
             print(Couleur.ROUGE + "⚠️ Nombre invalide ! Entraînement avec 5000 parties." + Couleur.FIN)
-            entrainer_agent(episodes=5000)
+            nb_parties = 5000
+        import os
+        try:
+            nb_workers = int(input(f"Nombre de processus d'entraînement (1-{os.cpu_count()}) : "))
+            if nb_workers < 1:
+                raise ValueError
+        except ValueError:
+            print(Couleur.ROUGE + "⚠️ Nombre invalide ! Entraînement sur un seul processus." + Couleur.FIN)
+            nb_workers = 1
+        if nb_workers > 1:
+            # Import ici pour éviter les problèmes d'importation circulaire
+            from entrainement_parallele import entrainer_agent_parallele
+            entrainer_agent_parallele(episodes=nb_parties, nb_workers=nb_workers)
+        else:
+            entrainer_agent(episodes=nb_parties)
         return
     
     mode_ia_minimax = mode_jeu == "2"
     mode_agent = mode_jeu == "3"
+    mode_mcts = mode_jeu == "6"
+    reflexion = None  # Réflexion de Minimax pendant le tour du joueur
     
     # Charge l'agent si nécessaire
     agent = None
     if mode_agent:
-        agent = QLearningAgent(epsilon=0.0)  # Epsilon à 0 pour jouer de façon optimale
-        if not agent.load_model():
+        agent = charger_agent()  # Le modèle figé s'il est à jour, sans exploration
+        if agent is None:
             print(Couleur.ROUGE + "⚠️ Pas de modèle entraîné trouvé! Il faut d'abord entraîner l'agent (option 4)." + Couleur.FIN)
             return
+        # Import ici pour éviter les problèmes d'importation circulaire
+        from livre_ouvertures import charger_livre
+        agent.livre = charger_livre()
     
-    # Demande la difficulté si on joue contre l'IA Minimax
-    difficulte = 4  # Difficulté par défaut
+    # Demande comment réfléchit l'IA Minimax
     if mode_ia_minimax:
-        try:
-            diff_input = input("Choisis la difficulté (1-10) - Plus le chiffre est élevé, plus l'IA est forte mais réfléchit longtemps: ")
-            difficulte = int(diff_input)
-            if difficulte < 1 or difficulte > 10:
-                print(Couleur.ROUGE + "⚠️ Difficulté invalide ! Réglage à 4 par défaut." + Couleur.FIN)
-                difficulte = 4
-        except ValueError:
-            print(Couleur.ROUGE + "⚠️ Entrée invalide ! Difficulté réglée à 4 par défaut." + Couleur.FIN)
-    
+        reglages = demander_reglages_minimax("Choisis la difficulté (1-10) - Plus le chiffre est élevé, plus l'IA est forte mais réfléchit longtemps: ")
+        # Moteur et table de transposition conservés pendant toute la partie
+        moteur = creer_moteur_minimax(reglages)
+        # La réflexion pendant ton tour remplit la table de transposition (pas de table en mode multi-cœurs)
+        if reglages["workers"] is None and input("Laisser l'IA réfléchir pendant ton tour ? (o/n) : ").lower() == "o":
+            from recherche import ReflexionAnticipee
+            profondeur = reglages["difficulte"] if reglages["temps"] is None else 42
+            reflexion = ReflexionAnticipee(moteur, profondeur, reglages["temps"])
+    
+    # Demande comment réfléchit l'IA MCTS (son arbre est gardé pendant toute la partie)
+    if mode_mcts:
+        reglages = demander_reglages_mcts()
+        moteur = creer_moteur_mcts()
+
     # Qui commence ? (pour les modes avec IA)
-    if mode_ia_minimax or mode_agent:
+    if mode_ia_minimax or mode_agent or mode_mcts:
         debut = ""
         while debut not in ["1", "2"]:
             debut = input("Qui commence ?\n1 - Toi\n2 - L'IA\nTon choix : ")
@@ -457,10 +915,18 @@ def jeu():
         print(f"C'est au tour du joueur {symboles[joueur]}")
         
         # Tour du joueur humain
-        if joueur == 1 or (not mode_ia_minimax and not mode_agent):
-            # Demande au joueur de jouer
+        if joueur == 1 or (not mode_ia_minimax and not mode_agent and not mode_mcts):
+            # Demande au joueur de jouer (Minimax peut réfléchir pendant ce temps)
+            if reflexion is not None:
+                reflexion.demarrer(g)
+            try:
+                saisie = input(f"Choisis une colonne (1-7): ")
+            finally:
+                # Arrête la réflexion dès que le joueur a répondu (ou quitte le jeu)
+                if reflexion is not None:
+                    reflexion.arreter()
             try:
-                col = int(input(f"Choisis une colonne (1-7): "))
+                col = int(saisie)
                 # Vérifie si la colonne est valide
                 if col < 1 or col > 7:
                     print(Couleur.ROUGE + "⚠️ Colonne invalide! Choisis entre 1 et 7." + Couleur.FIN)
@@ -475,9 +941,18 @@ def jeu():
         # Tour de l'IA Minimax
         elif mode_ia_minimax:
             print("L'IA Minimax réfléchit...")
-            col, minimax_score = minimax(g, difficulte, float('-inf'), float('inf'), True)
+            stats = StatistiquesRecherche() if reglages["statistiques"] else None
+            col, minimax_score = coup_minimax(g, reglages, moteur, stats, reflexion)
             g.ajouter_piece(col, joueur)
             print(f"L'IA Minimax joue dans la colonne {col}")
+            if stats is not None:
+                print(stats)
+        # Tour de l'IA MCTS
+        elif mode_mcts:
+            print("L'IA MCTS réfléchit...")
+            col, chances, simulations = moteur.chercher(g, reglages["temps"], reglages["iterations"])
+            g.ajouter_piece(col, joueur)
+            print(f"L'IA MCTS joue dans la colonne {col} ({simulations} simulations, {chances*100:.0f}% de chances de gagner estimées)")
         # Tour de l'Agent (IA par renforcement)
         elif mode_agent:
             print("L'Agent réfléchit...")
@@ -492,6 +967,8 @@ def jeu():
             else:
                 if mode_ia_minimax:
                     print(f"🤖 {Couleur.FOND_BLEU + Couleur.BLANC} L'IA Minimax a gagné! {Couleur.FIN} 🤖")
+                elif mode_mcts:
+                    print(f"🌳 {Couleur.FOND_BLEU + Couleur.BLANC} L'IA MCTS a gagné! {Couleur.FIN} 🌳")
                 elif mode_agent:
                     print(f"🧠 {Couleur.FOND_BLEU + Couleur.BLANC} L'Agent a gagné! {Couleur.FIN} 🧠")
                 else:
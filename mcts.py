@@ -0,0 +1,236 @@
+# Module pour l'IA Monte-Carlo (MCTS) : arbre de recherche construit par des parties simulées
+import argparse
+import math
+import random
+import time
+
+from main import (HAUTEUR, LARGEUR, BAS, PLATEAU, MASQUES_COLONNES, aligne_quatre, positions_gagnantes,
+                  coups_utiles, grille_depuis_coups)
+from recherche import ORDRE_CENTRE
+
+NB_CASES = HAUTEUR * LARGEUR
+# Constante d'exploration de UCT (racine de 2 pour des récompenses entre 0 et 1)
+EXPLORATION = math.sqrt(2)
+# Au-delà de ce nombre de noeuds, l'arbre ne grandit plus (les simulations continuent)
+NOEUDS_MAX = 2_000_000
+# Le chronomètre n'est consulté qu'une fois toutes les N simulations
+SIMULATIONS_ENTRE_VERIFICATIONS = 64
+
+# Cases des colonnes, du centre vers les bords
+_MASQUES_CENTRE = tuple(MASQUES_COLONNES[col] for col in ORDRE_CENTRE)
+
+
+def _colonne(coup):
+    """Colonne (0 à 6) d'un coup donné par sa case (bitboard d'un seul bit)"""
+    return (coup.bit_length() - 1) // (HAUTEUR + 1)
+
+
+class MCTS:
+    def __init__(self, exploration=EXPLORATION, simulation="heuristique", graine=None):
+        """
+        Recherche arborescente Monte-Carlo (UCT) sur les bitboards de Grille
+
+        exploration: constante de UCT (plus grande = essaie plus les coups peu visités)
+        simulation: "heuristique" (gagne ou bloque si possible, n'offre pas de case
+        gagnante, sinon au hasard) ou "aleatoire" (coups au hasard)
+
+        Les noeuds sont stockés dans des listes parallèles (un indice par noeud) ;
+        la valeur d'un noeud est comptée pour le joueur qui a joué le coup qui y mène.
+        Après chaque coup, le sous-arbre de la nouvelle position est gardé.
+        """
+        self.exploration = exploration
+        self.heuristique = simulation == "heuristique"
+        self.generateur = random.Random(graine)
+        self.nouvelle_partie()
+
+    def nouvelle_partie(self):
+        """Oublie l'arbre de la partie précédente"""
+        self._vider()
+        self.coups_racine = None  # Coups joués (colonnes 0 à 6) jusqu'à la racine
+
+    def _vider(self):
+        self.parents = []
+        self.coups = []  # Case jouée pour arriver au noeud
+        self.enfants = []
+        self.a_explorer = []  # Cases des coups pas encore essayés (bitboard)
+        self.terminaux = []  # Récompense d'une fin de partie pour le joueur qui y mène, sinon None
+        self.visites = []
+        self.valeurs = []
+
+    def _ajouter_noeud(self, parent, coup, pieces, masque, terminal):
+        """Crée un noeud ; pieces = pièces du joueur au trait dans ce noeud"""
+        a_explorer = 0
+        if terminal is None:
+            a_explorer = coups_utiles(pieces, masque)
+            if not a_explorer:
+                if parent < 0:
+                    # Racine perdue : il faut quand même un coup, on les essaie tous
+                    a_explorer = (masque + BAS) & PLATEAU
+                else:
+                    terminal = 1.0  # Tous les coups perdent : le joueur qui mène ici gagne
+        self.parents.append(parent)
+        self.coups.append(coup)
+        self.enfants.append([])
+        self.a_explorer.append(a_explorer)
+        self.terminaux.append(terminal)
+        self.visites.append(0)
+        self.valeurs.append(0.0)
+        return len(self.visites) - 1
+
+    def _preparer_racine(self, grille):
+        """Réutilise le sous-arbre de la position si elle suit la précédente, sinon repart de zéro"""
+        coups = list(grille.historique)
+        racine = 0 if self.visites else None
+        if racine is not None and self.coups_racine is not None and coups[:len(self.coups_racine)] == self.coups_racine:
+            for col in coups[len(self.coups_racine):]:
+                suivant = None
+                for enfant in self.enfants[racine]:
+                    if _colonne(self.coups[enfant]) == col:
+                        suivant = enfant
+                        break
+                racine = suivant
+                if racine is None:
+                    break
+        else:
+            racine = None
+        if racine is not None and self.terminaux[racine] is not None:
+            racine = None  # Noeud perdu de l'arbre : la racine doit garder tous ses coups
+
+        joueur = 1 + grille.nb_pieces % 2
+        self.etat_racine = (grille.bitboards[joueur], grille.bitboards[1] | grille.bitboards[2], grille.nb_pieces)
+        self.coups_racine = coups
+        if racine is None:
+            self._vider()
+            self._ajouter_noeud(-1, 0, self.etat_racine[0], self.etat_racine[1], None)
+        elif racine != 0:
+            self._garder_sous_arbre(racine)
+
+    def _garder_sous_arbre(self, racine):
+        """Recopie le sous-arbre du noeud racine au début des listes (la racine devient le noeud 0)"""
+        anciens = [racine]
+        nouveaux = {racine: 0}
+        i = 0
+        while i < len(anciens):
+            for enfant in self.enfants[anciens[i]]:
+                nouveaux[enfant] = len(anciens)
+                anciens.append(enfant)
+            i += 1
+        self.parents = [nouveaux.get(self.parents[n], -1) for n in anciens]
+        self.coups = [self.coups[n] for n in anciens]
+        self.enfants = [[nouveaux[e] for e in self.enfants[n]] for n in anciens]
+        self.a_explorer = [self.a_explorer[n] for n in anciens]
+        self.terminaux = [self.terminaux[n] for n in anciens]
+        self.visites = [self.visites[n] for n in anciens]
+        self.valeurs = [self.valeurs[n] for n in anciens]
+
+    def _simuler(self, pieces, masque, nb):
+        """Termine la partie au hasard ; retourne la récompense du joueur au trait (1, 0.5 ou 0)"""
+        generateur = self.generateur
+        tour = 0  # 0 : le joueur au trait au début de la simulation joue
+        while True:
+            if self.heuristique:
+                coups = coups_utiles(pieces, masque)
+                if not coups:
+                    return 0.0 if tour == 0 else 1.0  # Tous les coups perdent
+                if coups & positions_gagnantes(pieces, masque):
+                    return 1.0 if tour == 0 else 0.0
+            else:
+                coups = (masque + BAS) & PLATEAU
+            colonnes = [m for m in _MASQUES_CENTRE if coups & m]
+            coup = coups & generateur.choice(colonnes)
+            if not self.heuristique and aligne_quatre(pieces | coup):
+                return 1.0 if tour == 0 else 0.0
+            nb += 1
+            if nb == NB_CASES:
+                return 0.5
+            pieces ^= masque  # Pièces de l'adversaire, qui joue maintenant
+            masque |= coup
+            tour ^= 1
+
+    def _iteration(self):
+        """Sélection, expansion d'un noeud, simulation et remontée du résultat"""
+        pieces, masque, nb = self.etat_racine
+        noeud = 0
+        chemin = [0]
+        while True:
+            terminal = self.terminaux[noeud]
+            if terminal is not None:
+                resultat = terminal
+                break
+            a_explorer = self.a_explorer[noeud]
+            if a_explorer and len(self.visites) < NOEUDS_MAX:
+                # Expansion : un coup pas encore essayé, le plus central d'abord
+                coup = next(a_explorer & m for m in _MASQUES_CENTRE if a_explorer & m)
+                self.a_explorer[noeud] = a_explorer ^ coup
+                if aligne_quatre(pieces | coup):
+                    terminal = 1.0
+                elif nb + 1 == NB_CASES:
+                    terminal = 0.5
+                pieces ^= masque
+                masque |= coup
+                enfant = self._ajouter_noeud(noeud, coup, pieces, masque, terminal)
+                self.enfants[noeud].append(enfant)
+                chemin.append(enfant)
+                # Récompense du joueur qui vient de jouer
+                resultat = terminal if terminal is not None else 1.0 - self._simuler(pieces, masque, nb + 1)
+                break
+            enfants = self.enfants[noeud]
+            if not enfants:
+                # Arbre plein : simulation depuis ce noeud
+                resultat = 1.0 - self._simuler(pieces, masque, nb)
+                break
+            # Sélection : enfant qui maximise UCT
+            visites, valeurs = self.visites, self.valeurs
+            facteur = self.exploration * math.sqrt(math.log(visites[noeud]))
+            noeud = max(enfants, key=lambda e: valeurs[e] / visites[e] + facteur / math.sqrt(visites[e]))
+            chemin.append(noeud)
+            pieces ^= masque
+            masque |= self.coups[noeud]
+            nb += 1
+
+        # Remontée : la récompense change de camp à chaque niveau
+        for n in reversed(chemin):
+            self.visites[n] += 1
+            self.valeurs[n] += resultat
+            resultat = 1.0 - resultat
+
+    def chercher(self, grille, temps_max=None, iterations=None):
+        """
+        Lance des simulations jusqu'à épuisement du temps (en secondes) ou du nombre d'itérations
+
+        Retourne (colonne de 1 à 7, chances de gagner estimées pour le joueur au trait,
+        nombre de simulations de la racine, y compris celles gardées des coups précédents).
+        Le coup choisi est le plus visité.
+        """
+        if grille.est_gagnant(1) or grille.est_gagnant(2) or grille.est_pleine():
+            raise ValueError("La partie est déjà terminée")
+        if temps_max is None and iterations is None:
+            iterations = 10000
+        self._preparer_racine(grille)
+        limite = None if temps_max is None else time.perf_counter() + temps_max
+        n = 0
+        while iterations is None or n < iterations:
+            self._iteration()
+            n += 1
+            if limite is not None and n % SIMULATIONS_ENTRE_VERIFICATIONS == 0 and time.perf_counter() > limite:
+                break
+
+        enfant = max(self.enfants[0], key=lambda e: self.visites[e])
+        return _colonne(self.coups[enfant]) + 1, self.valeurs[enfant] / self.visites[enfant], self.visites[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fait réfléchir MCTS sur une position")
+    parser.add_argument("--coups", default="", help="coups joués depuis la grille vide (colonnes de 1 à 7)")
+    parser.add_argument("--temps", type=float, default=1.0, help="temps de réflexion en secondes")
+    parser.add_argument("--simulation", choices=("heuristique", "aleatoire"), default="heuristique")
+    args = parser.parse_args()
+
+    grille = grille_depuis_coups(args.coups)
+    moteur = MCTS(simulation=args.simulation)
+    debut = time.perf_counter()
+    col, chances, simulations = moteur.chercher(grille, args.temps)
+    duree = time.perf_counter() - debut
+    print(grille)
+    print(f"Coup {col} : {chances*100:.1f}% de chances de gagner estimées, "
+          f"{simulations} simulations ({simulations / duree:.0f}/s), {len(moteur.visites)} noeuds")
@@ -0,0 +1,89 @@
+# Module pour la mémoire d'expérience : les derniers coups joués, rejoués par lots pour apprendre
+import numpy as np
+
+# Nombre de coups gardés (les plus anciens sont remplacés) : 22 octets par coup
+CAPACITE_MEMOIRE = 200_000
+# Coups tirés de la mémoire pour chaque mise à jour
+TAILLE_ECHANTILLON = 256
+# Part du retour de la suite de la partie dans les retours TD(lambda)
+LAMBDA_TRACES = 0.8
+
+
+def transitions_partie(etats, actions, gagnant):
+    """
+    Transitions d'une partie vues par le joueur de chaque coup
+
+    etats: clés des positions avant chaque coup, actions: coups joués (de 1 à 7),
+    gagnant: 1 ou 2, ou 0 pour un match nul (le joueur 1 commence).
+    Retourne (etats, actions, recompenses, suivants, termines) : la récompense vaut
+    1 pour le coup gagnant, -1 pour le coup qui précède le coup gagnant de l'adversaire,
+    0 sinon ; suivant est la prochaine position où le même joueur doit jouer (deux coups
+    plus tard), termine est vrai si la partie s'arrête avant (suivant vaut alors 0).
+    """
+    etats = np.asarray(etats, dtype=np.uint64)
+    n = len(etats)
+    recompenses = np.zeros(n, dtype=np.float32)
+    if gagnant:
+        recompenses[n - 1] = 1.0
+        if n >= 2:
+            recompenses[n - 2] = -1.0
+    suivants = np.zeros(n, dtype=np.uint64)
+    suivants[:n - 2] = etats[2:]
+    termines = np.arange(n) >= n - 2
+    return etats, np.asarray(actions, dtype=np.int8), recompenses, suivants, termines
+
+
+def retours_lambda(agent, recompenses, suivants, termines, lambda_traces):
+    """
+    Cibles TD(lambda) des coups d'une partie (vue avant des traces d'éligibilité) :
+    G_t = r_t + gamma * ((1 - lambda) * max Q(suivant) + lambda * G_(t+2)),
+    avec G_t = r_t si la partie s'arrête avant le prochain coup du même joueur
+    """
+    valeurs = np.zeros(len(recompenses), dtype=np.float64)
+    valeurs[~termines] = agent.valeurs_max_lot(suivants[~termines])
+    cibles = recompenses.astype(np.float64)
+    for t in range(len(cibles) - 3, -1, -1):
+        cibles[t] += agent.gamma * ((1 - lambda_traces) * valeurs[t] + lambda_traces * cibles[t + 2])
+    return cibles
+
+
+class MemoireExperience:
+    def __init__(self, capacite=CAPACITE_MEMOIRE, graine=None):
+        """
+        Mémoire circulaire de transitions dans des tableaux NumPy de taille fixe
+        (clé de l'état, action, récompense, clé de l'état suivant, fin de partie)
+        """
+        self.capacite = capacite
+        self.etats = np.zeros(capacite, dtype=np.uint64)
+        self.actions = np.zeros(capacite, dtype=np.int8)
+        self.recompenses = np.zeros(capacite, dtype=np.float32)
+        self.suivants = np.zeros(capacite, dtype=np.uint64)
+        self.termines = np.zeros(capacite, dtype=bool)
+        self.position = 0  # Prochaine case écrite
+        self.taille = 0
+        self.generateur = np.random.default_rng(graine)
+
+    def __len__(self):
+        return self.taille
+
+    def ajouter(self, etats, actions, recompenses, suivants, termines):
+        """Ajoute des transitions (tableaux de même longueur) en écrasant les plus anciennes"""
+        n = len(etats)
+        if n > self.capacite:
+            etats, actions, recompenses, suivants, termines = (
+                t[n - self.capacite:] for t in (etats, actions, recompenses, suivants, termines))
+            n = self.capacite
+        cases = (self.position + np.arange(n)) % self.capacite
+        self.etats[cases] = etats
+        self.actions[cases] = actions
+        self.recompenses[cases] = recompenses
+        self.suivants[cases] = suivants
+        self.termines[cases] = termines
+        self.position = (self.position + n) % self.capacite
+        self.taille = min(self.taille + n, self.capacite)
+
+    def echantillonner(self, n=TAILLE_ECHANTILLON):
+        """Tire n transitions au hasard (avec remise) : (etats, actions, recompenses, suivants, termines)"""
+        cases = self.generateur.integers(0, self.taille, size=n)
+        return (self.etats[cases], self.actions[cases], self.recompenses[cases],
+                self.suivants[cases], self.termines[cases])
@@ -0,0 +1,173 @@
+# Module pour le modèle figé : la table Q compilée en lecture seule, pour jouer (jamais pour apprendre)
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+from table_q import TableQ, cle_canonique
+
+# Un état = sa clé (canonique si le modèle est symétrique) et l'ordre de préférence des
+# 7 colonnes, dans l'orientation de la clé puis dans celle de son miroir : 16 octets.
+# Un ordre tient dans un entier : 4 bits par colonne (de 0 à 6), la meilleure dans les bits du bas.
+# Fichier : en-tête (magique, version, options, nombre d'états) puis trois tableaux contigus
+# (les clés triées, les ordres, les ordres du miroir), pour des recherches sans copie
+MAGIQUE = b'P4FIGE\0\0'
+VERSION = 1
+EN_TETE = struct.Struct('<8sIIQ')
+OPTION_SYMETRIQUE = 1
+
+
+def fichier_fige(fichier_modele='q_learning_model.bin'):
+    """Nom du modèle figé qui accompagne un modèle d'entraînement"""
+    return os.path.splitext(fichier_modele)[0] + '.fige'
+
+
+def ordres_colonnes(q):
+    """
+    Ordres de préférence compactés d'un tableau (N, 7) de valeurs Q : à valeurs égales,
+    la colonne la plus à gauche d'abord (comme max() dans QLearningAgent.choose_action)
+    """
+    rangs = np.argsort(-q, axis=1, kind='stable').astype(np.uint32)
+    return np.bitwise_or.reduce(rangs << (np.arange(7, dtype=np.uint32) * 4), axis=1)
+
+
+class ModeleFige:
+    def __init__(self, cles, ordres, ordres_miroir, symetrique):
+        """
+        Table Q réduite à ce qui sert pour jouer : pour chaque état, l'ordre des colonnes
+
+        cles: clés triées (les recherches se font par dichotomie)
+        ordres, ordres_miroir: ordres compactés de chaque clé, dans son orientation et dans celle du miroir
+        symetrique: True si les clés sont canoniques (un miroir se lit avec ordres_miroir)
+        """
+        self.cles = cles
+        self.ordres = ordres
+        self.ordres_miroir = ordres_miroir
+        self.symetrique = symetrique
+
+    def __len__(self):
+        return len(self.cles)
+
+    @classmethod
+    def depuis_table(cls, q_table):
+        """Compile une TableQ (seuls ses états connus sont gardés)"""
+        occupees = np.flatnonzero(q_table.cles)
+        occupees = occupees[np.argsort(q_table.cles[occupees])]
+        q = q_table.q[occupees]
+        ordres = ordres_colonnes(q)
+        # Dans l'orientation du miroir, la colonne c a la valeur de la colonne 6 - c
+        ordres_miroir = ordres_colonnes(q[:, ::-1]) if q_table.symetrique else ordres
+        return cls(q_table.cles[occupees].astype('<u8'), ordres.astype('<u4'),
+                   ordres_miroir.astype('<u4'), q_table.symetrique)
+
+    def ordre(self, cle):
+        """Ordre compacté des colonnes de l'état (clé de Grille.cle()), ou None s'il est inconnu"""
+        miroir = False
+        if self.symetrique:
+            cle, miroir = cle_canonique(cle)
+        # Clé en np.uint64 : avec un int, NumPy convertirait tout le tableau à chaque recherche
+        i = int(self.cles.searchsorted(np.uint64(cle)))
+        if i == len(self.cles) or self.cles[i] != cle:
+            return None
+        return int(self.ordres_miroir[i] if miroir else self.ordres[i])
+
+    @classmethod
+    def ouvrir(cls, fichier):
+        """Ouvre un modèle figé en projetant le fichier en mémoire (partagé entre processus par le système)"""
+        with open(fichier, 'rb') as f:
+            magique, version, options, nb = EN_TETE.unpack(f.read(EN_TETE.size))
+        if magique != MAGIQUE or version != VERSION:
+            raise ValueError(f"{fichier} n'est pas un modèle figé")
+        if nb:
+            # Vue ndarray simple : l'indexation d'un np.memmap est plus lente
+            contenu = np.memmap(fichier, dtype=np.uint8, mode='r', offset=EN_TETE.size, shape=(16 * nb,)).view(np.ndarray)
+            tableaux = contenu[:8 * nb].view('<u8'), contenu[8 * nb:12 * nb].view('<u4'), contenu[12 * nb:].view('<u4')
+        else:
+            tableaux = np.zeros(0, '<u8'), np.zeros(0, '<u4'), np.zeros(0, '<u4')
+        return cls(*tableaux, bool(options & OPTION_SYMETRIQUE))
+
+    def sauvegarder(self, fichier):
+        """Écrit le modèle dans un fichier temporaire puis le renomme (jamais de fichier à moitié écrit)"""
+        temporaire = fichier + '.tmp'
+        with open(temporaire, 'wb') as f:
+            f.write(EN_TETE.pack(MAGIQUE, VERSION, OPTION_SYMETRIQUE if self.symetrique else 0, len(self.cles)))
+            for tableau in (self.cles, self.ordres, self.ordres_miroir):
+                f.write(tableau.tobytes())
+        os.replace(temporaire, fichier)
+
+
+class AgentFige:
+    def __init__(self, modele):
+        """
+        Agent qui joue avec un modèle figé : mêmes coups que QLearningAgent avec
+        epsilon=0, mais une seule recherche dans le modèle par coup
+        """
+        self.modele = modele
+        self.epsilon = 0.0
+        # Livre d'ouvertures consulté avant le modèle
+        self.livre = None
+
+    @classmethod
+    def ouvrir(cls, fichier):
+        agent = cls(ModeleFige.ouvrir(fichier))
+        print(f"Modèle figé chargé depuis {fichier}")
+        return agent
+
+    def choose_action(self, grille, actions_valides):
+        """Meilleure action connue parmi actions_valides (les coups qui perdent tout de suite écartés)"""
+        utiles = grille.coups_non_perdants(grille.joueur_au_trait())
+        actions_valides = [a for a in actions_valides if a - 1 in utiles] or actions_valides
+        if not actions_valides:
+            return None
+        if self.livre is not None:
+            coup_livre = self.livre.consulter(grille)
+            if coup_livre is not None and coup_livre[0] in actions_valides:
+                return coup_livre[0]
+        ordre = self.modele.ordre(grille.cle())
+        if ordre is None:
+            return actions_valides[0]
+        for _ in range(7):
+            if (ordre & 0xF) + 1 in actions_valides:
+                return (ordre & 0xF) + 1
+            ordre >>= 4
+        return actions_valides[0]
+
+
+def figer(q_table, fichier=None):
+    """Compile une table Q en modèle figé et l'écrit dans fichier"""
+    modele = ModeleFige.depuis_table(q_table)
+    modele.sauvegarder(fichier or fichier_fige())
+    return modele
+
+
+def charger_agent(fichier_modele='q_learning_model.bin'):
+    """
+    Agent pour jouer (sans exploration) : le modèle figé s'il est au moins aussi récent
+    que le modèle d'entraînement, sinon le modèle d'entraînement ; None s'il n'y en a aucun
+    """
+    fige = fichier_fige(fichier_modele)
+    if os.path.exists(fige) and (not os.path.exists(fichier_modele)
+                                 or os.path.getmtime(fige) >= os.path.getmtime(fichier_modele)):
+        return AgentFige.ouvrir(fige)
+    # Import ici pour éviter les problèmes d'importation circulaire
+    from agent import QLearningAgent
+    agent = QLearningAgent(epsilon=0.0)
+    return agent if agent.load_model(fichier_modele) else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fige un modèle entraîné pour jouer plus vite")
+    parser.add_argument("--modele", default='q_learning_model.bin', help="modèle d'entraînement")
+    parser.add_argument("--sortie", default=None, help="modèle figé (par défaut, le même nom en .fige)")
+    args = parser.parse_args()
+
+    sortie = args.sortie or fichier_fige(args.modele)
+    table = TableQ.ouvrir(args.modele)
+    figer(table, sortie)
+    debut = time.perf_counter()
+    modele = ModeleFige.ouvrir(sortie)
+    duree = time.perf_counter() - debut
+    print(f"{sortie} : {len(modele)} états, {os.path.getsize(sortie)} octets "
+          f"({os.path.getsize(args.modele)} pour le modèle d'entraînement), ouvert en {duree * 1000:.1f} ms")
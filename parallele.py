@@ -0,0 +1,148 @@
+# Module pour faire réfléchir Minimax sur plusieurs cœurs
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from main import Grille, minimax_en_place
+from statistiques import StatistiquesRecherche
+
+# Meilleur score trouvé à la racine, partagé entre les processus (initialisé dans chaque worker)
+_borne_partagee = None
+
+
+def _initialiser_worker(borne):
+    """Mémorise la borne partagée dans le processus worker"""
+    global _borne_partagee
+    _borne_partagee = borne
+
+
+def _explorer_coup(grille, col, profondeur, maximisant, avec_stats=False):
+    """
+    Explore le sous-arbre d'un coup de la racine dans un worker
+
+    La fenêtre part du meilleur score déjà trouvé par les autres workers :
+    un score strictement moins bon n'est qu'une borne, mais un score égal
+    ou meilleur est exact (on décale la borne de 1, les scores sont entiers).
+    Retourne (colonne, score, statistiques du sous-arbre ou None).
+    """
+    alpha, beta = float('-inf'), float('inf')
+    with _borne_partagee.get_lock():
+        borne = _borne_partagee.value
+    if maximisant:
+        alpha = borne - 1
+    else:
+        beta = borne + 1
+
+    stats = StatistiquesRecherche() if avec_stats else None
+    grille.ajouter_piece(col+1, 2 if maximisant else 1)
+    valeur = minimax_en_place(grille, profondeur-1, alpha, beta, not maximisant, stats)[1]
+
+    # Partage le nouveau meilleur score pour couper les sous-arbres suivants
+    with _borne_partagee.get_lock():
+        if (maximisant and valeur > _borne_partagee.value) or (not maximisant and valeur < _borne_partagee.value):
+            _borne_partagee.value = valeur
+    return col, valeur, stats
+
+
+class RechercheParallele:
+    def __init__(self, nb_workers=None):
+        """
+        Minimax à profondeur fixe réparti sur plusieurs processus
+
+        nb_workers: nombre de processus (par défaut, un par cœur)
+
+        Le premier coup de la racine est exploré seul pour obtenir une bonne borne
+        ("Young Brothers Wait"), puis les autres coups sont répartis entre les workers.
+        Les processus sont créés une seule fois et réutilisés à chaque coup.
+        """
+        self.nb_workers = nb_workers or os.cpu_count() or 1
+        self.borne = multiprocessing.Value('d', float('-inf'))
+        self.executeur = ProcessPoolExecutor(
+            max_workers=self.nb_workers,
+            initializer=_initialiser_worker,
+            initargs=(self.borne,),
+        )
+
+    def nouvelle_partie(self):
+        """Rien à oublier d'une partie à l'autre (pas de table de transposition)"""
+
+    def chercher(self, grille, profondeur, maximisant=True, stats=None):
+        """
+        Retourne (colonne de 1 à 7, score), identique à minimax à la même profondeur
+
+        stats: StatistiquesRecherche où ajouter les compteurs de tous les workers (optionnel)
+        """
+        coups_valides = grille.coups_valides()
+        if profondeur == 0 or not coups_valides or grille.est_gagnant(1) or grille.est_gagnant(2):
+            return minimax_en_place(grille, profondeur, float('-inf'), float('inf'), maximisant, stats)
+        coups_valides = grille.coups_non_perdants(2 if maximisant else 1)
+        if not coups_valides:
+            return grille.coups_valides()[0]+1, (-1000000 if maximisant else 1000000)  # Tous les coups perdent
+
+        with self.borne.get_lock():
+            self.borne.value = float('-inf') if maximisant else float('inf')
+
+        # Le frère aîné d'abord, puis tous les autres en parallèle
+        avec_stats = stats is not None
+        resultats = [self.executeur.submit(_explorer_coup, grille.copier(), coups_valides[0], profondeur, maximisant, avec_stats).result()]
+        futures = [
+            self.executeur.submit(_explorer_coup, grille.copier(), col, profondeur, maximisant, avec_stats)
+            for col in coups_valides[1:]
+        ]
+        resultats += [future.result() for future in futures]
+        if avec_stats:
+            stats.noeuds[profondeur] += 1
+            for _, _, stats_worker in resultats:
+                stats.fusionner(stats_worker)
+
+        # Comme minimax : le premier coup (dans l'ordre des colonnes) parmi les meilleurs
+        colonne, valeur, _ = resultats[0]
+        for col, score, _ in resultats[1:]:
+            if (maximisant and score > valeur) or (not maximisant and score < valeur):
+                colonne, valeur = col, score
+        return colonne+1, valeur
+
+    def fermer(self):
+        """Arrête les processus workers"""
+        self.executeur.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+def rapport_acceleration(profondeur=7, nb_workers_max=None, coups="4455"):
+    """Affiche le temps de recherche et l'accélération obtenue selon le nombre de workers"""
+    grille = Grille()
+    joueur = 1
+    for col in coups:
+        grille.ajouter_piece(int(col), joueur)
+        joueur = 3 - joueur
+
+    debut = time.perf_counter()
+    reference = minimax_en_place(grille, profondeur, float('-inf'), float('inf'), True)
+    temps_serie = time.perf_counter() - debut
+    print(f"Séquentiel : {temps_serie:.2f} s -> coup {reference[0]}, score {reference[1]}")
+
+    nb_workers_max = nb_workers_max or os.cpu_count() or 1
+    for nb_workers in range(1, nb_workers_max + 1):
+        with RechercheParallele(nb_workers) as recherche:
+            recherche.chercher(grille, 1)  # Démarre les processus avant de mesurer
+            debut = time.perf_counter()
+            resultat = recherche.chercher(grille, profondeur)
+            temps = time.perf_counter() - debut
+        identique = "identique" if resultat == reference else f"DIFFÉRENT {resultat}"
+        print(f"{nb_workers} worker(s) : {temps:.2f} s, accélération x{temps_serie / temps:.2f} ({identique})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure l'accélération de Minimax sur plusieurs cœurs")
+    parser.add_argument("--profondeur", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=None, help="nombre maximum de workers")
+    parser.add_argument("--coups", default="4455", help="coups joués avant la recherche (colonnes 1 à 7)")
+    args = parser.parse_args()
+    rapport_acceleration(args.profondeur, args.workers, args.coups)
@@ -0,0 +1,484 @@
+# Module pour la recherche Minimax avec table de transposition
+import threading
+import time
+
+from transposition import ZOBRIST_TRAIT, EXACTE, INFERIEURE, SUPERIEURE
+
+
+def _compter_noeud(stats, profondeur, valeur_terminale):
+    """Compte un noeud dans les statistiques : fin de partie, feuille évaluée ou noeud intérieur"""
+    stats.noeuds[profondeur] += 1
+    if valeur_terminale is not None:
+        stats.terminaux += 1
+    elif profondeur == 0:
+        stats.evaluations += 1
+
+
+def _valeur_tt(grille, profondeur, alpha, beta, maximisant, table, stats=None):
+    """Valeur Minimax d'un noeud (joue/annule sur la grille), en consultant la table de transposition"""
+    coups_valides = grille.coups_valides()
+    if grille.est_gagnant(2):
+        valeur = 1000000
+    elif grille.est_gagnant(1):
+        valeur = -1000000
+    elif not coups_valides:
+        valeur = 0
+    else:
+        valeur = None
+    if stats is not None:
+        _compter_noeud(stats, profondeur, valeur)
+    if valeur is not None:
+        return valeur
+    if profondeur == 0:
+        return grille.scores[2]  # Score tenu à jour par la grille
+    coups_valides = grille.coups_non_perdants(2 if maximisant else 1)
+    if not coups_valides:
+        return -1000000 if maximisant else 1000000  # Tous les coups perdent
+
+    # Une position et son miroir partagent leur entrée ; le joueur au trait change la clé
+    miroir = grille.hash_miroir < grille.hash
+    cle = grille.hash_miroir if miroir else grille.hash
+    if maximisant:
+        cle ^= ZOBRIST_TRAIT
+    entree = table.consulter(cle)
+    if entree is not None:
+        profondeur_tt, valeur_tt, borne, coup_tt = entree
+        if miroir:
+            coup_tt = 6 - coup_tt
+        if profondeur_tt >= profondeur:
+            if borne == EXACTE:
+                if stats is not None:
+                    stats.succes_table += 1
+                return valeur_tt
+            if borne == INFERIEURE:
+                alpha = max(alpha, valeur_tt)
+            else:
+                beta = min(beta, valeur_tt)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.succes_table += 1
+                return valeur_tt
+        # Le meilleur coup connu est essayé en premier
+        if coup_tt in coups_valides:
+            coups_valides = (coup_tt,) + tuple(col for col in coups_valides if col != coup_tt)
+
+    alpha_initial, beta_initial = alpha, beta
+    meilleur_coup = coups_valides[0]
+    if maximisant:
+        valeur = float('-inf')
+        for rang, col in enumerate(coups_valides):
+            grille.ajouter_piece(col+1, 2)
+            nouveau_score = _valeur_tt(grille, profondeur-1, alpha, beta, False, table, stats)
+            grille.annuler()
+            if nouveau_score > valeur:
+                valeur = nouveau_score
+                meilleur_coup = col
+            alpha = max(alpha, valeur)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.coupure(rang)
+                break
+    else:
+        valeur = float('inf')
+        for rang, col in enumerate(coups_valides):
+            grille.ajouter_piece(col+1, 1)
+            nouveau_score = _valeur_tt(grille, profondeur-1, alpha, beta, True, table, stats)
+            grille.annuler()
+            if nouveau_score < valeur:
+                valeur = nouveau_score
+                meilleur_coup = col
+            beta = min(beta, valeur)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.coupure(rang)
+                break
+
+    if valeur <= alpha_initial:
+        borne = SUPERIEURE
+    elif valeur >= beta_initial:
+        borne = INFERIEURE
+    else:
+        borne = EXACTE
+    table.stocker(cle, profondeur, valeur, borne, 6 - meilleur_coup if miroir else meilleur_coup)
+    return valeur
+
+
+def minimax_tt(grille, profondeur, alpha, beta, maximisant, table, stats=None):
+    """
+    Minimax alpha-beta (joue/annule sur la grille) avec table de transposition
+
+    - table: TableTransposition conservée d'un coup à l'autre pendant la partie
+    - stats: StatistiquesRecherche à remplir (optionnel)
+    Retourne (colonne de 1 à 7, score) comme minimax.
+    """
+    coups_valides = grille.coups_valides()
+    if profondeur == 0 or not coups_valides or grille.est_gagnant(1) or grille.est_gagnant(2):
+        return (None, _valeur_tt(grille, 0, alpha, beta, maximisant, table, stats))
+
+    if stats is not None:
+        stats.noeuds[profondeur] += 1
+    piece = 2 if maximisant else 1
+    coups_valides = grille.coups_non_perdants(piece)
+    if not coups_valides:
+        return grille.coups_valides()[0]+1, (-1000000 if maximisant else 1000000)  # Tous les coups perdent
+
+    # Le coup retenu à la recherche précédente sur cette position est essayé en premier
+    miroir = grille.hash_miroir < grille.hash
+    cle = grille.hash_miroir if miroir else grille.hash
+    if maximisant:
+        cle ^= ZOBRIST_TRAIT
+    entree = table.consulter(cle)
+    if entree is not None:
+        coup_tt = 6 - entree[3] if miroir else entree[3]
+        if coup_tt in coups_valides:
+            coups_valides = (coup_tt,) + tuple(col for col in coups_valides if col != coup_tt)
+
+    valeur = float('-inf') if maximisant else float('inf')
+    alpha_initial, beta_initial = alpha, beta
+    colonne = coups_valides[0]
+    for rang, col in enumerate(coups_valides):
+        grille.ajouter_piece(col+1, piece)
+        nouveau_score = _valeur_tt(grille, profondeur-1, alpha, beta, not maximisant, table, stats)
+        grille.annuler()
+        if maximisant:
+            if nouveau_score > valeur:
+                valeur = nouveau_score
+                colonne = col
+            alpha = max(alpha, valeur)
+        else:
+            if nouveau_score < valeur:
+                valeur = nouveau_score
+                colonne = col
+            beta = min(beta, valeur)
+        if alpha >= beta:
+            if stats is not None:
+                stats.coupure(rang)
+            break
+
+    if valeur <= alpha_initial:
+        borne = SUPERIEURE
+    elif valeur >= beta_initial:
+        borne = INFERIEURE
+    else:
+        borne = EXACTE
+    table.stocker(cle, profondeur, valeur, borne, 6 - colonne if miroir else colonne)
+    return colonne+1, valeur
+
+
+# Ordre des colonnes du centre vers les bords (les coups centraux sont souvent les meilleurs)
+ORDRE_CENTRE = (3, 2, 4, 1, 5, 0, 6)
+RANG_CENTRE = [ORDRE_CENTRE.index(col) for col in range(7)]
+
+# Demi-largeur de la fenêtre d'aspiration autour du score de l'itération précédente
+FENETRE_ASPIRATION = 30
+# Le chronomètre n'est consulté qu'une fois tous les N noeuds
+NOEUDS_ENTRE_VERIFICATIONS = 1024
+
+
+class TempsEcoule(Exception):
+    """Levée pour interrompre une itération quand le temps alloué est dépassé"""
+
+
+class RechercheIterative:
+    def __init__(self, table=None):
+        """
+        Recherche Minimax par approfondissement itératif avec limite de temps
+
+        table: TableTransposition partagée (une nouvelle est créée si absente)
+
+        Les coups sont ordonnés : coup de la table (variation principale), coups
+        "killer" du même niveau, puis heuristique de l'historique et centre d'abord.
+        """
+        if table is None:
+            from transposition import TableTransposition
+            table = TableTransposition()
+        self.table = table
+        self.killers = [[-1, -1] for _ in range(43)]
+        self.historique = [[0] * 7 for _ in range(3)]
+        self.limite = None
+        self.arret = None
+        self.noeuds = 0
+        self.stats = None
+
+    def nouvelle_partie(self):
+        """Oublie les recherches de la partie précédente"""
+        self.table.vider()
+        self.historique = [[0] * 7 for _ in range(3)]
+
+    def _ordonner(self, coups_valides, coup_tt, ply, piece):
+        """Trie les coups : coup de la table, killers, puis historique et centre"""
+        killers = self.killers[ply]
+        historique = self.historique[piece]
+
+        def priorite(col):
+            if col == coup_tt:
+                return (0, 0, 0)
+            if col == killers[0]:
+                return (1, 0, 0)
+            if col == killers[1]:
+                return (2, 0, 0)
+            return (3, -historique[col], RANG_CENTRE[col])
+
+        return sorted(coups_valides, key=priorite)
+
+    def _coupure(self, col, ply, piece, profondeur):
+        """Mémorise un coup qui a provoqué une coupure beta"""
+        killers = self.killers[ply]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+        self.historique[piece][col] += profondeur * profondeur
+
+    def _valeur(self, grille, profondeur, alpha, beta, maximisant, ply):
+        """Valeur Minimax d'un noeud, avec table de transposition et ordre des coups"""
+        self.noeuds += 1
+        if self.noeuds % NOEUDS_ENTRE_VERIFICATIONS == 0:
+            if (self.limite is not None and time.perf_counter() > self.limite) or \
+                    (self.arret is not None and self.arret.is_set()):
+                raise TempsEcoule()
+
+        coups_valides = grille.coups_valides()
+        if grille.est_gagnant(2):
+            valeur = 1000000
+        elif grille.est_gagnant(1):
+            valeur = -1000000
+        elif not coups_valides:
+            valeur = 0
+        else:
+            valeur = None
+        stats = self.stats
+        if stats is not None:
+            _compter_noeud(stats, profondeur, valeur)
+        if valeur is not None:
+            return valeur
+        if profondeur == 0:
+            return grille.scores[2]  # Score tenu à jour par la grille
+
+        miroir = grille.hash_miroir < grille.hash
+        cle = grille.hash_miroir if miroir else grille.hash
+        if maximisant:
+            cle ^= ZOBRIST_TRAIT
+        coup_tt = -1
+        entree = self.table.consulter(cle)
+        if entree is not None:
+            profondeur_tt, valeur_tt, borne, coup_tt = entree
+            if miroir:
+                coup_tt = 6 - coup_tt
+            if profondeur_tt >= profondeur:
+                if borne == EXACTE:
+                    if stats is not None:
+                        stats.succes_table += 1
+                    return valeur_tt
+                if borne == INFERIEURE:
+                    alpha = max(alpha, valeur_tt)
+                else:
+                    beta = min(beta, valeur_tt)
+                if alpha >= beta:
+                    if stats is not None:
+                        stats.succes_table += 1
+                    return valeur_tt
+
+        piece = 2 if maximisant else 1
+        alpha_initial, beta_initial = alpha, beta
+        coups = grille.coups_non_perdants(piece)
+        if not coups:
+            return -1000000 if maximisant else 1000000  # Tous les coups perdent
+        coups = self._ordonner(coups, coup_tt, ply, piece)
+        meilleur_coup = coups[0]
+        valeur = float('-inf') if maximisant else float('inf')
+        for rang, col in enumerate(coups):
+            grille.ajouter_piece(col+1, piece)
+            nouveau_score = self._valeur(grille, profondeur-1, alpha, beta, not maximisant, ply+1)
+            grille.annuler()
+            if maximisant:
+                if nouveau_score > valeur:
+                    valeur = nouveau_score
+                    meilleur_coup = col
+                alpha = max(alpha, valeur)
+            else:
+                if nouveau_score < valeur:
+                    valeur = nouveau_score
+                    meilleur_coup = col
+                beta = min(beta, valeur)
+            if alpha >= beta:
+                self._coupure(col, ply, piece, profondeur)
+                if stats is not None:
+                    stats.coupure(rang)
+                break
+
+        if valeur <= alpha_initial:
+            borne = SUPERIEURE
+        elif valeur >= beta_initial:
+            borne = INFERIEURE
+        else:
+            borne = EXACTE
+        self.table.stocker(cle, profondeur, valeur, borne, 6 - meilleur_coup if miroir else meilleur_coup)
+        return valeur
+
+    def _racine(self, grille, profondeur, alpha, beta, maximisant, coup_pv):
+        """Explore la racine avec la fenêtre (alpha, beta) et retourne (colonne 0-6, score)"""
+        piece = 2 if maximisant else 1
+        coups = self._ordonner(grille.coups_non_perdants(piece), coup_pv, 0, piece)
+        if self.stats is not None:
+            self.stats.noeuds[profondeur] += 1
+        if not coups:
+            return grille.coups_valides()[0], (-1000000 if maximisant else 1000000)  # Tous les coups perdent
+        colonne = coups[0]
+        valeur = float('-inf') if maximisant else float('inf')
+        for rang, col in enumerate(coups):
+            grille.ajouter_piece(col+1, piece)
+            nouveau_score = self._valeur(grille, profondeur-1, alpha, beta, not maximisant, 1)
+            grille.annuler()
+            if maximisant:
+                if nouveau_score > valeur:
+                    valeur = nouveau_score
+                    colonne = col
+                alpha = max(alpha, valeur)
+            else:
+                if nouveau_score < valeur:
+                    valeur = nouveau_score
+                    colonne = col
+                beta = min(beta, valeur)
+            if alpha >= beta:
+                if self.stats is not None:
+                    self.stats.coupure(rang)
+                break
+        return colonne, valeur
+
+    def chercher(self, grille, temps_max, maximisant=True, profondeur_max=42, stats=None, arret=None):
+        """
+        Approfondit la recherche jusqu'à épuisement du temps (en secondes)
+
+        stats: StatistiquesRecherche à remplir (optionnel), avec le temps de chaque itération
+        arret: threading.Event qui interrompt la recherche dès qu'il est levé (optionnel)
+        Retourne (colonne de 1 à 7, score, profondeur complètement explorée).
+        La profondeur 1 est toujours terminée pour garantir un coup.
+        """
+        coups_valides = grille.coups_valides()
+        if not coups_valides or grille.est_gagnant(1) or grille.est_gagnant(2):
+            return None, 0, 0
+
+        self.killers = [[-1, -1] for _ in range(43)]
+        for scores in self.historique:
+            for col in range(7):
+                scores[col] //= 2  # Vieillissement de l'historique entre deux coups
+        self.noeuds = 0
+        self.limite = None
+        self.arret = arret
+        self.stats = stats
+        debut = time.perf_counter()
+        nb_coups_initial = len(grille.historique)
+
+        profondeur_max = min(profondeur_max, 42 - grille.nb_pieces)
+        meilleur, score, profondeur_atteinte = coups_valides[0], 0, 0
+        for profondeur in range(1, profondeur_max + 1):
+            noeuds_avant, debut_iteration = self.noeuds, time.perf_counter()
+            try:
+                if profondeur == 2:
+                    self.limite = debut + temps_max
+                # Fenêtre d'aspiration autour du score précédent (sauf si une victoire est trouvée)
+                if profondeur > 1 and abs(score) < 1000000:
+                    alpha, beta = score - FENETRE_ASPIRATION, score + FENETRE_ASPIRATION
+                    col, valeur = self._racine(grille, profondeur, alpha, beta, maximisant, meilleur)
+                    if valeur <= alpha or valeur >= beta:
+                        col, valeur = self._racine(grille, profondeur, float('-inf'), float('inf'), maximisant, col)
+                else:
+                    col, valeur = self._racine(grille, profondeur, float('-inf'), float('inf'), maximisant, meilleur)
+            except TempsEcoule:
+                # Remet la grille dans son état initial
+                while len(grille.historique) > nb_coups_initial:
+                    grille.annuler()
+                break
+            meilleur, score, profondeur_atteinte = col, valeur, profondeur
+            if stats is not None:
+                stats.iterations.append((profondeur, self.noeuds - noeuds_avant, time.perf_counter() - debut_iteration))
+            if abs(score) >= 1000000 or time.perf_counter() > debut + temps_max:
+                break
+
+        self.limite = None
+        self.arret = None
+        self.stats = None
+        return meilleur + 1, score, profondeur_atteinte
+
+
+class ReflexionAnticipee:
+    def __init__(self, moteur, profondeur_max=42, temps_max=None):
+        """
+        Fait réfléchir l'IA (joueur 2, qui maximise) pendant que le joueur humain choisit son coup
+
+        moteur: RechercheIterative de l'IA, dont la table de transposition est remplie
+        profondeur_max: profondeur de la réponse attendue (difficulté de Minimax)
+        temps_max: temps de réflexion par coup de l'IA, si elle joue au temps
+
+        Un thread cherche la réponse de l'IA à chaque coup possible du joueur, de plus
+        en plus profondément. Si le joueur joue un coup déjà assez étudié (profondeur
+        atteinte, ou temps passé dessus), la réponse est donnée tout de suite ; sinon la
+        recherche normale profite de la table déjà remplie.
+        """
+        self.moteur = moteur
+        self.profondeur_max = profondeur_max
+        self.temps_max = temps_max
+        self.arret = threading.Event()
+        self.thread = None
+        self.coups_racine = None
+        self.resultats = {}
+
+    def demarrer(self, grille):
+        """Lance la réflexion sur une copie de la grille (le joueur humain est au trait)"""
+        if self.thread is not None:
+            return
+        if grille.historique != self.coups_racine:
+            self.coups_racine = list(grille.historique)
+            self.resultats = {}
+        self.arret.clear()
+        self.thread = threading.Thread(target=self._reflechir, args=(grille.copier(),), daemon=True)
+        self.thread.start()
+
+    def arreter(self):
+        """Interrompt la réflexion et attend la fin du thread (le moteur redevient libre)"""
+        if self.thread is None:
+            return
+        self.arret.set()
+        self.thread.join()
+        self.thread = None
+
+    def resultat(self, grille):
+        """(colonne de 1 à 7, score) déjà trouvé pour la grille après le coup du joueur, ou None"""
+        if grille.historique[:-1] != self.coups_racine:
+            return None
+        resultat = self.resultats.get(grille.historique[-1])
+        if resultat is None:
+            return None
+        col, score, profondeur, temps = resultat
+        if self.temps_max is not None:
+            termine = temps >= self.temps_max
+        else:
+            termine = profondeur >= min(self.profondeur_max, 42 - grille.nb_pieces)
+        if termine or abs(score) >= 1000000:
+            return col, score
+        return None
+
+    def _reponses(self, grille):
+        """Coups du joueur : celui que l'IA attend d'abord (coup de la table), puis du centre vers les bords"""
+        miroir = grille.hash_miroir < grille.hash
+        entree = self.moteur.table.consulter(grille.hash_miroir if miroir else grille.hash)
+        attendu = -1 if entree is None else (6 - entree[3] if miroir else entree[3])
+        return sorted(grille.coups_valides(), key=lambda col: (col != attendu, RANG_CENTRE[col]))
+
+    def _reflechir(self, grille):
+        reponses = self._reponses(grille)
+        for profondeur in range(1, min(self.profondeur_max, 41 - grille.nb_pieces) + 1):
+            for col in reponses:
+                if self.arret.is_set():
+                    return
+                ancien = self.resultats.get(col)
+                if ancien is not None and (ancien[2] >= profondeur or abs(ancien[1]) >= 1000000):
+                    continue  # Déjà étudié à cette profondeur (réflexion reprise) ou partie décidée
+                grille.ajouter_piece(col+1, 1)
+                if not grille.est_gagnant(1) and not grille.est_pleine():
+                    debut = time.perf_counter()
+                    coup, score, _ = self.moteur.chercher(grille, float('inf'), True, profondeur, arret=self.arret)
+                    if not self.arret.is_set():  # Une recherche interrompue n'est pas terminée
+                        temps = time.perf_counter() - debut + (ancien[3] if ancien is not None else 0.0)
+                        self.resultats[col] = (coup, score, profondeur, temps)
+                grille.annuler()
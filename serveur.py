@@ -0,0 +1,380 @@
+# Module pour servir des coups à plusieurs parties en même temps (serveur asyncio local, un JSON par ligne)
+#
+# Requête : {"id": 1, "coups": "4453", "moteur": "minimax", "profondeur": 6}
+#   - coups: colonnes jouées depuis la grille vide (de 1 à 7, le joueur 1 commence)
+#   - moteur: "minimax" (profondeur, 6 par défaut), "mcts" (simulations, 2000 par défaut),
+#     "solveur" (jeu parfait, seulement en fin de partie) ou "agent" (modèle Q-learning)
+# Réponse : {"id": 1, "colonne": 4, "score": 17, "cache": false, "temps_ms": 3.2}
+#   - score: score Minimax (positif = bon pour le joueur 2), score exact du solveur ou chances
+#     de gagner de MCTS (pour le joueur au trait), rien pour l'agent
+#   - en cas de problème : {"id": 1, "erreur": "..."}
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from main import Grille, grille_depuis_coups, HAUTEUR, LARGEUR
+from modele_fige import charger_agent
+from recherche import minimax_tt
+from transposition import TableTransposition
+from table_q import cle_canonique
+from solveur import Solveur
+from mcts import MCTS
+
+HOTE = "127.0.0.1"
+PORT = 7744
+# Une requête attend au plus DELAI_LOT secondes que d'autres la rejoignent (TAILLE_LOT au maximum)
+TAILLE_LOT = 64
+DELAI_LOT = 0.002
+# Nombre de réponses gardées en mémoire, partagées entre tous les clients
+TAILLE_CACHE = 100_000
+PROFONDEUR_MAX = 12
+SIMULATIONS_MAX = 200_000
+# Le solveur n'est proposé qu'en fin de partie (au-delà, une réponse peut prendre des minutes)
+CASES_VIDES_SOLVEUR = 24
+
+
+# Moteurs du processus worker (créés une seule fois)
+_table = None
+_solveur = None
+_mcts = None
+
+
+def _initialiser_worker():
+    global _table, _solveur, _mcts
+    _table = TableTransposition()
+    _solveur = Solveur()
+    _mcts = MCTS()
+
+
+def _calculer(coups, moteur, budget):
+    """Cherche le coup d'une position dans un worker et retourne (colonne de 1 à 7, score)"""
+    grille = grille_depuis_coups(coups)
+    piece = 1 + grille.nb_pieces % 2
+    if moteur == "minimax":
+        return minimax_tt(grille, budget, float('-inf'), float('inf'), piece == 2, _table)
+    if moteur == "solveur":
+        return _solveur.meilleur_coup(grille, piece)
+    col, chances, _ = _mcts.chercher(grille, iterations=budget)
+    return col, chances
+
+
+def _calculer_lot(demandes):
+    """Traite une partie d'un lot dans un worker : liste de (coups, moteur, budget)"""
+    return [_calculer(*demande) for demande in demandes]
+
+
+def lire_requete(message):
+    """
+    Vérifie une requête et retourne (grille, moteur, budget)
+
+    Lève ValueError avec un message lisible si la requête n'est pas valable.
+    """
+    coups = message.get("coups", "")
+    if not isinstance(coups, str) or any(c not in "1234567" for c in coups):
+        raise ValueError("coups doit être une suite de colonnes de 1 à 7")
+    grille = Grille()
+    for i, col in enumerate(coups):
+        if grille.est_gagnant(1) or grille.est_gagnant(2) or not grille.ajouter_piece(int(col), 1 + i % 2):
+            raise ValueError(f"coup impossible : {col} (coup numéro {i+1})")
+    if grille.est_gagnant(1) or grille.est_gagnant(2) or grille.est_pleine():
+        raise ValueError("la partie est déjà terminée")
+
+    moteur = message.get("moteur", "minimax")
+    if moteur == "minimax":
+        budget = int(message.get("profondeur", 6))
+        if not 1 <= budget <= PROFONDEUR_MAX:
+            raise ValueError(f"profondeur entre 1 et {PROFONDEUR_MAX}")
+    elif moteur == "mcts":
+        budget = int(message.get("simulations", 2000))
+        if not 1 <= budget <= SIMULATIONS_MAX:
+            raise ValueError(f"simulations entre 1 et {SIMULATIONS_MAX}")
+    elif moteur == "solveur":
+        budget = None
+        if HAUTEUR * LARGEUR - grille.nb_pieces > CASES_VIDES_SOLVEUR:
+            raise ValueError(f"le solveur demande au plus {CASES_VIDES_SOLVEUR} cases vides")
+    elif moteur == "agent":
+        budget = None
+    else:
+        raise ValueError(f"moteur inconnu : {moteur}")
+    return grille, moteur, budget
+
+
+class ServeurCoups:
+    def __init__(self, nb_workers=None, taille_lot=TAILLE_LOT, delai_lot=DELAI_LOT,
+                 taille_cache=TAILLE_CACHE, fichier_modele='q_learning_model.bin'):
+        """
+        Serveur de coups pour des parties jouées en parallèle
+
+        Les requêtes qui arrivent presque en même temps sont regroupées en lots :
+        les positions identiques (ou symétriques) ne sont calculées qu'une fois,
+        celles déjà connues sont lues dans le cache partagé, et le reste est réparti
+        entre les processus workers (qui gardent leurs moteurs d'une requête à l'autre)
+        sans bloquer la boucle asyncio. L'agent Q-learning répond dans le serveur même.
+        """
+        self.nb_workers = nb_workers or os.cpu_count() or 1
+        self.taille_lot = taille_lot
+        self.delai_lot = delai_lot
+        self.taille_cache = taille_cache
+        self.executeur = ProcessPoolExecutor(max_workers=self.nb_workers, initializer=_initialiser_worker)
+        self.agent = charger_agent(fichier_modele)
+        self.cache = OrderedDict()  # (clé canonique, moteur, budget) -> (colonne 0-6 canonique, score)
+        self.file = None
+        self.serveur = None
+        self.taches = set()
+        self.clients = {}  # Tâche de chaque connexion -> son flux d'écriture
+        self.compteurs = {"requetes": 0, "succes_cache": 0, "lots": 0, "calculs": 0, "erreurs": 0}
+
+    async def demarrer(self, hote=HOTE, port=PORT, socket_unix=None):
+        """Ouvre le serveur (TCP, ou socket Unix si un chemin est donné) et lance le regroupement en lots"""
+        self.file = asyncio.Queue()
+        self._garder(asyncio.create_task(self._regrouper()))
+        if socket_unix is not None:
+            self.serveur = await asyncio.start_unix_server(self._client, path=socket_unix)
+        else:
+            self.serveur = await asyncio.start_server(self._client, hote, port)
+        return self.serveur
+
+    async def fermer(self):
+        """Ferme les connexions (après leurs réponses en attente), les tâches et les workers"""
+        self.serveur.close()
+        for ecrivain in self.clients.values():
+            ecrivain.close()
+        await asyncio.gather(*self.clients, return_exceptions=True)
+        await self.serveur.wait_closed()
+        for tache in list(self.taches):
+            tache.cancel()
+        self.executeur.shutdown()
+
+    def _garder(self, tache):
+        """Garde une référence à une tâche jusqu'à sa fin (sinon elle pourrait disparaître)"""
+        self.taches.add(tache)
+        tache.add_done_callback(self.taches.discard)
+
+    async def _client(self, lecteur, ecrivain):
+        """Lit les requêtes d'un client ; chacune est traitée à part (les réponses peuvent se croiser)"""
+        verrou = asyncio.Lock()
+        self.clients[asyncio.current_task()] = ecrivain
+
+        async def repondre(ligne):
+            reponse = await self.traiter(ligne)
+            async with verrou:
+                ecrivain.write(json.dumps(reponse).encode() + b"\n")
+                await ecrivain.drain()
+
+        en_cours = set()
+        try:
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne:
+                    break
+                tache = asyncio.create_task(repondre(ligne))
+                en_cours.add(tache)
+                tache.add_done_callback(en_cours.discard)
+            # Le client a fini d'écrire : on lui envoie encore les réponses en attente
+            await asyncio.gather(*en_cours, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            del self.clients[asyncio.current_task()]
+            ecrivain.close()
+
+    async def traiter(self, ligne):
+        """Répond à une requête (ligne JSON) et retourne la réponse sous forme de dictionnaire"""
+        debut = time.perf_counter()
+        self.compteurs["requetes"] += 1
+        identifiant = None
+        try:
+            message = json.loads(ligne)
+            identifiant = message.get("id")
+            grille, moteur, budget = lire_requete(message)
+        except (ValueError, TypeError, AttributeError) as erreur:
+            self.compteurs["erreurs"] += 1
+            return {"id": identifiant, "erreur": str(erreur)}
+
+        if moteur == "agent":
+            if self.agent is None:
+                return {"id": identifiant, "erreur": "pas de modèle entraîné pour l'agent"}
+            col = self.agent.choose_action(grille, [c+1 for c in grille.coups_valides()])
+            return {"id": identifiant, "colonne": col, "score": None, "cache": False,
+                    "temps_ms": (time.perf_counter() - debut) * 1000}
+
+        cle, miroir = cle_canonique(grille.cle())
+        entree = self.cache.get((cle, moteur, budget))
+        en_cache = entree is not None
+        if en_cache:
+            self.cache.move_to_end((cle, moteur, budget))
+            self.compteurs["succes_cache"] += 1
+        else:
+            futur = asyncio.get_running_loop().create_future()
+            await self.file.put(((cle, moteur, budget), "".join(str(c+1) for c in grille.historique), miroir, futur))
+            try:
+                entree = await futur
+            except Exception as erreur:
+                self.compteurs["erreurs"] += 1
+                return {"id": identifiant, "erreur": f"échec de la recherche : {erreur}"}
+        col, score = entree
+        return {"id": identifiant, "colonne": (6 - col if miroir else col) + 1, "score": score,
+                "cache": en_cache, "temps_ms": (time.perf_counter() - debut) * 1000}
+
+    async def _regrouper(self):
+        """Forme les lots : la première requête attend un court instant que d'autres arrivent"""
+        boucle = asyncio.get_running_loop()
+        while True:
+            lot = [await self.file.get()]
+            limite = boucle.time() + self.delai_lot
+            while len(lot) < self.taille_lot:
+                reste = limite - boucle.time()
+                if reste <= 0:
+                    break
+                try:
+                    lot.append(await asyncio.wait_for(self.file.get(), reste))
+                except asyncio.TimeoutError:
+                    break
+            self._garder(asyncio.create_task(self._traiter_lot(lot)))
+
+    async def _traiter_lot(self, lot):
+        """Calcule les positions différentes d'un lot dans les workers et répond à toutes les requêtes"""
+        self.compteurs["lots"] += 1
+        attentes = {}  # Clé -> [coups d'une des positions, son orientation, futurs qui attendent le résultat]
+        for cle, coups, miroir, futur in lot:
+            if cle in self.cache:
+                futur.set_result(self.cache[cle])
+                self.compteurs["succes_cache"] += 1
+            elif cle in attentes:
+                attentes[cle][2].append(futur)
+            else:
+                attentes[cle] = [coups, miroir, [futur]]
+        if not attentes:
+            return
+        cles = list(attentes)
+        demandes = [(attentes[cle][0], cle[1], cle[2]) for cle in cles]
+        self.compteurs["calculs"] += len(demandes)
+
+        # Un morceau du lot par worker
+        boucle = asyncio.get_running_loop()
+        taille = -(-len(demandes) // self.nb_workers)
+        morceaux = [demandes[i:i + taille] for i in range(0, len(demandes), taille)]
+        try:
+            resultats = await asyncio.gather(*(boucle.run_in_executor(self.executeur, _calculer_lot, morceau)
+                                               for morceau in morceaux))
+        except Exception as erreur:
+            for cle in cles:
+                for futur in attentes[cle][2]:
+                    if not futur.done():
+                        futur.set_exception(erreur)
+            return
+        resultats = [resultat for morceau in resultats for resultat in morceau]
+
+        for cle, (col, score) in zip(cles, resultats):
+            # Le coup est rangé dans l'orientation canonique (comme dans le livre d'ouvertures)
+            _, miroir, futurs = attentes[cle]
+            entree = (6 - (col - 1) if miroir else col - 1, score)
+            self.cache[cle] = entree
+            if len(self.cache) > self.taille_cache:
+                self.cache.popitem(last=False)
+            for futur in futurs:
+                if not futur.done():
+                    futur.set_result(entree)
+
+
+def quantile(valeurs, q):
+    """Quantile q (entre 0 et 1) d'une liste de valeurs, par la méthode du rang le plus proche"""
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, max(0, round(q * len(valeurs)) - 1))]
+
+
+async def generer_charge(hote=HOTE, port=PORT, socket_unix=None, clients=16, requetes=100,
+                         moteur="minimax", budget=None, graine=0):
+    """
+    Simule clients parties qui demandent chacune requetes coups, un à la fois
+
+    Les positions sont tirées au hasard (avec une graine) parmi des positions de
+    milieu de partie, donc certaines reviennent et sont servies par le cache.
+    Retourne les latences (en secondes), le débit et le nombre de réponses venues du cache.
+    """
+    from benchmark import positions_fixes
+    positions = positions_fixes(200, graine + 1)
+    champ = {"minimax": "profondeur", "mcts": "simulations"}.get(moteur)
+
+    async def client(numero):
+        generateur = random.Random(graine * 1000 + numero)
+        if socket_unix is not None:
+            lecteur, ecrivain = await asyncio.open_unix_connection(socket_unix)
+        else:
+            lecteur, ecrivain = await asyncio.open_connection(hote, port)
+        latences, caches = [], 0
+        for i in range(requetes):
+            message = {"id": i, "coups": generateur.choice(positions), "moteur": moteur}
+            if champ is not None and budget is not None:
+                message[champ] = budget
+            debut = time.perf_counter()
+            ecrivain.write(json.dumps(message).encode() + b"\n")
+            await ecrivain.drain()
+            reponse = json.loads(await lecteur.readline())
+            latences.append(time.perf_counter() - debut)
+            if "erreur" in reponse:
+                raise RuntimeError(reponse["erreur"])
+            caches += reponse["cache"]
+        ecrivain.close()
+        await ecrivain.wait_closed()
+        return latences, caches
+
+    debut = time.perf_counter()
+    resultats = await asyncio.gather(*(client(numero) for numero in range(clients)))
+    duree = time.perf_counter() - debut
+    latences = [latence for resultat, _ in resultats for latence in resultat]
+    return {
+        "requetes": len(latences),
+        "requetes_par_seconde": len(latences) / duree,
+        "p50_ms": quantile(latences, 0.50) * 1000,
+        "p99_ms": quantile(latences, 0.99) * 1000,
+        "reponses_du_cache": sum(caches for _, caches in resultats),
+    }
+
+
+async def _servir(args):
+    serveur = ServeurCoups(args.workers)
+    await serveur.demarrer(args.hote, args.port, args.socket)
+    print(f"Serveur prêt sur {args.socket or f'{args.hote}:{args.port}'} avec {serveur.nb_workers} worker(s)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await serveur.fermer()
+
+
+async def _tester_charge(args):
+    """Lance un serveur dans ce processus, le charge avec le générateur puis affiche les mesures"""
+    serveur = ServeurCoups(args.workers)
+    await serveur.demarrer(args.hote, args.port, args.socket)
+    try:
+        mesures = await generer_charge(args.hote, args.port, args.socket, args.clients, args.requetes,
+                                       args.moteur, args.budget)
+    finally:
+        await serveur.fermer()
+    print(f"{mesures['requetes']} requêtes de {args.clients} clients : {mesures['requetes_par_seconde']:.0f} requêtes/s, "
+          f"p50 {mesures['p50_ms']:.1f} ms, p99 {mesures['p99_ms']:.1f} ms, "
+          f"{mesures['reponses_du_cache']} réponses du cache")
+    print(f"Serveur : {serveur.compteurs}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur de coups (JSON par ligne) et générateur de charge")
+    parser.add_argument("--hote", default=HOTE)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--socket", default=None, help="chemin d'un socket Unix (à la place de TCP)")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut, un par cœur)")
+    parser.add_argument("--charge", action="store_true", help="lance le serveur et le générateur de charge puis affiche les mesures")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requetes", type=int, default=100, help="requêtes par client")
+    parser.add_argument("--moteur", default="minimax", choices=("minimax", "mcts", "solveur", "agent"))
+    parser.add_argument("--budget", type=int, default=None, help="profondeur (minimax) ou simulations (mcts)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_tester_charge(args) if args.charge else _servir(args))
+    except KeyboardInterrupt:
+        pass
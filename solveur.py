@@ -0,0 +1,250 @@
+# Module pour résoudre exactement une position (jeu parfait) avec negamax
+import argparse
+import random
+import time
+
+from main import (Grille, grille_depuis_coups, HAUTEUR, LARGEUR, BAS, PLATEAU, MASQUES_COLONNES,
+                  aligne_quatre, positions_gagnantes, calculer_score_position)
+from recherche import ORDRE_CENTRE
+
+NB_CASES = LARGEUR * HAUTEUR
+# À partir de ce nombre de cases vides (ou moins), Minimax laisse le solveur choisir le coup
+# (quelques centièmes de seconde par coup en moyenne)
+CASES_VIDES_SOLVEUR = 20
+# Taille maximale du cache (nombre de positions) avant de le vider
+TAILLE_CACHE = 1 << 22
+
+
+class Solveur:
+    def __init__(self, taille_cache=TAILLE_CACHE):
+        """
+        Résout exactement une position : negamax alpha-beta sur les bitboards de Grille
+
+        Le score est donné pour le joueur au trait : 0 pour un match nul, sinon
+        22 moins le nombre de pièces du gagnant à la fin de la partie (positif s'il
+        gagne, négatif s'il perd). Plus le score est loin de 0, plus la partie est courte.
+
+        - recherches à fenêtre nulle (dichotomie sur le score, comme MTD(f))
+        - bornes du score selon le nombre de cases vides pour couper plus tôt
+        - cache exact (clé unique de la position) des bornes déjà prouvées
+        - coups perdants écartés d'avance et coups qui créent des menaces essayés d'abord
+        """
+        self.cache = {}
+        self.taille_cache = taille_cache
+        self.noeuds = 0
+
+    def _negamax(self, pieces, masque, nb, alpha, beta):
+        """Score de la position (pieces = pièces du joueur au trait, nb = pièces jouées) dans (alpha, beta)"""
+        self.noeuds += 1
+        jouables = (masque + BAS) & PLATEAU
+        adversaire = pieces ^ masque
+        menaces = positions_gagnantes(adversaire, masque)
+        forces = jouables & menaces
+        if forces:
+            if forces & (forces - 1):
+                return -((NB_CASES - nb) // 2)  # Deux menaces à parer : partie perdue
+            jouables = forces
+        jouables &= ~(menaces >> 1)  # Ne pas jouer juste sous une case gagnante de l'adversaire
+        if not jouables:
+            return -((NB_CASES - nb) // 2)
+        if nb >= NB_CASES - 2:
+            return 0
+
+        # Bornes du score possible, resserrées par le cache
+        minimum = -((NB_CASES - 2 - nb) // 2)
+        maximum = (NB_CASES - 1 - nb) // 2
+        cle = pieces + masque
+        bornes = self.cache.get(cle)
+        if bornes is not None:
+            minimum = max(minimum, bornes[0])
+            maximum = min(maximum, bornes[1])
+        if alpha < minimum:
+            alpha = minimum
+            if alpha >= beta:
+                return alpha
+        if beta > maximum:
+            beta = maximum
+            if alpha >= beta:
+                return beta
+
+        # Les coups qui créent le plus de cases gagnantes d'abord, puis le centre
+        coups = []
+        for col in ORDRE_CENTRE:
+            coup = jouables & MASQUES_COLONNES[col]
+            if coup:
+                coups.append((bin(positions_gagnantes(pieces | coup, masque)).count("1"), coup))
+        coups.sort(key=lambda c: -c[0])
+
+        for _, coup in coups:
+            score = -self._negamax(adversaire, masque | coup, nb + 1, -beta, -alpha)
+            if score >= beta:
+                self._memoriser(cle, score, None)
+                return score
+            if score > alpha:
+                alpha = score
+        self._memoriser(cle, None, alpha)
+        return alpha
+
+    def _memoriser(self, cle, minimum, maximum):
+        """Ajoute une borne inférieure ou supérieure prouvée pour la position"""
+        if len(self.cache) >= self.taille_cache:
+            self.cache.clear()
+        bas, haut = self.cache.get(cle, (-NB_CASES, NB_CASES))
+        if minimum is not None:
+            bas = max(bas, minimum)
+        if maximum is not None:
+            haut = min(haut, maximum)
+        self.cache[cle] = (bas, haut)
+
+    def _resoudre(self, pieces, masque, nb):
+        """Score exact par recherches à fenêtre nulle successives"""
+        jouables = (masque + BAS) & PLATEAU
+        if positions_gagnantes(pieces, masque) & jouables:
+            return (NB_CASES + 1 - nb) // 2
+        minimum = -((NB_CASES - nb) // 2)
+        maximum = (NB_CASES + 1 - nb) // 2
+        while minimum < maximum:
+            milieu = minimum + (maximum - minimum) // 2
+            # Teste d'abord si la partie est gagnée ou perdue (souvent plus rapide)
+            if milieu <= 0 and int(minimum / 2) < milieu:
+                milieu = int(minimum / 2)
+            elif milieu >= 0 and int(maximum / 2) > milieu:
+                milieu = int(maximum / 2)
+            score = self._negamax(pieces, masque, nb, milieu, milieu + 1)
+            if score <= milieu:
+                maximum = score
+            else:
+                minimum = score
+        return minimum
+
+    def _depuis_grille(self, grille, piece):
+        """(pièces du joueur au trait, cases occupées, nombre de pièces) d'une grille non terminée"""
+        if grille.est_gagnant(1) or grille.est_gagnant(2) or grille.est_pleine():
+            raise ValueError("La partie est déjà terminée")
+        return grille.bitboards[piece], grille.bitboards[1] | grille.bitboards[2], grille.nb_pieces
+
+    def resoudre(self, grille, piece):
+        """Score exact de la grille pour piece, le joueur au trait"""
+        return self._resoudre(*self._depuis_grille(grille, piece))
+
+    def scores_coups(self, grille, piece):
+        """Score exact (pour piece, le joueur au trait) de chaque coup jouable : {colonne de 1 à 7: score}"""
+        pieces, masque, nb = self._depuis_grille(grille, piece)
+        scores = {}
+        for col in grille.coups_valides():
+            coup = (masque + BAS) & MASQUES_COLONNES[col]
+            if aligne_quatre(pieces | coup):
+                scores[col+1] = (NB_CASES + 1 - nb) // 2
+            elif nb + 1 == NB_CASES:
+                scores[col+1] = 0
+            else:
+                scores[col+1] = -self._resoudre(pieces ^ masque, masque | coup, nb + 1)
+        return scores
+
+    def meilleur_coup(self, grille, piece):
+        """Retourne (colonne de 1 à 7, score exact) du meilleur coup de piece, le plus central en cas d'égalité"""
+        scores = self.scores_coups(grille, piece)
+        col = max((c + 1 for c in ORDRE_CENTRE if c + 1 in scores), key=lambda c: scores[c])
+        return col, scores[col]
+
+
+def interpreter_score(score, nb_pieces):
+    """Traduit un score du solveur en (résultat pour le joueur au trait, nombre de coups avant la fin)"""
+    if score == 0:
+        return "nul", NB_CASES - nb_pieces
+    pieces_gagnant = NB_CASES // 2 + 1 - abs(score)
+    if score > 0:
+        return "victoire", 2 * (pieces_gagnant - nb_pieces // 2) - 1
+    return "défaite", 2 * (pieces_gagnant - (nb_pieces + 1) // 2)
+
+
+_solveur = None
+
+
+def solveur_partage():
+    """Solveur du processus, créé une seule fois (son cache sert d'un coup à l'autre)"""
+    global _solveur
+    if _solveur is None:
+        _solveur = Solveur()
+    return _solveur
+
+
+def positions_fin_de_partie(nombre, cases_vides, graine=0):
+    """Positions non terminées avec cases_vides cases libres, jouées au hasard (sans coup gagnant)"""
+    generateur = random.Random(graine)
+    positions = []
+    while len(positions) < nombre:
+        grille = Grille()
+        while grille.nb_pieces < NB_CASES - cases_vides:
+            piece = 1 + grille.nb_pieces % 2
+            coups = []
+            for col in grille.coups_valides():
+                grille.ajouter_piece(col+1, piece)
+                if not grille.est_gagnant(piece):
+                    coups.append(col)
+                grille.annuler()
+            if not coups:
+                break
+            grille.ajouter_piece(generateur.choice(coups) + 1, piece)
+        else:
+            positions.append(grille)
+    return positions
+
+
+def comparer_avec_exact(nombre=100, cases_vides=CASES_VIDES_SOLVEUR, graine=0, agent=None):
+    """
+    Se sert du solveur comme vérité : pour des positions de fin de partie, mesure
+    - l'accord du signe de calculer_score_position avec le résultat exact (parties décidées)
+    - la proportion de coups optimaux (même résultat exact que le meilleur coup) de l'agent s'il est donné
+    """
+    solveur = Solveur()
+    accords = decidees = optimaux = 0
+    debut = time.perf_counter()
+    for grille in positions_fin_de_partie(nombre, cases_vides, graine):
+        # Le joueur 1 commence : le joueur au trait se déduit du nombre de pièces
+        scores = solveur.scores_coups(grille, 1 + grille.nb_pieces % 2)
+        meilleur = max(scores.values())
+        # Résultat exact du point de vue du joueur 2 (celui de calculer_score_position)
+        exact = meilleur if grille.nb_pieces % 2 == 1 else -meilleur
+        if exact:
+            decidees += 1
+            accords += (calculer_score_position(grille, 2) > 0) == (exact > 0)
+        if agent is not None:
+            col = agent.choose_action(grille, list(scores))
+            optimaux += (scores[col] > 0) == (meilleur > 0) and (scores[col] < 0) == (meilleur < 0)
+    resultats = {
+        "positions": nombre,
+        "parties_decidees": decidees,
+        "accord_evaluation": accords / decidees if decidees else 0.0,
+        "temps_par_position": (time.perf_counter() - debut) / nombre,
+    }
+    if agent is not None:
+        resultats["coups_optimaux_agent"] = optimaux / nombre
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Résout une position ou compare l'évaluation et l'agent au jeu parfait")
+    parser.add_argument("--coups", help="coups joués depuis la grille vide (colonnes de 1 à 7), ex. 4453")
+    parser.add_argument("--verifier", type=int, metavar="N", help="compare sur N positions de fin de partie")
+    parser.add_argument("--cases-vides", type=int, default=CASES_VIDES_SOLVEUR)
+    parser.add_argument("--agent", action="store_true", help="compare aussi les coups de l'agent entraîné")
+    args = parser.parse_args()
+
+    if args.coups is not None:
+        grille = grille_depuis_coups(args.coups)
+        solveur = Solveur()
+        debut = time.perf_counter()
+        scores = solveur.scores_coups(grille, 1 + grille.nb_pieces % 2)
+        print(grille)
+        for col, score in scores.items():
+            resultat, reste = interpreter_score(score, grille.nb_pieces)
+            print(f"Colonne {col} : {resultat} en {reste} coups (score {score})")
+        print(f"{solveur.noeuds} noeuds en {time.perf_counter() - debut:.2f} s")
+    if args.verifier:
+        agent = None
+        if args.agent:
+            from agent import QLearningAgent
+            agent = QLearningAgent(epsilon=0.0)
+            agent.load_model()
+        print(comparer_avec_exact(args.verifier, args.cases_vides, agent=agent))
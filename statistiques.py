@@ -0,0 +1,100 @@
+# Module pour observer ce que fait la recherche Minimax (noeuds, coupures, temps)
+import time
+
+
+class StatistiquesRecherche:
+    def __init__(self):
+        """
+        Compteurs remplis par les recherches qui reçoivent l'objet (paramètre stats)
+
+        - noeuds: noeuds visités, indexés par profondeur restante (0 = feuilles)
+        - evaluations: feuilles évaluées avec le score de la grille
+        - terminaux: positions gagnées ou pleines rencontrées
+        - succes_table: noeuds résolus directement par la table de transposition
+        - coupures: coupures alpha-beta ; rangs_coupures[i] compte celles
+          provoquées par le i-ème coup essayé (0 = bon ordre des coups)
+        - iterations: (profondeur, noeuds, temps) de chaque itération terminée
+          de l'approfondissement itératif (noeuds et temps de l'itération seule)
+        - temps: temps passé entre demarrer() et arreter()
+        """
+        self.noeuds = [0] * 43
+        self.evaluations = 0
+        self.terminaux = 0
+        self.succes_table = 0
+        self.coupures = 0
+        self.rangs_coupures = [0] * 7
+        self.iterations = []
+        self.temps = 0.0
+        self._debut = None
+
+    def coupure(self, rang):
+        """Enregistre une coupure provoquée par le coup numéro rang (à partir de 0)"""
+        self.coupures += 1
+        self.rangs_coupures[rang] += 1
+
+    def demarrer(self):
+        self._debut = time.perf_counter()
+
+    def arreter(self):
+        self.temps += time.perf_counter() - self._debut
+        self._debut = None
+
+    def fusionner(self, autre):
+        """Ajoute les compteurs d'une autre recherche (par exemple celle d'un worker)"""
+        self.noeuds = [a + b for a, b in zip(self.noeuds, autre.noeuds)]
+        self.evaluations += autre.evaluations
+        self.terminaux += autre.terminaux
+        self.succes_table += autre.succes_table
+        self.coupures += autre.coupures
+        self.rangs_coupures = [a + b for a, b in zip(self.rangs_coupures, autre.rangs_coupures)]
+        self.iterations += autre.iterations
+
+    @property
+    def nb_noeuds(self):
+        return sum(self.noeuds)
+
+    def taux_premier_coup(self):
+        """Proportion des coupures obtenues dès le premier coup essayé"""
+        return self.rangs_coupures[0] / self.coupures if self.coupures else 0.0
+
+    def facteur_branchement(self):
+        """
+        Facteur de branchement effectif : rapport des noeuds des deux dernières
+        itérations, ou sinon moyenne géométrique du rapport entre deux niveaux
+        """
+        if len(self.iterations) >= 2 and self.iterations[-2][1]:
+            return self.iterations[-1][1] / self.iterations[-2][1]
+        niveaux = [profondeur for profondeur, nb in enumerate(self.noeuds) if nb]
+        if len(niveaux) < 2:
+            return 0.0
+        bas, haut = niveaux[0], niveaux[-1]
+        return (self.noeuds[bas] / self.noeuds[haut]) ** (1 / (haut - bas))
+
+    def en_dict(self):
+        """Résumé sous forme de dictionnaire (pour les benchmarks ou un fichier JSON)"""
+        return {
+            "noeuds": self.nb_noeuds,
+            "noeuds_par_profondeur": {profondeur: nb for profondeur, nb in enumerate(self.noeuds) if nb},
+            "evaluations": self.evaluations,
+            "terminaux": self.terminaux,
+            "succes_table": self.succes_table,
+            "coupures": self.coupures,
+            "rangs_coupures": self.rangs_coupures,
+            "taux_premier_coup": self.taux_premier_coup(),
+            "facteur_branchement": self.facteur_branchement(),
+            "iterations": self.iterations,
+            "temps": self.temps,
+            "noeuds_par_seconde": self.nb_noeuds / self.temps if self.temps else 0.0,
+        }
+
+    def __str__(self):
+        texte = f"{self.nb_noeuds} noeuds"
+        if self.temps:
+            texte += f" en {self.temps:.2f} s ({self.nb_noeuds / self.temps:.0f} noeuds/s)"
+        texte += (f", {self.evaluations} évaluations, {self.terminaux} fins de partie, "
+                  f"{self.succes_table} succès de la table, {self.coupures} coupures "
+                  f"({self.taux_premier_coup()*100:.0f}% au premier coup), "
+                  f"facteur de branchement {self.facteur_branchement():.2f}")
+        if self.iterations:
+            texte += "\nProfondeurs : " + ", ".join(f"{p} ({t:.2f} s)" for p, _, t in self.iterations)
+        return texte
@@ -0,0 +1,573 @@
+# Module pour stocker les valeurs Q de façon compacte (table de hachage sur des tableaux NumPy)
+import os
+import pickle
+import struct
+import zlib
+
+import numpy as np
+
+# Un enregistrement = clé de l'état (64 bits) + valeurs Q des 7 colonnes en float32 (36 octets)
+ENREGISTREMENT = np.dtype([('cle', '<u8'), ('q', '<f4', (7,))])
+
+# Constante multiplicative du hachage de Fibonacci (2^64 / nombre d'or)
+_FIBONACCI = 0x9E3779B97F4A7C15
+_MASQUE_64 = (1 << 64) - 1
+# Proportion maximale de cases occupées avant de doubler la table
+CHARGE_MAX = 0.65
+# Table bornée : nombre d'états tirés au hasard parmi lesquels on choisit celui à oublier
+ECHANTILLON_OUBLI = 8
+
+# Fichier de modèle : en-tête de 32 octets puis les enregistrements de la table, tels quels
+# (magique, version, options, capacité, nombre d'états)
+MAGIQUE = b'P4QTABLE'
+VERSION = 1
+EN_TETE = struct.Struct('<8sIIQQ')
+OPTION_SYMETRIQUE = 1
+# Journal d'une sauvegarde partielle : (magique, nombre d'enregistrements, nombre d'états),
+# puis les indices, les enregistrements et un CRC32 de l'ensemble
+MAGIQUE_JOURNAL = b'P4QJOURN'
+EN_TETE_JOURNAL = struct.Struct('<8sQQ')
+
+# Bit du bas de chaque colonne (7 bits par colonne, comme les bitboards de Grille)
+_BAS = sum(1 << (colonne * 7) for colonne in range(7))
+
+
+def cle_depuis_cases(cases):
+    """
+    Calcule la clé d'un état à partir d'une grille 6x7 (ligne 0 en haut),
+    par exemple les tuples de tuples de l'ancien format. Même clé que Grille.cle().
+    """
+    pieces_joueur1 = 0
+    masque = 0
+    for i, ligne in enumerate(cases):
+        for j, case in enumerate(ligne):
+            if case:
+                bit = 1 << (j * 7 + len(cases) - 1 - i)
+                masque |= bit
+                if case == 1:
+                    pieces_joueur1 |= bit
+    return pieces_joueur1 + masque + _BAS
+
+
+def cle_miroir(cle):
+    """Clé de la position symétrique gauche-droite (les 7 blocs de 7 bits sont inversés)"""
+    miroir = 0
+    for colonne in range(7):
+        miroir |= ((cle >> (7 * colonne)) & 0x7F) << (7 * (6 - colonne))
+    return miroir
+
+
+def cle_canonique(cle):
+    """Retourne (clé canonique, True si c'est la clé du miroir) : une position et son miroir ont la même"""
+    miroir = cle_miroir(cle)
+    if miroir < cle:
+        return miroir, True
+    return cle, False
+
+
+def cles_miroir_lot(cles):
+    """Version vectorisée de cle_miroir pour un tableau de clés uint64"""
+    cles = np.asarray(cles, dtype=np.uint64)
+    miroir = np.zeros_like(cles)
+    for colonne in range(7):
+        miroir |= ((cles >> np.uint64(7 * colonne)) & np.uint64(0x7F)) << np.uint64(7 * (6 - colonne))
+    return miroir
+
+
+def colonnes_jouables_lot(cles):
+    """
+    Tableau (N, 7) de booléens : True pour les colonnes non pleines de chaque clé
+    (le bit le plus haut d'une colonne de la clé marque sa hauteur)
+    """
+    cles = np.asarray(cles, dtype=np.uint64)
+    blocs = (cles[:, None] >> (np.arange(7, dtype=np.uint64) * np.uint64(7))) & np.uint64(0x7F)
+    return blocs < 64
+
+
+def cles_canoniques_lot(cles):
+    """Version vectorisée de cle_canonique : (clés canoniques, tableau de booléens True si miroir)"""
+    cles = np.asarray(cles, dtype=np.uint64)
+    miroir = cles_miroir_lot(cles)
+    est_miroir = miroir < cles
+    return np.where(est_miroir, miroir, cles), est_miroir
+
+
+def capacite_pour(etats_max):
+    """Plus petite capacité (puissance de 2) qui contient etats_max états sans dépasser CHARGE_MAX"""
+    capacite = 1
+    while etats_max > CHARGE_MAX * capacite:
+        capacite *= 2
+    return capacite
+
+
+class TableQ:
+    def __init__(self, capacite=1024, symetrique=False, etats_max=None):
+        """
+        Table de hachage à adressage ouvert (sondage linéaire) : clé entière -> 7 valeurs Q
+
+        capacite: nombre de cases initial (puissance de 2, doublé quand la table se remplit,
+        ignoré pour une table bornée)
+        symetrique: True si les clés stockées sont canoniques (une position et son miroir confondus)
+        etats_max: si donné (au moins 2), la table ne grandit plus au-delà de ce nombre
+        d'états : pour en ajouter un nouveau, elle oublie un état peu utile (voir _utilites)
+
+        La clé 0 marque une case vide (les clés d'état ne valent jamais 0).
+        """
+        if etats_max is not None and etats_max < 2:
+            # L'état accédé en dernier n'est jamais oublié : il faut de la place pour un autre
+            raise ValueError(f"etats_max doit valoir au moins 2 (reçu {etats_max})")
+        self.symetrique = symetrique
+        self._initialiser_suivi(etats_max)
+        if etats_max is not None:
+            capacite = capacite_pour(etats_max)
+        self._allouer(capacite)
+
+    def _initialiser_suivi(self, etats_max):
+        self.etats_max = etats_max
+        # Compteurs : lectures de valeurs, lectures d'états connus, états oubliés
+        self.consultations = 0
+        self.succes = 0
+        self.oublis = 0
+        # Horloge des accès (avance d'un cran par état consulté ou modifié)
+        self.horloge = 0
+        self._hasard = np.random.default_rng()
+
+    def _allouer(self, capacite):
+        self._attacher(np.zeros(capacite, dtype=ENREGISTREMENT))
+        self.nb_etats = 0
+
+    def _attacher(self, enregistrements):
+        self.enregistrements = enregistrements
+        self.cles = self.enregistrements['cle']
+        self.q = self.enregistrements['q']
+        self.masque = len(enregistrements) - 1
+        self.decalage = 64 - (len(enregistrements).bit_length() - 1)
+        # Table bornée : nombre d'accès et date du dernier accès de chaque case (jamais sauvegardés)
+        if self.etats_max is not None:
+            self.visites = np.zeros(len(enregistrements), dtype=np.uint32)
+            self.derniers = np.zeros(len(enregistrements), dtype=np.uint64)
+        # Suivi des sauvegardes : fichier associé, cases modifiées depuis, ou réécriture complète
+        self.fichier = None
+        self.modifiees = set()
+
+    def __getstate__(self):
+        # Seul le tableau des enregistrements est sauvegardé (les autres attributs en sont des vues)
+        return {"enregistrements": self.enregistrements, "nb_etats": self.nb_etats,
+                "symetrique": self.symetrique, "etats_max": self.etats_max}
+
+    def __setstate__(self, etat):
+        self.symetrique = etat.get("symetrique", False)
+        self._initialiser_suivi(etat.get("etats_max"))
+        self._allouer(len(etat["enregistrements"]))
+        self.enregistrements[:] = etat["enregistrements"]
+        self.nb_etats = etat["nb_etats"]
+
+    def __len__(self):
+        return self.nb_etats
+
+    def __contains__(self, cle):
+        return self.trouver(cle) >= 0
+
+    def _position(self, cle):
+        """Case de départ du sondage pour une clé"""
+        return ((cle * _FIBONACCI) & _MASQUE_64) >> self.decalage
+
+    def _positions_lot(self, cles):
+        """Cases de départ du sondage pour un tableau de clés uint64"""
+        return ((cles * np.uint64(_FIBONACCI)) >> np.uint64(self.decalage)).astype(np.intp)
+
+    def trouver(self, cle):
+        """Retourne l'indice de la case contenant la clé, ou -1 si elle est absente"""
+        i = self._position(cle)
+        cles = self.cles
+        while True:
+            k = cles[i]
+            if k == cle:
+                return i
+            if k == 0:
+                return -1
+            i = (i + 1) & self.masque
+
+    def inserer(self, cle):
+        """Retourne l'indice de la case de la clé, en l'ajoutant (valeurs à 0) si besoin"""
+        i = self._position(cle)
+        cles = self.cles
+        while True:
+            k = cles[i]
+            if k == cle:
+                self._noter(i)
+                return i
+            if k == 0:
+                break
+            i = (i + 1) & self.masque
+        if self.etats_max is not None and self.nb_etats >= self.etats_max:
+            # L'oubli décale des états : la case libre est recherchée à nouveau
+            self._oublier(1)
+            return self.inserer(cle)
+        if (self.nb_etats + 1) > CHARGE_MAX * len(cles):
+            self._agrandir()
+            return self.inserer(cle)
+        cles[i] = cle
+        self.nb_etats += 1
+        self.modifiees.add(i)
+        self._noter(i)
+        return i
+
+    def _noter(self, i):
+        """Compte un accès à la case i (table bornée seulement)"""
+        if self.etats_max is not None:
+            self.horloge += 1
+            self.visites[i] += 1
+            self.derniers[i] = self.horloge
+
+    def _noter_lot(self, indices):
+        """Version vectorisée de _noter"""
+        if self.etats_max is not None and len(indices):
+            self.horloge += len(indices)
+            np.add.at(self.visites, indices, 1)
+            self.derniers[indices] = self.horloge
+
+    def _utilites(self, cases):
+        """
+        Utilité des états des cases : leur nombre d'accès, divisé par deux tous les
+        etats_max accès sans eux (mélange de LFU et de LRU)
+        """
+        ages = (self.horloge - self.derniers[cases]).astype(np.float64)
+        return self.visites[cases] * np.exp2(-ages / self.etats_max)
+
+    def _choisir_oublie(self):
+        """
+        Clé d'un état à oublier : le moins utile de ECHANTILLON_OUBLI états tirés au
+        hasard (sans parcourir la table). L'état accédé en dernier n'est jamais choisi.
+        """
+        if self.nb_etats <= ECHANTILLON_OUBLI:
+            # Trop peu d'états pour en tirer ECHANTILLON_OUBLI : choix exact
+            return self._choisir_oublies_lot(1)[0]
+        while True:
+            # Assez de cases tirées pour trouver en moyenne deux fois plus d'états que nécessaire
+            taille = 2 * ECHANTILLON_OUBLI * len(self.cles) // max(self.nb_etats, 1)
+            cases = self._hasard.integers(0, len(self.cles), size=taille)
+            cases = cases[(self.cles[cases] != 0) & (self.derniers[cases] != self.horloge)][:ECHANTILLON_OUBLI]
+            if len(cases) == ECHANTILLON_OUBLI:
+                return int(self.cles[cases[np.argmin(self._utilites(cases))]])
+
+    def _choisir_oublies_lot(self, nombre):
+        """
+        Clés des nombre états les moins utiles de toute la table, sauf ceux accédés en
+        dernier (les états d'un lot en cours). Un seul passage vectorisé sur la table :
+        avec beaucoup d'états protégés, l'échantillonnage ne les trouverait pas.
+        """
+        cases = np.flatnonzero((self.cles != 0) & (self.derniers != self.horloge))
+        if nombre < len(cases):
+            cases = cases[np.argpartition(self._utilites(cases), nombre)[:nombre]]
+        return self.cles[cases].tolist()
+
+    def _oublier(self, nombre):
+        """Retire nombre états peu utiles de la table"""
+        cles = [self._choisir_oublie()] if nombre == 1 else self._choisir_oublies_lot(nombre)
+        for cle in cles:
+            self._supprimer(self.trouver(cle))
+
+    def _supprimer(self, i):
+        """
+        Vide la case i en remontant les états suivants du même groupe de cases
+        (suppression par décalage : le sondage linéaire reste correct sans marqueur)
+        """
+        j = i
+        while True:
+            j = (j + 1) & self.masque
+            cle = int(self.cles[j])
+            if cle == 0:
+                break
+            # L'état de j peut remonter en i si sa case de départ n'est pas entre i (exclu) et j
+            if (j - self._position(cle)) & self.masque >= (j - i) & self.masque:
+                self.enregistrements[i] = self.enregistrements[j]
+                self.visites[i] = self.visites[j]
+                self.derniers[i] = self.derniers[j]
+                self.modifiees.add(i)
+                i = j
+        self.cles[i] = 0
+        self.q[i] = 0.0
+        self.visites[i] = 0
+        self.derniers[i] = 0
+        self.modifiees.add(i)
+        self.nb_etats -= 1
+        self.oublis += 1
+
+    def _agrandir(self):
+        """Double la capacité et replace tous les états"""
+        anciens = self.enregistrements[self.cles != 0]
+        self._allouer(2 * len(self.enregistrements))
+        self._placer_lot(anciens)
+
+    def _placer_lot(self, enregistrements):
+        """
+        Place des enregistrements (clés absentes et distinctes) par sondage linéaire vectorisé
+        et retourne la case de chacun
+        """
+        positions = self._positions_lot(enregistrements['cle'])
+        restants = np.arange(len(enregistrements))
+        place = np.zeros(len(enregistrements), dtype=bool)
+        while restants.size:
+            libres = self.cles[positions[restants]] == 0
+            candidats = restants[libres]
+            # Une seule clé par case à chaque tour : la première qui la demande
+            cases, premiers = np.unique(positions[candidats], return_index=True)
+            places = candidats[premiers]
+            self.enregistrements[cases] = enregistrements[places]
+            place[places] = True
+            restants = restants[~place[restants]]
+            positions[restants] = (positions[restants] + 1) & self.masque
+        self.nb_etats += len(enregistrements)
+        return positions
+
+    def trouver_lot(self, cles):
+        """Version vectorisée de trouver : indices des cases des clés (tableau uint64), -1 si absentes"""
+        cles = np.asarray(cles, dtype=np.uint64)
+        positions = self._positions_lot(cles)
+        resultat = np.full(len(cles), -1, dtype=np.intp)
+        actives = np.arange(len(cles))
+        while actives.size:
+            k = self.cles[positions[actives]]
+            trouvees = k == cles[actives]
+            resultat[actives[trouvees]] = positions[actives[trouvees]]
+            actives = actives[~trouvees & (k != 0)]
+            positions[actives] = (positions[actives] + 1) & self.masque
+        return resultat
+
+    def inserer_lot(self, cles):
+        """Version vectorisée de inserer : ajoute les clés absentes et retourne les indices de toutes"""
+        cles = np.asarray(cles, dtype=np.uint64)
+        indices = self.trouver_lot(cles)
+        absentes = indices < 0
+        manquantes, inverse = np.unique(cles[absentes], return_inverse=True)
+        if manquantes.size and self.etats_max is not None:
+            if np.unique(indices[~absentes]).size + manquantes.size > self.etats_max:
+                raise ValueError(f"Le lot contient plus de {self.etats_max} états différents")
+            exces = self.nb_etats + manquantes.size - self.etats_max
+            if exces > 0:
+                # Les états du lot déjà présents ne doivent pas être oubliés
+                self.horloge += 1
+                self.derniers[indices[~absentes]] = self.horloge
+                self._oublier(exces)
+                indices = self.trouver_lot(cles)  # L'oubli a pu décaler des états
+        if manquantes.size:
+            agrandie = False
+            while self.nb_etats + manquantes.size > CHARGE_MAX * len(self.cles):
+                self._agrandir()
+                agrandie = True
+            nouveaux = np.zeros(manquantes.size, dtype=ENREGISTREMENT)
+            nouveaux['cle'] = manquantes
+            cases = self._placer_lot(nouveaux)
+            if agrandie:
+                # Toutes les clés ont changé de case
+                indices = self.trouver_lot(cles)
+            else:
+                indices[absentes] = cases[inverse]
+        self.modifiees.update(indices.tolist())
+        self._noter_lot(indices)
+        return indices
+
+    def _consulter(self, cle):
+        """trouver, en comptant la lecture (jamais d'ajout à la table)"""
+        i = self.trouver(cle)
+        self.consultations += 1
+        if i >= 0:
+            self.succes += 1
+            self._noter(i)
+        return i
+
+    def valeurs(self, cle):
+        """Retourne les 7 valeurs Q d'un état (vue sur la table), ou None s'il est inconnu"""
+        i = self._consulter(cle)
+        return self.q[i] if i >= 0 else None
+
+    def valeur(self, cle, action):
+        """Valeur Q d'une action (de 1 à 7) ; 0.0 si inconnue, sans rien ajouter à la table"""
+        i = self._consulter(cle)
+        return float(self.q[i, action - 1]) if i >= 0 else 0.0
+
+    def valeurs_lot(self, cles):
+        """Version vectorisée de valeurs : tableau (N, 7), des 0 pour les états inconnus"""
+        indices = self.trouver_lot(cles)
+        connus = indices >= 0
+        valeurs = np.zeros((len(indices), 7), dtype=np.float32)
+        valeurs[connus] = self.q[indices[connus]]
+        self.consultations += len(indices)
+        self.succes += int(connus.sum())
+        self._noter_lot(indices[connus])
+        return valeurs
+
+    def taux_succes(self):
+        """Proportion des lectures qui ont trouvé l'état dans la table"""
+        return self.succes / self.consultations if self.consultations else 0.0
+
+    def fixer(self, cle, action, valeur):
+        """Modifie la valeur Q d'une action (de 1 à 7), en ajoutant l'état si besoin"""
+        i = self.inserer(cle)
+        self.q[i, action - 1] = valeur
+        self.modifiees.add(i)
+
+    def octets_par_etat(self):
+        """Mémoire occupée par état connu (cases vides comprises)"""
+        return self.enregistrements.nbytes / max(self.nb_etats, 1)
+
+    def etats(self):
+        """Itère sur les (clé, tableau des 7 valeurs Q) de tous les états connus"""
+        for i in np.flatnonzero(self.cles):
+            yield int(self.cles[i]), self.q[i]
+
+    @classmethod
+    def depuis_etats(cls, etats, symetrique=False):
+        """
+        Construit une table à partir de (clé, {action: valeur}) ; avec symetrique=True,
+        les clés sont rendues canoniques et une position et son miroir sont fusionnés
+        (moyenne des valeurs connues des deux côtés).
+        """
+        table = cls(symetrique=symetrique)
+        nb_valeurs = {}
+        for cle, actions in etats:
+            miroir = False
+            if symetrique:
+                cle, miroir = cle_canonique(cle)
+            i = table.inserer(cle)
+            comptes = nb_valeurs.setdefault(cle, [0] * 7)
+            for action, valeur in actions.items():
+                a = 7 - action if miroir else action - 1
+                comptes[a] += 1
+                table.q[i, a] += (valeur - table.q[i, a]) / comptes[a]
+        return table
+
+    @classmethod
+    def depuis_dict(cls, q_table, symetrique=False):
+        """Convertit l'ancien format {tuple de tuples: {action: valeur}} en TableQ"""
+        return cls.depuis_etats(((cle_depuis_cases(etat), actions) for etat, actions in q_table.items()), symetrique)
+
+    def replier(self):
+        """Retourne une copie symétrique de la table (chaque position fusionnée avec son miroir)"""
+        return TableQ.depuis_etats(
+            ((cle, {a + 1: float(v) for a, v in enumerate(valeurs)}) for cle, valeurs in self.etats()),
+            symetrique=True,
+        )
+
+    def borner(self, etats_max):
+        """
+        Retourne une copie bornée à etats_max états ; s'il y en a trop, garde ceux dont
+        les valeurs Q sont les plus éloignées de 0 (les mieux apprises)
+        """
+        occupees = np.flatnonzero(self.cles)
+        if len(occupees) > etats_max:
+            ecarts = np.abs(self.q[occupees]).max(axis=1)
+            occupees = occupees[np.argsort(-ecarts, kind='stable')[:etats_max]]
+        table = TableQ(symetrique=self.symetrique, etats_max=etats_max)
+        cases = table._placer_lot(self.enregistrements[occupees])
+        table.visites[cases] = 1
+        return table
+
+    @classmethod
+    def ouvrir(cls, fichier):
+        """
+        Ouvre un modèle binaire par projection en mémoire (mmap) : rien n'est lu
+        avant d'être consulté. Les modifications restent en mémoire jusqu'à sauvegarder().
+        """
+        _rejouer_journal(fichier)
+        with open(fichier, 'rb') as f:
+            magique, version, options, capacite, nb_etats = EN_TETE.unpack(f.read(EN_TETE.size))
+        if magique != MAGIQUE:
+            raise ValueError(f"{fichier} n'est pas un modèle Puissance 4")
+        if version != VERSION:
+            raise ValueError(f"Version de modèle non supportée : {version}")
+        table = cls.__new__(cls)
+        table.symetrique = bool(options & OPTION_SYMETRIQUE)
+        table._initialiser_suivi(None)
+        # Mode 'c' (copie à l'écriture) : le fichier n'est jamais modifié directement
+        table._attacher(np.memmap(fichier, dtype=ENREGISTREMENT, mode='c', offset=EN_TETE.size, shape=(capacite,)))
+        table.nb_etats = nb_etats
+        table.fichier = os.path.abspath(fichier)
+        return table
+
+    def sauvegarder(self, fichier):
+        """
+        Sauvegarde atomique : si la table vient de ce fichier et n'a pas changé de taille,
+        seuls les enregistrements modifiés sont écrits (via un journal), sinon le fichier
+        est réécrit à côté puis renommé.
+        """
+        if self.fichier == os.path.abspath(fichier) and os.path.exists(fichier):
+            self._sauvegarder_modifiees(fichier)
+        else:
+            self._sauvegarder_tout(fichier)
+        self.fichier = os.path.abspath(fichier)
+        self.modifiees = set()
+
+    def _en_tete(self):
+        options = OPTION_SYMETRIQUE if self.symetrique else 0
+        return EN_TETE.pack(MAGIQUE, VERSION, options, len(self.enregistrements), self.nb_etats)
+
+    def _sauvegarder_tout(self, fichier):
+        temporaire = fichier + '.tmp'
+        with open(temporaire, 'wb') as f:
+            f.write(self._en_tete())
+            f.write(self.enregistrements.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, fichier)
+
+    def _sauvegarder_modifiees(self, fichier):
+        if not self.modifiees:
+            return
+        indices = np.array(sorted(self.modifiees), dtype='<u8')
+        contenu = (
+            EN_TETE_JOURNAL.pack(MAGIQUE_JOURNAL, len(indices), self.nb_etats)
+            + indices.tobytes()
+            + self.enregistrements[indices.astype(np.intp)].tobytes()
+        )
+        # Le journal est écrit et synchronisé avant de toucher au modèle
+        with open(fichier + '.journal', 'wb') as f:
+            f.write(contenu)
+            f.write(struct.pack('<I', zlib.crc32(contenu)))
+            f.flush()
+            os.fsync(f.fileno())
+        _rejouer_journal(fichier)
+
+
+def _rejouer_journal(fichier):
+    """
+    Applique au modèle un journal de sauvegarde complet, puis le supprime.
+    Un journal incomplet (arrêt pendant son écriture) est ignoré : le modèle
+    est resté tel qu'il était à la sauvegarde précédente.
+    """
+    journal = fichier + '.journal'
+    if not os.path.exists(journal):
+        return
+    with open(journal, 'rb') as f:
+        contenu = f.read()
+    corps, crc = contenu[:-4], contenu[-4:]
+    if len(contenu) >= EN_TETE_JOURNAL.size + 4 and struct.pack('<I', zlib.crc32(corps)) == crc:
+        magique, nb, nb_etats = EN_TETE_JOURNAL.unpack_from(corps)
+        if magique == MAGIQUE_JOURNAL:
+            debut = EN_TETE_JOURNAL.size
+            indices = np.frombuffer(corps, dtype='<u8', count=nb, offset=debut)
+            enregistrements = np.frombuffer(corps, dtype=ENREGISTREMENT, count=nb, offset=debut + 8 * nb)
+            with open(fichier, 'r+b') as f:
+                en_tete = bytearray(f.read(EN_TETE.size))
+                struct.pack_into('<Q', en_tete, EN_TETE.size - 8, nb_etats)
+                f.seek(0)
+                f.write(en_tete)
+                for indice, enregistrement in zip(indices.tolist(), enregistrements):
+                    f.seek(EN_TETE.size + indice * ENREGISTREMENT.itemsize)
+                    f.write(enregistrement.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+    os.remove(journal)
+
+
+def importer_pickle(fichier_pickle, fichier, symetrique=True):
+    """Convertit une fois pour toutes un ancien modèle pickle (dict de dicts ou TableQ) en modèle binaire"""
+    with open(fichier_pickle, 'rb') as f:
+        q_table = pickle.load(f)
+    if isinstance(q_table, dict):
+        q_table = TableQ.depuis_dict(q_table, symetrique)
+    elif symetrique and not q_table.symetrique:
+        q_table = q_table.replier()
+    q_table.sauvegarder(fichier)
+    return q_table
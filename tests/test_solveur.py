@@ -0,0 +1,25 @@
+from main import Grille, coup_minimax
+from solveur import Solveur
+
+
+def grille_ia_commence(coups):
+    """Rejoue une suite de coups (colonnes de 1 à 7) où l'IA (joueur 2) commence"""
+    grille = Grille()
+    for i, col in enumerate(coups):
+        grille.ajouter_piece(int(col), 2 - i % 2)
+    return grille
+
+
+def test_solveur_joue_la_piece_donnee():
+    # L'IA (2) a trois pièces en bas à gauche, le joueur 1 trois pièces empilées en colonne 7
+    grille = grille_ia_commence("171727")
+    assert Solveur().meilleur_coup(grille, 2)[0] == 4
+    assert Solveur().meilleur_coup(grille, 1)[0] == 7
+
+
+def test_coup_minimax_quand_ia_a_commence():
+    # Fin de partie gagnée pour l'IA : le meilleur coup du joueur 1 à sa place (colonne 2) perd
+    grille = grille_ia_commence("5646744675423112423574")
+    reglages = {"difficulte": 4, "temps": None, "workers": None}
+    assert Solveur().scores_coups(grille, 2)[2] < 0
+    assert coup_minimax(grille, reglages, None) == (7, 1000000)
@@ -0,0 +1,95 @@
+# Module pour la table de transposition (mémoire des positions déjà analysées par Minimax)
+import random
+from array import array
+
+# Clés de Zobrist : un nombre aléatoire de 64 bits par (pièce, case du bitboard).
+# La graine est fixe pour que les clés soient identiques d'un processus à l'autre.
+_generateur = random.Random(20240611)
+NB_BITS_PLATEAU = 7 * 7  # 7 colonnes de 7 bits (6 cases + sentinelle)
+ZOBRIST = [[0] * NB_BITS_PLATEAU] + [
+    [_generateur.getrandbits(64) for _ in range(NB_BITS_PLATEAU)] for _ in range(2)
+]
+# Clé ajoutée quand c'est à l'IA (joueur maximisant) de jouer
+ZOBRIST_TRAIT = _generateur.getrandbits(64)
+
+# Types de bornes stockées avec une valeur
+EXACTE = 0
+INFERIEURE = 1  # La vraie valeur est >= à la valeur stockée
+SUPERIEURE = 2  # La vraie valeur est <= à la valeur stockée
+
+# Taille approximative d'une entrée : clé (8) + valeur (8) + profondeur, borne, coup (1 chacun)
+OCTETS_PAR_ENTREE = 19
+
+
+class TableTransposition:
+    def __init__(self, taille_mo=16):
+        """
+        Crée une table de taille fixe
+
+        taille_mo: budget mémoire en mégaoctets (arrondi à la puissance de 2 inférieure)
+
+        Chaque case de la table contient deux entrées : la première garde la
+        position analysée le plus profondément, la seconde est toujours remplacée.
+        """
+        nb_cases = 1
+        while nb_cases * 4 * OCTETS_PAR_ENTREE <= taille_mo * 1024 * 1024:
+            nb_cases *= 2
+        self.masque = nb_cases - 1
+        self.nb_entrees = nb_cases * 2
+        self.cles = array('Q', bytes(8 * self.nb_entrees))
+        self.valeurs = array('q', bytes(8 * self.nb_entrees))
+        self.profondeurs = array('b', [-1]) * self.nb_entrees  # -1 : entrée vide
+        self.bornes = array('b', bytes(self.nb_entrees))
+        self.coups = array('b', bytes(self.nb_entrees))
+        self.reinitialiser_compteurs()
+
+    def reinitialiser_compteurs(self):
+        """Remet à zéro les compteurs de consultations, succès, stockages et collisions"""
+        self.consultations = 0
+        self.succes = 0
+        self.stockages = 0
+        self.collisions = 0
+
+    def vider(self):
+        """Efface toutes les entrées (par exemple au début d'une nouvelle partie)"""
+        self.profondeurs = array('b', [-1]) * self.nb_entrees
+        self.reinitialiser_compteurs()
+
+    def consulter(self, cle):
+        """Retourne (profondeur, valeur, borne, coup) pour la clé, ou None si absente"""
+        self.consultations += 1
+        i = (cle & self.masque) * 2
+        for j in (i, i + 1):
+            if self.profondeurs[j] >= 0 and self.cles[j] == cle:
+                self.succes += 1
+                return self.profondeurs[j], self.valeurs[j], self.bornes[j], self.coups[j]
+        return None
+
+    def stocker(self, cle, profondeur, valeur, borne, coup):
+        """Enregistre le résultat d'une recherche (remplacement à deux niveaux)"""
+        self.stockages += 1
+        i = (cle & self.masque) * 2
+        # Première entrée : remplacée si même position ou analyse au moins aussi profonde
+        if self.cles[i] != cle and profondeur < self.profondeurs[i]:
+            i += 1
+        if self.profondeurs[i] >= 0 and self.cles[i] != cle:
+            self.collisions += 1
+        self.cles[i] = cle
+        self.profondeurs[i] = profondeur
+        self.valeurs[i] = valeur
+        self.bornes[i] = borne
+        self.coups[i] = coup
+
+    def statistiques(self):
+        """Retourne les compteurs d'utilisation de la table"""
+        remplies = self.nb_entrees - self.profondeurs.count(-1)
+        return {
+            "entrees": self.nb_entrees,
+            "taille_mo": self.nb_entrees * OCTETS_PAR_ENTREE / (1024 * 1024),
+            "remplissage": remplies / self.nb_entrees,
+            "consultations": self.consultations,
+            "succes": self.succes,
+            "taux_succes": self.succes / self.consultations if self.consultations else 0.0,
+            "stockages": self.stockages,
+            "collisions": self.collisions,
+        }